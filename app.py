@@ -5,24 +5,158 @@ JIRA工单自动化系统 - Python版本
 """
 
 import os
+import io
+import re
+import sys
 import json
+import html
+import codecs
+import zipfile
+import posixpath
+import gzip
+import atexit
+import functools
+import threading
+import heapq
+import tempfile
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, jsonify, send_file
-import plotly.graph_objs as go
-import plotly.express as px
-from plotly.utils import PlotlyJSONEncoder
-import requests
-from requests.auth import HTTPBasicAuth
+from flask import Flask, Request, render_template, request, jsonify, send_file, send_from_directory, abort, make_response
 import base64
+import hashlib
 
 app = Flask(__name__)
 
 # 全局数据存储
-jira_data = None
-assignees_data = None
 jira_connection = None
 
+# 未能识别项目时使用的默认分区
+DEFAULT_PARTITION = 'DEFAULT'
+
+# 工单数据字段
+TICKET_TIME_COLUMNS = ('created_time', 'assigned_time', 'resolved_time')
+
+# 时间统一换算为 INGEST_TIMEZONE 的本地时间(不带时区)保存, 不带时区的原始值视为已是该时区的时间;
+# 时间列的格式按列检测一次: 取前 TIMESTAMP_SAMPLE_SIZE 个非空值, 选能解析最多样本的格式,
+# 末尾的UTC偏移(如JIRA的 +0800)另行换算, 格式中以 %z 表示。月/日/年排在日/月/年之前:
+# 样本全部无法区分(日、月都不超过12)时按月在前解析, 与 pd.to_datetime 的默认顺序一致
+INGEST_TIMEZONE = os.environ.get('JTAS_TIMEZONE', 'Asia/Shanghai')
+TIMESTAMP_SAMPLE_SIZE = 200
+TIMESTAMP_FORMATS = ('%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M',
+                     '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d',
+                     '%Y/%m/%d %H:%M:%S', '%Y/%m/%d %H:%M', '%Y/%m/%d',
+                     '%d/%b/%y %I:%M %p', '%d/%b/%Y %I:%M %p',
+                     '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M', '%m/%d/%Y', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y')
+UTC_OFFSET_PATTERN = re.compile(r'(?<=\d)(?:Z|[+-]\d{2}:?\d{2})$')
+TICKET_MINUTE_COLUMNS = ('log_time', 'actual_processing_minutes')
+REQUIRED_TICKET_COLUMNS = ['ticket_id', 'assignee_employee_id', 'assignment_method', 'actual_processing_minutes']
+VALID_ASSIGNMENT_METHODS = ['AI', 'MANUAL']
+
+# 数据模板中的工单字段, 以及JIRA导入额外提供的字段; XLSX导入只读取这些列
+TICKET_TEMPLATE_COLUMNS = ['ticket_id', 'jira_key', 'summary', 'assignee_employee_id', 'priority', 'status',
+                           'assignment_method', 'created_time', 'assigned_time', 'resolved_time',
+                           'log_time', 'actual_processing_minutes']
+TICKET_EXTRA_COLUMNS = ['project_key', 'assignee_name', 'assignee_account_id', 'issue_type', 'reporter',
+                        'components', 'labels']
+KNOWN_TICKET_COLUMNS = TICKET_TEMPLATE_COLUMNS + TICKET_EXTRA_COLUMNS
+
+# 处理人维度表: assignee_key 为稳定的整数键(等于行号), 工单在导入时解析为该键; 未分派为 -1
+ASSIGNEE_TABLE = 'assignees'
+ASSIGNEE_ROSTER_TABLE = 'assignee_roster'
+ASSIGNEE_ROSTER_COLUMNS = ['employee_id', 'account_id', 'name', 'department', 'skill_level']
+ASSIGNEE_DIMENSION_COLUMNS = ['assignee_key'] + ASSIGNEE_ROSTER_COLUMNS
+UNASSIGNED_KEY = -1
+UNASSIGNED_NAME = 'Unassigned'
+
+# 工作日志明细表: 每条工作日志一行(项目、工单、记录人、开始时间、秒数), 记录人在导入时解析为 assignee_key
+WORKLOG_TABLE = 'worklogs'
+WORKLOG_COLUMNS = ['project_key', 'ticket_id', 'author_key', 'started', 'seconds']
+WORKLOG_AUTHOR_COLUMNS = ('author_account_id', 'author_employee_id', 'author_name')
+
+# JSON/NDJSON 流式导入时每批构建的记录数及每次读取的字符数
+JSON_INGEST_BATCH_SIZE = 10000
+JSON_READ_CHUNK_CHARS = 1 << 20
+
+# XLSX 流式导入时每批解压的工作表XML字节数
+XLSX_INGEST_BATCH_BYTES = 8 << 20
+
+# 处理时长超过30天视为异常值; 校验报告中每类问题展示的示例行数
+MAX_PROCESSING_MINUTES = 30 * 24 * 60
+VALIDATION_SAMPLE_ROWS = 5
+
+# 后台刷新JIRA数据的任务名; 多worker共享数据集时只由持有刷新锁的worker刷新,
+# 其他worker每隔 REFRESH_ELECTION_SECONDS 尝试接替(负责刷新的worker退出后锁随之释放)
+REFRESH_JOB_NAME = 'jira_refresh'
+REFRESH_ELECTION_JOB_NAME = 'jira_refresh_election'
+REFRESH_ELECTION_SECONDS = 60
+
+# 分单公平性分析的时间窗口(秒)及最多滚动合并的窗口数
+FAIRNESS_WINDOWS = {'day': 24 * 3600, 'week': 7 * 24 * 3600}
+FAIRNESS_MAX_ROLLING = 90
+
+# 利用率按每个工作日的标准工时(小时)计算
+WORKDAY_HOURS = float(os.environ.get('JTAS_WORKDAY_HOURS', 8))
+
+# 工单摘要相似度索引: 字符n-gram哈希集合的MinHash签名(BANDS × ROWS 个哈希函数), LSH分桶找候选对;
+# 估计的Jaccard相似度不低于 THRESHOLD 视为相似; WINDOW_DAYS 为分单时参考的"短期上下文"范围
+SIMILARITY_SHINGLE = 3
+SIMILARITY_BANDS = 8
+SIMILARITY_ROWS = 4
+SIMILARITY_THRESHOLD = 0.5
+SIMILARITY_MAX_CHARS = 160
+SIMILARITY_WINDOW_DAYS = 7
+
+# 每个数据版本缓存的响应数量及启用压缩的最小响应大小(字节)
+RESPONSE_CACHE_SIZE = 256
+COMPRESSION_MIN_BYTES = 1024
+
+# 内存预算(MB): 数据集分区与派生缓存的总预算(0表示不限制)、单个上传请求上限及同时进行的上传总量;
+# 超出总预算时从最久未使用的开始淘汰派生缓存、把分区转存到 JTAS_SPILL_DIR
+MEMORY_BUDGET_MB = float(os.environ.get('JTAS_MEMORY_BUDGET_MB', 0))
+MAX_UPLOAD_MB = float(os.environ.get('JTAS_MAX_UPLOAD_MB', 512))
+UPLOAD_BUDGET_MB = float(os.environ.get('JTAS_UPLOAD_BUDGET_MB', MAX_UPLOAD_MB))
+SPILL_DIR = os.environ.get('JTAS_SPILL_DIR') or os.path.join(tempfile.gettempdir(), 'jtas-spill')
+MEMORY_SAMPLE_ROWS = 1000
+CHARDET_SAMPLE_BYTES = 1 << 20
+app.config['MAX_CONTENT_LENGTH'] = int(MAX_UPLOAD_MB * (1 << 20)) if MAX_UPLOAD_MB > 0 else None
+
+# 上传内容缓存: 按文件sha256缓存解析、规范化后的数据集, 相同文件再次上传时跳过解析(条目数为0表示关闭);
+# 解析或规范化逻辑变化时递增 INGEST_SCHEMA_VERSION, 使旧缓存失效
+UPLOAD_CACHE_DIR = os.environ.get('JTAS_UPLOAD_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'jtas-upload-cache')
+UPLOAD_CACHE_ENTRIES = int(os.environ.get('JTAS_UPLOAD_CACHE_ENTRIES', 16))
+INGEST_SCHEMA_VERSION = 2
+UPLOAD_FORMATS = ('.csv', '.xlsx', '.json', '.ndjson', '.jsonl')
+
+class HashingSpooledFile(tempfile.SpooledTemporaryFile):
+    """上传文件的暂存文件, 写入时同步计算sha256, 不需要再读一遍文件"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+    
+    def write(self, data):
+        self.sha256.update(data)
+        return super().write(data)
+
+class UploadRequest(Request):
+    """上传文件暂存到 HashingSpooledFile(超过500KB时落盘, 与Werkzeug默认一致)"""
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingSpooledFile(max_size=500 * 1024)
+
+app.request_class = UploadRequest
+
+def create_jira_session(username, token):
+    """创建带认证的HTTP会话(requests 仅在连接JIRA时才导入, 以加快启动)"""
+    import requests
+    from requests.auth import HTTPBasicAuth
+    
+    session = requests.Session()
+    session.auth = HTTPBasicAuth(username, token)
+    return session
+
 class JiraConnector:
     """JIRA API连接器"""
     def __init__(self):
@@ -30,7 +164,7 @@ class JiraConnector:
         self.username = None
         self.token = None
         self.session = None
-        
+    
     def connect(self, server, username, token):
         """连接到JIRA服务器"""
         try:
@@ -39,8 +173,7 @@ class JiraConnector:
             self.token = token
             
             # 创建会话
-            self.session = requests.Session()
-            self.session.auth = HTTPBasicAuth(username, token)
+            self.session = create_jira_session(username, token)
             
             # 测试连接
             response = self.session.get(f"{self.server}/rest/api/2/myself")
@@ -51,6 +184,16 @@ class JiraConnector:
         except Exception as e:
             return False, f"连接错误: {str(e)}"
     
+    def fork(self):
+        """复制连接配置并创建独立会话(供并发抓取使用)"""
+        connector = JiraConnector()
+        connector.server = self.server
+        connector.username = self.username
+        connector.token = self.token
+        if self.session:
+            connector.session = create_jira_session(self.username, self.token)
+        return connector
+    
     def get_projects(self):
         """获取所有项目"""
         if not self.session:
@@ -88,16 +231,20 @@ class JiraConnector:
                 issues = []
                 
                 for issue in data['issues']:
-                    # 获取工单的工作日志
-                    worklog_time = self.get_issue_worklog(issue['key'])
+                    # 获取工单的工作日志明细, 处理时间为全部日志时长之和
+                    worklogs = self.get_issue_worklogs(issue['key'], issue['fields'].get('worklog'))
+                    total_seconds = sum(log['seconds'] or 0 for log in worklogs)
+                    worklog_time = round(total_seconds / 60) if total_seconds > 0 else 0
                     
                     # 解析工单数据
                     issue_data = {
                         'ticket_id': issue['key'],
                         'jira_key': issue['key'],
+                        'project_key': project_key,
                         'summary': issue['fields'].get('summary', ''),
                         'assignee_employee_id': issue['fields']['assignee']['displayName'] if issue['fields'].get('assignee') else 'Unassigned',
                         'assignee_name': issue['fields']['assignee']['displayName'] if issue['fields'].get('assignee') else 'Unassigned',
+                        'assignee_account_id': (issue['fields']['assignee'].get('accountId') or issue['fields']['assignee'].get('name')) if issue['fields'].get('assignee') else None,
                         'priority': issue['fields']['priority']['name'] if issue['fields'].get('priority') else 'Medium',
                         'status': issue['fields']['status']['name'],
                         'issue_type': issue['fields']['issuetype']['name'],
@@ -108,7 +255,8 @@ class JiraConnector:
                         'actual_processing_minutes': worklog_time,
                         'assignment_method': 'MANUAL',  # 默认为手动，可以通过标签或自定义字段判断
                         'components': [c['name'] for c in issue['fields'].get('components', [])],
-                        'labels': issue['fields'].get('labels', [])
+                        'labels': issue['fields'].get('labels', []),
+                        'worklogs': worklogs
                     }
                     
                     # 通过标签或组件判断是否AI分单
@@ -122,33 +270,1974 @@ class JiraConnector:
             else:
                 print(f"获取工单失败: {response.status_code} - {response.text}")
                 return []
-                
+        
         except Exception as e:
             print(f"获取项目工单失败: {e}")
             return []
     
-    def get_issue_worklog(self, issue_key):
-        """获取工单的工作日志时间(分钟)"""
+    def get_projects_issues(self, project_keys, max_results=1000, max_workers=4):
+        """并发获取多个项目的工单, 返回 {project_key: issues}"""
+        if not self.session or not project_keys:
+            return {}
+        
+        # requests.Session 不保证线程安全, 每个项目使用独立会话
+        def fetch(project_key):
+            return project_key, self.fork().get_project_issues(project_key, max_results)
+        
+        workers = max(1, min(max_workers, len(project_keys)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(executor.map(fetch, project_keys))
+    
+    def get_issue_worklogs(self, issue_key, embedded=None):
+        """获取工单的全部工作日志条目
+        
+        搜索结果中内嵌的日志已完整(total 不超过内嵌条数)时直接使用, 否则分页请求工作日志接口。
+        """
+        if embedded is not None and embedded.get('total', 0) <= len(embedded.get('worklogs', [])):
+            return [worklog_entry(issue_key, log) for log in embedded.get('worklogs', [])]
         if not self.session:
+            return []
+        
+        logs = []
+        try:
+            while True:
+                response = self.session.get(f"{self.server}/rest/api/2/issue/{issue_key}/worklog",
+                                            params={'startAt': len(logs), 'maxResults': 1000})
+                if response.status_code != 200:
+                    break
+                page = response.json()
+                logs.extend(page.get('worklogs', []))
+                if not page.get('worklogs') or len(logs) >= page.get('total', 0):
+                    break
+        except Exception as e:
+            print(f"获取工作日志失败: {e}")
+        return [worklog_entry(issue_key, log) for log in logs]
+
+class DatasetSnapshot:
+    """数据集的一个不可变版本
+    
+    读取方只持有快照引用, 后台写入生成新快照后整体替换, 读写互不等待。
+    tables 保存与工单分区同版本发布的附加表(如处理人维度表)。
+    派生数据缓存及分区按最近使用时间记录, 超出内存预算时由 MemoryBudget 淘汰缓存或把分区转存到磁盘。
+    """
+    def __init__(self, version, partitions, source, created_at=None, tables=None):
+        self.version = version
+        self.partitions = partitions
+        self.source = source
+        self.created_at = created_at or datetime.now()
+        self.tables = tables or {}
+        self.spilled = {}
+        self._cache = OrderedDict()
+        self._cache_sizes = {}
+        self._cache_access = {}
+        self._cache_lock = threading.Lock()
+        self._partition_sizes = {}
+        self._partition_access = {}
+    
+    def inherit(self, previous):
+        """沿用上一版本中未变化分区的转存状态、大小估算及访问时间"""
+        for key, frame in self.partitions.items():
+            if previous.partitions.get(key) is frame:
+                for mine, theirs in ((self.spilled, previous.spilled), (self._partition_sizes, previous._partition_sizes),
+                                     (self._partition_access, previous._partition_access)):
+                    if key in theirs:
+                        mine[key] = theirs[key]
+    
+    def cached(self, key, builder):
+        """按版本缓存派生数据(合并结果、排序索引等), 版本切换后随快照一起失效"""
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self._cache_access[key] = time.monotonic()
+                return self._cache[key]
+        value = builder()
+        with self._cache_lock:
+            self._cache[key] = value
+            self._cache_sizes[key] = None if isinstance(value, LRUCache) else estimate_bytes(value)
+            self._cache_access[key] = time.monotonic()
+        memory_budget.enforce()
+        return value
+    
+    def cache_usage(self):
+        """派生数据缓存按最久未使用排序的 [(键, 字节数, 最近使用时间)]; 响应缓存等容器按当前内容计算"""
+        with self._cache_lock:
+            items = list(self._cache.items())
+            sizes = dict(self._cache_sizes)
+            access = dict(self._cache_access)
+        return [(key, estimate_bytes(value) if sizes.get(key) is None else sizes[key], access[key])
+                for key, value in items]
+    
+    def evict_cached(self, key):
+        """淘汰一项派生数据缓存"""
+        with self._cache_lock:
+            self._cache.pop(key, None)
+            self._cache_sizes.pop(key, None)
+            self._cache_access.pop(key, None)
+    
+    def partition_bytes(self, key):
+        """分区的内存占用估算(字节)"""
+        if key not in self._partition_sizes:
+            self._partition_sizes[key] = estimate_bytes(self.partitions[key])
+        return self._partition_sizes[key]
+    
+    def partition_access(self, key):
+        """分区最近一次被读取的时间(单调时钟), 从未读取为0"""
+        return self._partition_access.get(key, 0)
+    
+    def get_data(self, projects=None):
+        """获取数据; projects 为空时返回全部项目, 否则只读取指定项目的分区"""
+        partitions = self.partitions
+        keys = tuple(sorted(partitions)) if projects is None else \
+            tuple(sorted(k for k in set(projects) if k in partitions))
+        
+        if not keys:
+            return pd.DataFrame()
+        now = time.monotonic()
+        for key in keys:
+            self._partition_access[key] = now
+        if len(keys) == 1:
+            return partitions[keys[0]]
+        
+        return self.cached(('data', keys),
+                           lambda: pd.concat([partitions[k] for k in keys], ignore_index=True))
+    
+    def summary(self):
+        """各项目分区的行数"""
+        return {key: len(part) for key, part in sorted(self.partitions.items())}
+    
+    def assignees(self):
+        """处理人维度表"""
+        return assignee_dimension(self.tables)
+    
+    def worklogs(self, projects=None):
+        """工作日志明细表(可按项目筛选), 没有工作日志时为 None"""
+        table = self.tables.get(WORKLOG_TABLE)
+        if table is None or not projects:
+            return table
+        return table[table['project_key'].isin(projects).to_numpy()]
+
+class SharedDatasetBackend:
+    """多进程共享的只读数据集(内存映射的Arrow文件)
+    
+    每个版本写入独立目录, 每个项目分区一个Arrow IPC文件, CURRENT 文件记录最新版本号。
+    各worker按需内存映射最新版本: 数值与时间列零拷贝, 字符串列以Arrow字符串类型引用同一份页缓存,
+    因此增加worker不会成倍增加数据集内存。
+    """
+    KEEP_VERSIONS = 3
+    
+    def __init__(self, root):
+        import pyarrow  # noqa: F401 缺少依赖时在启动阶段即报错
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._current_path = os.path.join(root, 'CURRENT')
+        self._lock_path = os.path.join(root, '.lock')
+        self._stat_key = None
+        self._version = 0
+    
+    def latest_version(self):
+        """读取最新版本号(CURRENT 未变化时只需一次 stat)"""
+        try:
+            stat = os.stat(self._current_path)
+        except FileNotFoundError:
             return 0
         
+        stat_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stat_key != self._stat_key:
+            with open(self._current_path, encoding='utf-8') as f:
+                self._version = int(f.read().strip() or 0)
+            self._stat_key = stat_key
+        return self._version
+    
+    def transaction(self):
+        """跨进程写锁, 保证"读取最新版本-写入-提升版本号"的原子性"""
+        return _FileLock(self._lock_path)
+    
+    def refresh_lock(self):
+        """后台刷新的选举锁, 同一时间只有一个worker持有"""
+        return _FileLock(os.path.join(self.root, '.refresh.lock'))
+    
+    def write(self, version, partitions, source, previous=None, tables=None):
+        """写入新版本; 与上一版本相同的分区及附加表以硬链接复用, 不重复写盘
+        
+        已存在的版本目录(进程在提升版本号前崩溃留下, 或 CURRENT 被重置)不会被覆盖, 版本号顺延到其后。
+        """
+        import shutil
+        version = max([version] + [number + 1 for number in self._version_dirs()])
+        version_dir = os.path.join(self.root, f'v{version}')
+        tmp_dir = os.path.join(self.root, f'.tmp-v{version}-{os.getpid()}')
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        
+        try:
+            previous_meta = {}
+            if previous is not None and previous.version:
+                previous_meta = self._read_meta(previous.version)
+            
+            files = self._write_frames(partitions, 'p', tmp_dir, previous, previous.partitions if previous else {},
+                                       previous_meta.get('partitions', {}))
+            table_files = self._write_frames(tables or {}, 't', tmp_dir, previous,
+                                             previous.tables if previous else {}, previous_meta.get('tables', {}))
+            
+            created_at = datetime.now()
+            with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump({'version': version, 'source': source, 'created_at': created_at.isoformat(),
+                           'partitions': files, 'tables': table_files}, f, ensure_ascii=False)
+            os.rename(tmp_dir, version_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        
+        current_tmp = f'{self._current_path}.{os.getpid()}'
+        with open(current_tmp, 'w', encoding='utf-8') as f:
+            f.write(str(version))
+        os.replace(current_tmp, self._current_path)
+        
+        self._cleanup(version)
+        return self.load(version)
+    
+    def _write_frames(self, frames, prefix, tmp_dir, previous, previous_frames, previous_files):
+        """写入一组DataFrame, 返回 {名称: 文件名}; 与上一版本是同一对象的以硬链接复用"""
+        files = {}
+        for index, (key, frame) in enumerate(sorted(frames.items())):
+            file_name = f'{prefix}{index}.arrow'
+            target = os.path.join(tmp_dir, file_name)
+            if previous_frames.get(key) is frame and key in previous_files:
+                try:
+                    os.link(os.path.join(self.root, f'v{previous.version}', previous_files[key]), target)
+                    files[key] = file_name
+                    continue
+                except OSError:
+                    pass
+            self._write_table(frame, target)
+            files[key] = file_name
+        return files
+    
+    def load(self, version):
+        """内存映射指定版本的全部分区及附加表"""
+        meta = self._read_meta(version)
+        version_dir = os.path.join(self.root, f'v{version}')
+        partitions = {key: self._read_table(os.path.join(version_dir, file_name))
+                      for key, file_name in meta.get('partitions', {}).items()}
+        tables = {key: self._read_table(os.path.join(version_dir, file_name))
+                  for key, file_name in meta.get('tables', {}).items()}
+        return DatasetSnapshot(version, partitions, meta.get('source', 'shared'),
+                               datetime.fromisoformat(meta['created_at']) if meta.get('created_at') else None,
+                               tables=tables)
+    
+    def _read_meta(self, version):
+        with open(os.path.join(self.root, f'v{version}', 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _version_dirs(self):
+        """共享目录中已有的版本号"""
+        return [int(name[1:]) for name in os.listdir(self.root) if name.startswith('v') and name[1:].isdigit()]
+    
+    def _cleanup(self, latest):
+        """删除过旧的版本目录; 已被其他worker映射的文件在解除映射前仍然有效"""
+        import shutil
+        for number in self._version_dirs():
+            if number <= latest - self.KEEP_VERSIONS:
+                shutil.rmtree(os.path.join(self.root, f'v{number}'), ignore_errors=True)
+    
+    @staticmethod
+    def _write_table(frame, path):
+        import pyarrow as pa
+        try:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # 混合类型的object列无法直接转换, 统一转为字符串
+            frame = frame.copy()
+            for column in frame.columns[frame.dtypes == object]:
+                try:
+                    pa.array(frame[column], from_pandas=True)
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    frame[column] = frame[column].where(frame[column].isna(), frame[column].astype(str))
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+        
+        with pa.OSFile(path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    
+    @staticmethod
+    def _read_table(path):
+        import pyarrow as pa
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        string_dtype = pd.StringDtype('pyarrow')
+        return table.to_pandas(
+            types_mapper={pa.string(): string_dtype, pa.large_string(): string_dtype}.get,
+            split_blocks=True
+        )
+
+class _FileLock:
+    """基于 fcntl.flock 的进程间互斥锁"""
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+    
+    def __enter__(self):
+        import fcntl
+        self._file = open(self.path, 'a')
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+    
+    def __exit__(self, *exc):
+        self.release()
+        return False
+    
+    def try_acquire(self):
+        """不等待地获取锁, 成功后一直持有到 release 或进程退出"""
+        import fcntl
+        self._file = open(self.path, 'a')
+        try:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            self._file.close()
+            self._file = None
+            return False
+    
+    def release(self):
+        import fcntl
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+def private_directory(path):
+    """创建仅当前用户可访问的目录(0700); 已存在时检查属主, 防止其他用户预先创建同名目录放入或替换文件"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if os.path.islink(path) or not os.path.isdir(path):
+        raise PermissionError(f'{path} 不是目录')
+    if hasattr(os, 'getuid'):
+        info = os.stat(path)
+        if info.st_uid != os.getuid():
+            raise PermissionError(f'{path} 不属于当前用户')
+        if info.st_mode & 0o077:
+            os.chmod(path, 0o700)
+    return path
+
+class UploadCache:
+    """按内容寻址的上传数据集缓存
+    
+    每个条目为规范化后的工单数据(Arrow文件, 内存映射读取)及校验报告(JSON), 键由文件sha256、文件格式及
+    INGEST_SCHEMA_VERSION 组成。多个worker可共用同一目录; 超出条目上限时删除最久未使用的条目。
+    目录权限为0700且必须属于当前用户, 否则关闭缓存。
+    """
+    def __init__(self, directory, max_entries):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._usable = None
+    
+    def enabled(self):
+        import importlib.util
+        return self.max_entries > 0 and importlib.util.find_spec('pyarrow') is not None and self._directory_usable()
+    
+    def _directory_usable(self):
+        if self._usable is None:
+            try:
+                private_directory(self.directory)
+                self._usable = True
+            except OSError as e:
+                print(f"上传缓存目录不可用, 已关闭上传缓存: {e}")
+                self._usable = False
+        return self._usable
+    
+    @staticmethod
+    def key(digest, filename):
+        extension = filename.rsplit('.', 1)[-1].lower()
+        return f'{digest}-{extension}-v{INGEST_SCHEMA_VERSION}'
+    
+    def get(self, key):
+        """读取缓存条目的元数据(行数、列名及校验报告), 不存在时返回 None"""
+        if not self.enabled():
+            return None
+        try:
+            with open(os.path.join(self.directory, f'{key}.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+            os.utime(os.path.join(self.directory, f'{key}.json'))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"读取上传缓存失败: {e}")
+            return None
+        return meta
+    
+    def load(self, key):
+        """内存映射缓存的规范化数据, 文件已被删除时返回 None"""
+        try:
+            return SharedDatasetBackend._read_table(os.path.join(self.directory, f'{key}.arrow'))
+        except OSError as e:
+            print(f"读取上传缓存失败: {e}")
+            return None
+    
+    def put(self, key, data, report):
+        """写入缓存条目(先写临时文件再重命名, 元数据文件最后写入表示条目完整); 写入失败不影响上传"""
+        if not self.enabled():
+            return
+        path = os.path.join(self.directory, key)
+        tmp = f'.{key}.{os.getpid()}'
+        try:
+            private_directory(self.directory)
+            SharedDatasetBackend._write_table(data, os.path.join(self.directory, f'{tmp}.arrow'))
+            with open(os.path.join(self.directory, f'{tmp}.json'), 'w', encoding='utf-8') as f:
+                json.dump({'rows': len(data), 'columns': list(data.columns), 'validation': report},
+                          f, ensure_ascii=False, default=str)
+            os.replace(os.path.join(self.directory, f'{tmp}.arrow'), f'{path}.arrow')
+            os.replace(os.path.join(self.directory, f'{tmp}.json'), f'{path}.json')
+            self._prune()
+        except Exception as e:
+            print(f"写入上传缓存失败: {e}")
+    
+    def _prune(self):
+        """按最近使用时间保留 max_entries 个条目"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.json') and not name.startswith('.'):
+                try:
+                    entries.append((os.path.getmtime(os.path.join(self.directory, name)), name[:-5]))
+                except OSError:
+                    pass
+        for _, key in sorted(entries)[:-self.max_entries]:
+            for suffix in ('.json', '.arrow'):
+                try:
+                    os.remove(os.path.join(self.directory, key + suffix))
+                except OSError:
+                    pass
+
+upload_cache = UploadCache(UPLOAD_CACHE_DIR, UPLOAD_CACHE_ENTRIES)
+
+def upload_digest(file):
+    """上传文件内容的sha256; 暂存时已计算的直接使用, 否则分块读取计算"""
+    stream = file.stream
+    if isinstance(stream, HashingSpooledFile):
+        return stream.sha256.hexdigest()
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(1 << 20), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+def upload_size(file):
+    """上传文件暂存后的大小(字节)"""
+    stream = file.stream
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    return size
+
+def create_shared_backend():
+    """根据 JTAS_SHARED_DATASET_DIR 创建共享数据集后端, 未配置时返回 None"""
+    root = os.environ.get('JTAS_SHARED_DATASET_DIR')
+    if not root:
+        return None
+    
+    try:
+        return SharedDatasetBackend(root)
+    except ImportError:
+        print("pyarrow库未安装，共享数据集不可用，使用进程内数据集")
+        return None
+
+class DatasetStore:
+    """按项目分区、带版本号的数据集存储
+    
+    配置共享后端时, 写入经由Arrow文件发布, 其他worker在下次读取时发现版本号变化并切换。
+    """
+    def __init__(self, backend=None):
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._backend = backend
+        self._current = DatasetSnapshot(0, {}, 'empty')
+    
+    def current(self):
+        """当前生效的数据集快照"""
+        snapshot = self._current
+        if self._backend is not None and self._backend.latest_version() > snapshot.version:
+            with self._load_lock:
+                latest = self._backend.latest_version()
+                if latest > self._current.version:
+                    loaded = self._backend.load(latest)
+                    # 加载期间本进程可能已发布更新的版本
+                    if loaded.version > self._current.version:
+                        self._current = loaded
+                snapshot = self._current
+        return snapshot
+    
+    def is_empty(self):
+        """是否尚无数据"""
+        return not self.current().partitions
+    
+    def project_keys(self):
+        """当前已加载的项目列表"""
+        return sorted(self.current().partitions)
+    
+    def spill(self, snapshot, key, spill_dir):
+        """把进程内分区写为Arrow文件并改为内存映射读取, 数据内容和版本号不变
+        
+        只替换快照中该分区的引用, 正在使用旧对象的请求不受影响; 共享后端的分区本就是内存映射, 不需要转存。
+        """
+        with self._lock:
+            frame = snapshot.partitions.get(key)
+            if frame is None or key in snapshot.spilled or self._backend is not None:
+                return 0
+            try:
+                private_directory(spill_dir)
+            except OSError as e:
+                print(f"转存目录不可用: {e}")
+                return 0
+            path = os.path.join(spill_dir, f'{os.getpid()}-v{snapshot.version}-'
+                                           f'{hashlib.md5(key.encode("utf-8")).hexdigest()[:12]}.arrow')
+            SharedDatasetBackend._write_table(frame, path)
+            freed = snapshot.partition_bytes(key)
+            snapshot.partitions[key] = SharedDatasetBackend._read_table(path)
+            snapshot.spilled[key] = path
+            return freed
+    
+    def cleanup_spill_files(self, spill_dir):
+        """删除本进程当前版本不再引用的转存文件(已映射的旧文件在取消映射前仍可读取)"""
+        keep = set(self.current().spilled.values())
+        if not os.path.isdir(spill_dir):
+            return
+        for name in os.listdir(spill_dir):
+            path = os.path.join(spill_dir, name)
+            if name.startswith(f'{os.getpid()}-') and path not in keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    
+    def _write(self, build, source=None):
+        """基于最新快照生成新分区及附加表并发布新版本; source 为空时沿用当前数据来源"""
+        with self._lock:
+            if self._backend is None:
+                current = self._current
+                partitions, tables = build(current)
+                snapshot = DatasetSnapshot(current.version + 1, partitions, source or current.source, tables=tables)
+            else:
+                with self._backend.transaction():
+                    current = self.current()
+                    partitions, tables = build(current)
+                    snapshot = self._backend.write(current.version + 1, partitions, source or current.source,
+                                                   previous=current, tables=tables)
+            snapshot.inherit(current)
+            self._current = snapshot
+        memory_budget.enforce()
+        return snapshot
+    
+    @staticmethod
+    def _inherited_tables(current, assignees=None):
+        """新版本沿用的附加表; 示例数据只沿用用户上传的人员名单
+        
+        assignees 为随数据一起提供的人员名单, 只合并进维度表。
+        """
+        if current.source == 'sample':
+            tables = {k: v for k, v in current.tables.items() if k == ASSIGNEE_ROSTER_TABLE}
+        else:
+            tables = dict(current.tables)
+        if assignees is not None:
+            tables[ASSIGNEE_TABLE] = merge_assignee_roster(assignee_dimension(tables), assignees)
+        return tables
+    
+    def replace(self, partitions, source='upload', assignees=None, worklogs=None):
+        """用新的分区整体替换数据集, 新分区的处理人在发布前解析到维度表; 工作日志明细随之整体替换"""
+        def build(current):
+            resolved, tables = resolve_partition_assignees(dict(partitions), self._inherited_tables(current, assignees))
+            return resolved, publish_worklogs(tables, worklogs)
+        return self._write(build, source)
+    
+    def merge(self, partitions, source='jira_import', worklogs=None):
+        """按项目更新分区及工作日志, 保留其他项目的数据(示例数据不参与合并)"""
+        def build(current):
+            merged = {} if current.source == 'sample' else dict(current.partitions)
+            merged.update(partitions)
+            merged, tables = resolve_partition_assignees(merged, self._inherited_tables(current), keys=list(partitions))
+            return merged, publish_worklogs(tables, worklogs, projects=list(partitions))
+        return self._write(build, source)
+    
+    def update_assignees(self, roster):
+        """合并上传的人员名单, 并刷新全部分区的处理人姓名(数据来源保持不变)"""
+        def build(current):
+            tables = dict(current.tables)
+            previous = tables.get(ASSIGNEE_ROSTER_TABLE)
+            tables[ASSIGNEE_ROSTER_TABLE] = normalize_assignee_roster(
+                roster if previous is None else pd.concat([previous, roster], ignore_index=True))
+            dimension = merge_assignee_roster(assignee_dimension(tables), roster)
+            tables[ASSIGNEE_TABLE] = dimension
+            return {key: apply_assignee_names(part, dimension) for key, part in current.partitions.items()}, tables
+        return self._write(build)
+    
+    def get_data(self, projects=None):
+        """从当前快照获取数据"""
+        return self.current().get_data(projects)
+    
+    def summary(self):
+        """各项目分区的行数"""
+        return self.current().summary()
+
+dataset_store = DatasetStore(create_shared_backend())
+
+class LRUCache:
+    """线程安全的LRU缓存"""
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+    
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+    
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+    
+    def __len__(self):
+        return len(self._items)
+    
+    def values(self):
+        """当前缓存内容的副本"""
+        with self._lock:
+            return list(self._items.values())
+
+class CachedResponse:
+    """按数据版本缓存的响应正文, 压缩结果按编码方式分别缓存"""
+    def __init__(self, body, content_type, headers):
+        self.body = body
+        self.content_type = content_type
+        self.headers = headers
+        self._encoded = {}
+    
+    def encoded(self, encoding):
+        """获取指定编码的正文, 首次请求时压缩并缓存"""
+        if encoding not in self._encoded:
+            if encoding == 'br':
+                import brotli
+                self._encoded[encoding] = brotli.compress(self.body, quality=5)
+            else:
+                self._encoded[encoding] = gzip.compress(self.body, compresslevel=6)
+        return self._encoded[encoding]
+
+def estimate_bytes(value):
+    """估算对象的内存占用(字节); object字符串列按抽样的平均大小估算, 不逐个遍历"""
+    if isinstance(value, pd.DataFrame):
+        total = int(value.memory_usage(index=True, deep=False).sum())
+        for column in np.flatnonzero((value.dtypes == object).to_numpy()):
+            total += _object_column_bytes(value.iloc[:, column])
+        return total
+    if isinstance(value, (pd.Series, pd.Index)):
+        total = int(value.memory_usage(deep=False))
+        return total + (_object_column_bytes(value) if value.dtype == object else 0)
+    if isinstance(value, np.ndarray) or hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, CachedResponse):
+        return len(value.body) + sum(len(body) for body in value._encoded.values())
+    if isinstance(value, LRUCache):
+        return sum(estimate_bytes(item) for item in value.values())
+    if isinstance(value, dict):
+        return sum(estimate_bytes(k) + estimate_bytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_bytes(item) for item in value)
+    return sys.getsizeof(value)
+
+def _object_column_bytes(values):
+    """object列中各对象本身的大小(抽样估算)"""
+    if not len(values):
+        return 0
+    sample = values.iloc[::max(1, len(values) // MEMORY_SAMPLE_ROWS)]
+    return int(sample.map(sys.getsizeof).mean() * len(values))
+
+def process_memory():
+    """进程常驻内存及峰值(MB)"""
+    try:
+        with open('/proc/self/status') as f:
+            status = f.read()
+        rss, peak = (int(re.search(rf'{field}:\s+(\d+)', status).group(1)) / 1024 for field in ('VmRSS', 'VmHWM'))
+    except (OSError, AttributeError):
+        import resource
+        rss, peak = None, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {'rss_mb': round(rss, 1) if rss is not None else None, 'peak_rss_mb': round(peak, 1)}
+
+class MemoryBudget:
+    """数据集与缓存的内存统计及预算控制
+    
+    统计当前快照中进程内分区、派生数据缓存及进行中的上传。超出预算时从最久未使用的开始淘汰缓存、
+    把分区转存为内存映射的Arrow文件; 上传请求按同时进行的总量准入。
+    """
+    def __init__(self, budget_bytes=0, upload_budget_bytes=0, spill_dir=None):
+        self.budget_bytes = budget_bytes
+        self.upload_budget_bytes = upload_budget_bytes
+        self.spill_dir = spill_dir
+        self.evicted_caches = 0
+        self.spilled_partitions = 0
+        self._enforce_lock = threading.Lock()
+        self._upload_lock = threading.Lock()
+        self._uploads = {}
+    
+    def spill_available(self):
+        """分区转存需要 pyarrow, 共享后端的分区本就在磁盘上"""
+        import importlib.util
+        return bool(self.spill_dir) and dataset_store._backend is None and \
+            importlib.util.find_spec('pyarrow') is not None
+    
+    def usage(self, snapshot):
+        """当前快照的内存用量(字节): 进程内分区、内存映射分区及派生缓存"""
+        resident = mapped = 0
+        for key in snapshot.partitions:
+            if key in snapshot.spilled or dataset_store._backend is not None:
+                mapped += snapshot.partition_bytes(key)
+            else:
+                resident += snapshot.partition_bytes(key)
+        caches = sum(size for _, size, _ in snapshot.cache_usage())
+        return {'partitions': resident, 'mapped': mapped, 'caches': caches}
+    
+    def enforce(self):
+        """超出预算时按最近使用时间淘汰缓存、转存分区; 已有线程在执行时直接返回"""
+        if not self.budget_bytes or not self._enforce_lock.acquire(blocking=False):
+            return
+        try:
+            snapshot = dataset_store.current()
+            usage = self.usage(snapshot)
+            excess = usage['partitions'] + usage['caches'] - self.budget_bytes
+            if excess <= 0:
+                return
+            
+            # 派生数据缓存(可随时重新计算)与进程内分区按最近使用时间统一排序, 从最久未使用的开始
+            # 淘汰缓存或把分区转存到磁盘改为内存映射读取
+            candidates = [(used, 'cache', key, size) for key, size, used in snapshot.cache_usage()]
+            if self.spill_available():
+                candidates += [(snapshot.partition_access(key), 'partition', key, snapshot.partition_bytes(key))
+                               for key in snapshot.partitions if key not in snapshot.spilled]
+            for _, kind, key, size in sorted(candidates, key=lambda c: c[0]):
+                if excess <= 0:
+                    break
+                if kind == 'cache':
+                    snapshot.evict_cached(key)
+                    self.evicted_caches += 1
+                    excess -= size
+                else:
+                    freed = dataset_store.spill(snapshot, key, self.spill_dir)
+                    if freed:
+                        self.spilled_partitions += 1
+                        excess -= freed
+            if snapshot.spilled:
+                dataset_store.cleanup_spill_files(self.spill_dir)
+        finally:
+            self._enforce_lock.release()
+    
+    def reserve_upload(self, size):
+        """上传准入: 同时进行的上传总量超出预算时拒绝, 返回预留标识(拒绝时为 None)"""
+        with self._upload_lock:
+            in_flight = sum(self._uploads.values())
+            if self.upload_budget_bytes and in_flight + size > self.upload_budget_bytes:
+                return None
+            token = object()
+            self._uploads[token] = size
+            return token
+    
+    def release_upload(self, token):
+        with self._upload_lock:
+            self._uploads.pop(token, None)
+    
+    def fits(self, size):
+        """新数据集能否放入预算(可转存分区时总能放入)"""
+        return not self.budget_bytes or size <= self.budget_bytes or self.spill_available()
+    
+    def report(self):
+        """内存统计报告(MB)"""
+        mb = lambda n: round(n / (1 << 20), 2)
+        snapshot = dataset_store.current()
+        usage = self.usage(snapshot)
+        with self._upload_lock:
+            uploads = list(self._uploads.values())
+        return {
+            'process': process_memory(),
+            'budget': {
+                'memory_mb': mb(self.budget_bytes) if self.budget_bytes else None,
+                'max_upload_mb': mb(app.config['MAX_CONTENT_LENGTH']) if app.config.get('MAX_CONTENT_LENGTH') else None,
+                'upload_budget_mb': mb(self.upload_budget_bytes) if self.upload_budget_bytes else None,
+                'spill_dir': self.spill_dir,
+                'spill_available': self.spill_available()
+            },
+            'usage': {
+                'accounted_mb': mb(usage['partitions'] + usage['caches']),
+                'partitions_mb': mb(usage['partitions']),
+                'mapped_partitions_mb': mb(usage['mapped']),
+                'caches_mb': mb(usage['caches']),
+                'uploads_in_flight': len(uploads),
+                'uploads_in_flight_mb': mb(sum(uploads))
+            },
+            'dataset': {
+                'version': snapshot.version,
+                'source': snapshot.source,
+                'partitions': [{
+                    'project': key,
+                    'rows': len(frame),
+                    'mb': mb(snapshot.partition_bytes(key)),
+                    'storage': 'shared' if dataset_store._backend is not None else
+                               'spilled' if key in snapshot.spilled else 'memory',
+                    'idle_seconds': round(time.monotonic() - snapshot.partition_access(key), 1)
+                                    if snapshot.partition_access(key) else None
+                } for key, frame in sorted(snapshot.partitions.items())],
+                'tables_mb': {name: mb(estimate_bytes(table)) for name, table in snapshot.tables.items()}
+            },
+            'caches': [{'key': str(key), 'mb': mb(size), 'idle_seconds': round(time.monotonic() - used, 1)}
+                       for key, size, used in snapshot.cache_usage()],
+            'evictions': {'caches': self.evicted_caches, 'spilled_partitions': self.spilled_partitions}
+        }
+
+memory_budget = MemoryBudget(int(MEMORY_BUDGET_MB * (1 << 20)), int(UPLOAD_BUDGET_MB * (1 << 20)), SPILL_DIR)
+
+def _supported_encodings():
+    """可用的压缩方式(brotli 为可选依赖)"""
+    try:
+        import brotli  # noqa: F401
+        return ['br', 'gzip']
+    except ImportError:
+        return ['gzip']
+
+def dataset_etag(snapshot):
+    """由数据版本和请求URL生成ETag; 共享数据集下各worker生成的ETag一致"""
+    return f'v{snapshot.version}-{int(snapshot.created_at.timestamp() * 1000)}-' \
+           f'{hashlib.md5(request.full_path.encode("utf-8")).hexdigest()[:12]}'
+
+def dataset_conditional(view):
+    """读接口装饰器: 数据版本未变化时返回304, 否则复用本版本已生成的响应并按需压缩"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        snapshot = dataset_store.current()
+        if not snapshot.partitions:
+            # 尚无数据时由接口自行加载示例数据或返回错误
+            return view(*args, **kwargs)
+        
+        etag = dataset_etag(snapshot)
+        # Last-Modified 只精确到秒: 同一秒内可能还会发布新版本, 该秒结束前不返回也不比较 Last-Modified,
+        # 只依靠ETag, 避免持有同一秒内旧版本时间的客户端得到304
+        created_at = snapshot.created_at.astimezone()
+        last_modified = created_at.replace(microsecond=0)
+        if datetime.now().astimezone() - last_modified < timedelta(seconds=1):
+            last_modified = None
+        
+        not_modified = request.if_none_match.contains_weak(etag) if request.if_none_match else \
+            bool(last_modified and request.if_modified_since and request.if_modified_since >= last_modified)
+        if not_modified:
+            response = app.response_class(status=304)
+        else:
+            cache = snapshot.cached('responses', lambda: LRUCache(RESPONSE_CACHE_SIZE))
+            entry = cache.get(request.full_path)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                headers = {k: v for k, v in response.headers.items() if k.startswith('X-')}
+                entry = CachedResponse(response.get_data(), response.headers['Content-Type'], headers)
+                cache.put(request.full_path, entry)
+                memory_budget.enforce()
+            
+            response = app.response_class(content_type=entry.content_type)
+            response.headers.update(entry.headers)
+            encoding = request.accept_encodings.best_match(_supported_encodings()) \
+                if len(entry.body) >= COMPRESSION_MIN_BYTES else None
+            if encoding:
+                response.set_data(entry.encoded(encoding))
+                response.headers['Content-Encoding'] = encoding
+            else:
+                response.set_data(entry.body)
+        
+        response.set_etag(etag, weak=True)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        response.headers['Cache-Control'] = 'no-cache'
+        response.vary.add('Accept-Encoding')
+        return response
+    return wrapper
+
+def upload_admission(view):
+    """上传接口装饰器: 同时进行的上传总量超出预算时返回503, 避免多个大文件同时解析耗尽内存
+    
+    没有 Content-Length (分块传输)时按暂存到磁盘的文件大小计算; 单个上传超出预算时返回413。
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        size = request.content_length
+        if size is None:
+            size = sum(upload_size(f) for f in request.files.values())
+        budget = memory_budget.upload_budget_bytes
+        if budget and size > budget:
+            return jsonify({'error': f'上传约 {size / (1 << 20):.0f}MB, 超出上传预算 {budget / (1 << 20):g}MB'}), 413
+        
+        token = memory_budget.reserve_upload(size)
+        if token is None:
+            response = jsonify({'error': '当前进行中的上传过多, 请稍后重试'})
+            response.headers['Retry-After'] = '30'
+            return response, 503
+        try:
+            return view(*args, **kwargs)
+        finally:
+            memory_budget.release_upload(token)
+    return wrapper
+
+class BackgroundScheduler:
+    """进程内后台定时任务调度器
+    
+    调度线程只负责计时, 任务在独立的工作线程中执行; 同一任务上一次未结束时跳过本轮。
+    是否在执行按任务名记录, 替换正在执行的任务时, 新任务等上一轮结束后才开始, 两轮不会重叠。
+    """
+    def __init__(self, max_workers=2):
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._running = set()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='jtas-job')
+    
+    def add_job(self, name, func, interval_seconds, run_immediately=True):
+        """注册(或替换)定时任务"""
+        with self._lock:
+            self._jobs[name] = {
+                'func': func,
+                'interval': max(1, int(interval_seconds)),
+                'next_run': datetime.now() if run_immediately else datetime.now() + timedelta(seconds=interval_seconds),
+                'last_run': None,
+                'last_duration': None,
+                'last_error': None,
+                'run_count': 0
+            }
+        self._ensure_started()
+        self._wakeup.set()
+    
+    def remove_job(self, name):
+        """移除定时任务, 正在执行的一轮会继续完成"""
+        with self._lock:
+            return self._jobs.pop(name, None) is not None
+    
+    def run_now(self, name):
+        """立即在后台触发一次任务"""
+        with self._lock:
+            job = self._jobs.get(name)
+            if not job:
+                return False
+            job['next_run'] = datetime.now()
+        self._wakeup.set()
+        return True
+    
+    def status(self):
+        """任务运行状态"""
+        with self._lock:
+            return {
+                name: {
+                    'interval_seconds': job['interval'],
+                    'next_run': job['next_run'].isoformat(),
+                    'running': name in self._running,
+                    'last_run': job['last_run'].isoformat() if job['last_run'] else None,
+                    'last_duration_seconds': job['last_duration'],
+                    'last_error': job['last_error'],
+                    'run_count': job['run_count']
+                }
+                for name, job in self._jobs.items()
+            }
+    
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name='jtas-scheduler', daemon=True)
+            self._thread.start()
+    
+    def _loop(self):
+        while True:
+            now = datetime.now()
+            wait_seconds = 60
+            with self._lock:
+                for name, job in self._jobs.items():
+                    if name in self._running:
+                        continue
+                    if job['next_run'] <= now:
+                        self._running.add(name)
+                        self._executor.submit(self._execute, name, job)
+                    else:
+                        wait_seconds = min(wait_seconds, (job['next_run'] - now).total_seconds())
+            self._wakeup.wait(timeout=max(0.1, wait_seconds))
+            self._wakeup.clear()
+    
+    def _execute(self, name, job):
+        started = datetime.now()
+        error = None
+        try:
+            job['func']()
+        except Exception as e:
+            error = str(e)
+            print(f"后台任务 {name} 执行失败: {e}")
+        with self._lock:
+            self._running.discard(name)
+            job['last_run'] = started
+            job['last_duration'] = round((datetime.now() - started).total_seconds(), 3)
+            job['last_error'] = error
+            job['run_count'] += 1
+            job['next_run'] = datetime.now() + timedelta(seconds=job['interval'])
+        self._wakeup.set()
+
+scheduler = BackgroundScheduler()
+
+def partition_by_project(data):
+    """按项目拆分数据; 缺少 project_key 时从 jira_key 前缀推断"""
+    if 'project_key' not in data.columns:
+        if 'jira_key' in data.columns:
+            data['project_key'] = data['jira_key'].astype(str).str.extract(
+                r'^([A-Za-z][A-Za-z0-9_]*)-\d+$', expand=False).fillna(DEFAULT_PARTITION)
+        else:
+            data['project_key'] = DEFAULT_PARTITION
+    data['project_key'] = data['project_key'].fillna(DEFAULT_PARTITION).astype(str)
+    
+    return {key: part.reset_index(drop=True) for key, part in data.groupby('project_key', sort=False)}
+
+def _identity_codes(frame, column):
+    """处理人标识列编码为 (codes, 取值), 取值为去除首尾空格的字符串; 缺失、空值及 Unassigned 编码为 -1
+    
+    处理人数量远小于工单数, 先按取值去重, 只对不同的取值做字符串处理。
+    """
+    if column not in frame.columns:
+        return np.full(len(frame), -1, dtype=np.int64), np.array([], dtype=object)
+    codes, uniques = pd.factorize(frame[column])
+    text = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    text = text.where(~text.isin(['', UNASSIGNED_NAME, 'nan', 'None', '<NA>']), None)
+    text_codes, text_uniques = pd.factorize(text)
+    # 末尾追加 -1, 缺失值(编码 -1)直接映射为 -1; 整列为空时 text_codes 为空数组同样适用
+    codes = np.append(text_codes, -1)[codes].astype(np.int64)
+    return codes, np.asarray(text_uniques, dtype=object)
+
+def _identity_values(frame, column):
+    """处理人标识列的字符串值, 缺失为 None"""
+    codes, uniques = _identity_codes(frame, column)
+    return pd.Series(np.append(uniques, None)[codes], index=frame.index, dtype=object)
+
+def _dimension_values(dimension, column):
+    """维度表某列的 object 数组, 缺失值统一为 None(共享目录读回的列为Arrow字符串)"""
+    values = dimension[column].astype(object)
+    return values.where(values.notna(), None).to_numpy(dtype=object)
+
+def _key_lookup(dimension, column):
+    """维度表标识列 -> assignee_key, 重复值取第一个"""
+    lookup = pd.Series(dimension['assignee_key'].to_numpy(), index=_dimension_values(dimension, column))
+    lookup = lookup[lookup.index.notna()]
+    return lookup[~lookup.index.duplicated()]
+
+def _identity_keys(account, employee, name):
+    """每行处理人的唯一标识字符串, 优先级 accountId > 员工ID > 姓名"""
+    identity = pd.Series(None, index=account.index, dtype=object)
+    for prefix, values in (('n:', name), ('e:', employee), ('a:', account)):
+        present = values.notna().to_numpy()
+        identity[present] = (prefix + values[present].astype(str)).to_numpy(dtype=object)
+    return identity
+
+def empty_assignee_dimension():
+    """空的处理人维度表"""
+    dimension = pd.DataFrame({column: pd.Series(dtype=object) for column in ASSIGNEE_DIMENSION_COLUMNS})
+    dimension['assignee_key'] = dimension['assignee_key'].astype(np.int64)
+    return dimension
+
+def assignee_dimension(tables):
+    """数据版本中的处理人维度表; 只有人员名单时由名单重建"""
+    dimension = tables.get(ASSIGNEE_TABLE)
+    if dimension is not None:
+        return dimension
+    roster = tables.get(ASSIGNEE_ROSTER_TABLE)
+    if roster is not None:
+        return merge_assignee_roster(empty_assignee_dimension(), roster)
+    return empty_assignee_dimension()
+
+def match_assignees(dimension, account, employee, name):
+    """按 accountId、员工ID、姓名依次匹配维度表, 未识别的身份追加为新行
+    
+    姓名只在维度行没有冲突的 accountId/员工ID 时才视为同一人。已有行的键不会改变。
+    返回 (assignee_key 数组, 维度表), 三个标识都缺失的行为 UNASSIGNED_KEY。
+    """
+    keys = account.map(_key_lookup(dimension, 'account_id'))
+    keys = keys.fillna(employee.map(_key_lookup(dimension, 'employee_id')))
+    
+    by_name = name.map(_key_lookup(dimension, 'name')).where(keys.isna())
+    candidates = by_name.notna().to_numpy()
+    if candidates.any():
+        rows = by_name[candidates].to_numpy(dtype=np.int64)
+        conflict = np.zeros(len(rows), dtype=bool)
+        for column, values in (('account_id', account), ('employee_id', employee)):
+            known = _dimension_values(dimension, column)[rows]
+            incoming = values[candidates].to_numpy(dtype=object)
+            conflict |= pd.notna(known) & pd.notna(incoming) & (known != incoming)
+        by_name[np.flatnonzero(candidates)[conflict]] = np.nan
+        keys = keys.fillna(by_name)
+    
+    pending = (keys.isna() & (account.notna() | employee.notna() | name.notna())).to_numpy()
+    if pending.any():
+        identity = _identity_keys(account, employee, name)[pending]
+        new = pd.DataFrame({'identity': identity, 'employee_id': employee[pending], 'account_id': account[pending],
+                            'name': name[pending]}).drop_duplicates('identity')
+        new['assignee_key'] = np.arange(len(dimension), len(dimension) + len(new), dtype=np.int64)
+        new['department'] = None
+        new['skill_level'] = None
+        keys[pending] = identity.map(new.set_index('identity')['assignee_key']).to_numpy()
+        dimension = pd.concat([dimension, new[ASSIGNEE_DIMENSION_COLUMNS]], ignore_index=True)
+    
+    return keys.fillna(UNASSIGNED_KEY).to_numpy(dtype=np.int64), dimension
+
+def assignee_display_names(dimension):
+    """维度表每行的显示名: 姓名, 其次员工ID, 最后 accountId"""
+    names = _dimension_values(dimension, 'name')
+    for column in ('employee_id', 'account_id'):
+        missing = pd.isna(names)
+        names[missing] = _dimension_values(dimension, column)[missing]
+    return names
+
+def apply_assignee_names(frame, dimension):
+    """按 assignee_key 刷新工单的处理人姓名; 尚未解析过的数据重新解析"""
+    if 'assignee_key' not in frame.columns:
+        frame, _ = resolve_assignees(frame, dimension)
+        return frame
+    keys = frame['assignee_key'].to_numpy(dtype=np.int64)
+    frame = frame.copy(deep=False)
+    # 末尾追加 UNASSIGNED_NAME, UNASSIGNED_KEY(-1) 直接取到它; 维度表为空时同样适用
+    frame['assignee_name'] = np.append(assignee_display_names(dimension), UNASSIGNED_NAME)[keys]
+    return frame
+
+def _match_identities(frame, columns, dimension):
+    """按 (accountId, 员工ID, 姓名) 三列把每行匹配到维度表, 返回 (assignee_key 数组, 维度表)
+    
+    只匹配不同的组合, 再按行展开。带 accountId 的行来自JIRA, 其员工ID列实际是显示名, 按姓名匹配。
+    """
+    columns = [_identity_codes(frame, c) for c in columns]
+    combined = np.zeros(len(frame), dtype=np.int64)
+    for codes, uniques in columns:
+        combined = combined * (len(uniques) + 1) + codes + 1
+    distinct, inverse = np.unique(combined, return_inverse=True)
+    first = np.zeros(len(distinct), dtype=np.int64)
+    first[inverse] = np.arange(len(frame))
+    account, employee, name = (pd.Series(np.append(uniques, None)[codes[first]], dtype=object)
+                               for codes, uniques in columns)
+    
+    from_jira = account.notna()
+    name = name.mask(name.isna() & from_jira, employee)
+    employee = employee.mask(from_jira, None)
+    
+    keys, dimension = match_assignees(dimension, account, employee, name)
+    return keys[inverse.reshape(-1)], dimension
+
+def resolve_assignees(frame, dimension):
+    """导入时把工单的处理人解析为维度表中的 assignee_key, 并填充 assignee_name, 返回 (工单数据, 维度表)"""
+    keys, dimension = _match_identities(
+        frame, ('assignee_account_id', 'assignee_employee_id', 'assignee_name'), dimension)
+    frame = frame.copy(deep=False)
+    frame['assignee_key'] = keys
+    return apply_assignee_names(frame, dimension), dimension
+
+def resolve_partition_assignees(partitions, tables, keys=None):
+    """解析指定分区(默认全部)的处理人, 返回 (分区, 附加表); 维度表随新版本一起发布"""
+    dimension = assignee_dimension(tables)
+    for key in sorted(partitions if keys is None else keys):
+        partitions[key], dimension = resolve_assignees(partitions[key], dimension)
+    tables = dict(tables)
+    tables[ASSIGNEE_TABLE] = dimension
+    return partitions, tables
+
+def normalize_assignee_roster(roster):
+    """人员名单只保留已知列, 同一人(accountId/员工ID/姓名)的多条记录保留最后一条"""
+    roster = pd.DataFrame({column: _identity_values(roster, column) for column in ASSIGNEE_ROSTER_COLUMNS})
+    identity = _identity_keys(roster['account_id'], roster['employee_id'], roster['name'])
+    return roster[identity.notna() & ~identity.duplicated(keep='last')].reset_index(drop=True)
+
+def merge_assignee_roster(dimension, roster):
+    """把人员名单合并到维度表: 已有的人更新非空属性, 新的人追加为新行"""
+    roster = normalize_assignee_roster(roster)
+    if roster.empty:
+        return dimension
+    keys, dimension = match_assignees(dimension, roster['account_id'], roster['employee_id'], roster['name'])
+    dimension = dimension.astype({column: object for column in ASSIGNEE_ROSTER_COLUMNS})
+    for column in ASSIGNEE_ROSTER_COLUMNS:
+        present = roster[column].notna().to_numpy()
+        dimension.loc[keys[present], column] = roster.loc[present, column].to_numpy()
+    return dimension
+
+def assignee_ticket_stats(data, dimension):
+    """按 assignee_key 汇总工单数、AI分单数与处理时长, 结果与维度表逐行对齐"""
+    if 'assignee_key' not in data.columns:
+        data, dimension = resolve_assignees(data, dimension)
+    width = len(dimension)
+    keys = data['assignee_key'].to_numpy(dtype=np.int64)
+    assigned = (keys >= 0) & (keys < width)
+    keys = keys[assigned]
+    minutes = pd.to_numeric(data['actual_processing_minutes'], errors='coerce').to_numpy(dtype=float)[assigned]
+    timed = ~np.isnan(minutes)
+    ai = (data['assignment_method'] == 'AI').to_numpy(dtype=bool, na_value=False)[assigned]
+    
+    stats = dimension[ASSIGNEE_DIMENSION_COLUMNS].astype({c: object for c in ASSIGNEE_ROSTER_COLUMNS})
+    stats = stats.where(stats.notna(), None)
+    stats['name'] = assignee_display_names(dimension)
+    stats['ticket_count'] = np.bincount(keys, minlength=width)
+    stats['ai_ticket_count'] = np.bincount(keys[ai], minlength=width)
+    stats['timed_ticket_count'] = np.bincount(keys[timed], minlength=width)
+    stats['total_minutes'] = np.bincount(keys[timed], weights=minutes[timed], minlength=width)
+    return stats
+
+def assignee_breakdown(stats, by):
+    """在处理人汇总上按部门或技能等级分组, 只涉及维度表大小的数据"""
+    groups = stats.assign(**{by: stats[by].fillna('未知')}).groupby(by, sort=True)
+    summary = groups.agg(assignees=('ticket_count', lambda c: int((c > 0).sum())),
+                         ticket_count=('ticket_count', 'sum'), ai_ticket_count=('ai_ticket_count', 'sum'),
+                         timed_ticket_count=('timed_ticket_count', 'sum'), total_minutes=('total_minutes', 'sum'))
+    summary = summary[summary['ticket_count'] > 0]
+    return [{
+        by: key,
+        'assignees': int(row.assignees),
+        'ticket_count': int(row.ticket_count),
+        'ai_ticket_rate': round(row.ai_ticket_count / row.ticket_count * 100, 2),
+        'avg_processing_minutes': round(row.total_minutes / row.timed_ticket_count, 2) if row.timed_ticket_count else None
+    } for key, row in summary.iterrows()]
+
+def worklog_entry(ticket_id, log):
+    """JIRA工作日志记录 -> 明细条目"""
+    author = log.get('author') or {}
+    return {
+        'ticket_id': ticket_id,
+        'author_account_id': author.get('accountId') or author.get('name'),
+        'author_name': author.get('displayName'),
+        'started': log.get('started'),
+        'seconds': log.get('timeSpentSeconds', 0)
+    }
+
+def prepare_worklogs(worklogs):
+    """工作日志原始记录的类型转换与清洗: 丢弃缺少工单、开始时间或时长不为正的记录
+    
+    开始时间统一为 INGEST_TIMEZONE 的本地时间(不带时区), 带时区的值换算到该时区。
+    """
+    worklogs = worklogs.copy()
+    worklogs['started'] = parse_timestamps(worklogs['started'])
+    worklogs['seconds'] = pd.to_numeric(worklogs['seconds'], errors='coerce')
+    valid = (worklogs['ticket_id'].notna() & worklogs['started'].notna() & (worklogs['seconds'] > 0)).to_numpy()
+    return worklogs[valid].reset_index(drop=True)
+
+def publish_worklogs(tables, worklogs=None, projects=None):
+    """把工作日志明细合并进新版本的附加表, 返回新的附加表
+    
+    projects 为 None 时整体替换, 否则只替换这些项目的旧记录; 新记录的记录人按与工单处理人相同的规则
+    解析为 assignee_key(未识别的人追加到维度表), 只保存紧凑的列式明细。
+    """
+    tables = dict(tables)
+    previous = tables.pop(WORKLOG_TABLE, None)
+    frames = []
+    if previous is not None and projects is not None:
+        frames.append(previous[~previous['project_key'].isin(projects).to_numpy()])
+    if worklogs is not None and len(worklogs):
+        keys, tables[ASSIGNEE_TABLE] = _match_identities(worklogs, WORKLOG_AUTHOR_COLUMNS, assignee_dimension(tables))
+        frames.append(pd.DataFrame({
+            'project_key': worklogs['project_key'].to_numpy(dtype=object),
+            'ticket_id': worklogs['ticket_id'].astype(str).to_numpy(dtype=object),
+            'author_key': keys.astype(np.int32),
+            'started': worklogs['started'].to_numpy(dtype='datetime64[ns]'),
+            'seconds': worklogs['seconds'].to_numpy(dtype=np.int64).astype(np.int32)
+        }))
+    frames = [frame for frame in frames if len(frame)]
+    if frames:
+        table = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        tables[WORKLOG_TABLE] = table.astype({'project_key': 'category', 'ticket_id': 'category'})
+    return tables
+
+def records_to_frame(records, batch_size=JSON_INGEST_BATCH_SIZE):
+    """把记录迭代器按批转换为列式数据块后合并, 中间内存只与批大小有关"""
+    chunks, batch = [], []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            chunks.append(pd.DataFrame.from_records(batch))
+            batch = []
+    if batch:
+        chunks.append(pd.DataFrame.from_records(batch))
+    
+    if not chunks:
+        return pd.DataFrame()
+    return chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+
+def read_ndjson_tickets(stream, batch_size=JSON_INGEST_BATCH_SIZE):
+    """读取NDJSON(每行一个工单对象)"""
+    def records():
+        for line_number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f'第 {line_number} 行不是有效的JSON: {e.msg}')
+    return records_to_frame(records(), batch_size)
+
+def read_json_tickets(stream, batch_size=JSON_INGEST_BATCH_SIZE):
+    """流式读取JSON工单文件
+    
+    支持顶层为工单数组, 或包含 tickets 数组的对象; 两种情况下数组元素均逐个解析。
+    tickets 为按列组织的对象, 或顶层对象中没有 tickets 时, 按原有方式整体转换为DataFrame。
+    JSON格式错误时抛出带字符位置的 ValueError。
+    """
+    reader = JsonStreamReader(stream)
+    first = reader.peek()
+    if first == '[':
+        return records_to_frame(reader.iter_array(), batch_size)
+    if first != '{':
+        raise ValueError('JSON文件顶层必须是对象或数组')
+    
+    document = {}
+    for key in reader.iter_object_keys():
+        if key == 'tickets':
+            if reader.peek() == '[':
+                return records_to_frame(reader.iter_array(), batch_size)
+            return pd.DataFrame(reader.decode_value())
+        document[key] = reader.decode_value()
+    return pd.DataFrame(document)
+
+class JsonStreamReader:
+    """基于 JSONDecoder.raw_decode 的增量JSON读取器
+    
+    只在缓冲区中保留尚未解析的文本, 每次解析一个完整的值; 值被截断时再读取下一块。
+    """
+    def __init__(self, stream, chunk_chars=JSON_READ_CHUNK_CHARS):
+        self._stream = stream
+        self._chunk_chars = chunk_chars
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._offset = 0
+        self._eof = False
+    
+    def _fill(self):
+        """读取下一块文本, 并丢弃已解析部分"""
+        if self._eof:
+            return False
+        chunk = self._stream.read(self._chunk_chars)
+        if not chunk:
+            self._eof = True
+            return False
+        self._offset += self._pos
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+    
+    def position(self, pos=None):
+        """缓冲区内位置对应的文件字符位置(从0开始)"""
+        return self._offset + (self._pos if pos is None else pos)
+    
+    def peek(self):
+        """跳过空白并返回下一个字符, 到达结尾时返回空字符串"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in ' \t\r\n':
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._fill():
+                return self._buffer[self._pos:self._pos + 1]
+    
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f'JSON格式错误: 字符位置 {self.position()} 处期望 {char!r}, 实际为 {self.peek()!r}')
+        self._pos += 1
+    
+    def decode_value(self):
+        """解析下一个完整的JSON值"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # 数字等无结束符的值可能恰好在块边界被截断, 需要看到后续字符才能确认完整
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self._eof:
+                    raise ValueError(f'JSON格式错误: 字符位置 {self.position(e.pos)} 处{e.msg}')
+            if not self._fill() and self._eof and self._pos >= len(self._buffer):
+                raise ValueError('JSON文件意外结束')
+    
+    def iter_array(self):
+        """逐个产出数组元素"""
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.decode_value()
+            separator = self.peek()
+            self._pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f'JSON格式错误: 字符位置 {self.position() - 1} 处数组元素之间应为逗号, '
+                                 f'实际为 {separator!r}')
+    
+    def iter_object_keys(self):
+        """逐个产出对象的键, 调用方需在下一次迭代前读取对应的值"""
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.decode_value()
+            self.expect(':')
+            yield key
+            separator = self.peek()
+            self._pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f'JSON格式错误: 字符位置 {self.position() - 1} 处对象成员之间应为逗号, '
+                                 f'实际为 {separator!r}')
+
+# 工作簿XML中使用的正则; 元素可能带有命名空间前缀
+_XLSX_ROW_RE = re.compile(r'<(?:\w+:)?row\b[^>]*?(?:/>|>(.*?)</(?:\w+:)?row>)', re.S)
+_XLSX_CELL_RE = re.compile(
+    r'<(?:\w+:)?c\s+r="([A-Z]+)(\d+)"([^>]*?)(?:/>|>([^<]*(?:<(?!/(?:\w+:)?c>)[^<]*)*)</(?:\w+:)?c>)')
+_XLSX_VALUE_RE = re.compile(r'<(?:\w+:)?v>(.*?)</(?:\w+:)?v>', re.S)
+_XLSX_TEXT_RE = re.compile(r'<(?:\w+:)?t(?:\s[^>]*)?>(.*?)</(?:\w+:)?t>', re.S)
+_XLSX_STRING_ITEM_RE = re.compile(
+    r'<(?:\w+:)?si\b[^>]*?(?:/>|>(?:<(?:\w+:)?t(?:\s[^>]*)?>([^<]*)</(?:\w+:)?t>|(.*?))</(?:\w+:)?si>)', re.S)
+_XLSX_PHONETIC_RE = re.compile(r'<(?:\w+:)?rPh\b.*?</(?:\w+:)?rPh>', re.S)
+_XLSX_TAG_RE = r'<(?:\w+:)?{}\s([^>]*?)/?>'
+_XLSX_ATTR_RE = re.compile(r'([\w:]+)="([^"]*)"')
+# 内置的日期/时间数字格式(含中文区域格式)
+_XLSX_DATE_FORMAT_IDS = set(range(14, 23)) | set(range(27, 37)) | set(range(45, 48)) | set(range(50, 59))
+
+def _xml_attrs(text):
+    return {name.split(':')[-1]: html.unescape(value) for name, value in _XLSX_ATTR_RE.findall(text)}
+
+def read_xlsx_tickets(stream, columns=None, batch_bytes=XLSX_INGEST_BATCH_BYTES):
+    """只读、按列投影地流式读取XLSX第一个工作表
+    
+    只解析表头属于 columns(默认为已知工单字段)的列; 工作表XML每解压约 batch_bytes 字节转换一次列式数据块。
+    工作簿结构无法识别时退回 pd.read_excel, 同样只保留这些列。
+    """
+    columns = set(columns or KNOWN_TICKET_COLUMNS)
+    try:
+        with zipfile.ZipFile(stream) as workbook:
+            return XlsxStreamReader(workbook, batch_bytes).read(columns)
+    except (zipfile.BadZipFile, KeyError, ValueError) as e:
+        print(f"XLSX流式解析失败, 改用pandas读取: {e}")
+        stream.seek(0)
+        return pd.read_excel(stream, usecols=lambda name: str(name).strip() in columns)
+
+class XlsxStreamReader:
+    """XLSX工作表的只读流式读取器
+    
+    共享字符串与样式表一次性载入; 工作表XML按批解压并截断在完整的行末尾,
+    每批用一次正则扫描拆出所有单元格, 之后只对投影列按列向量化转换取值、对齐行号,
+    未投影列的单元格不会被转换。
+    """
+    def __init__(self, workbook, batch_bytes=XLSX_INGEST_BATCH_BYTES):
+        self._workbook = workbook
+        self._batch_bytes = batch_bytes
+        self._prefix = ''
+        self._kinds = {}
+        workbook_xml = self._read_text('xl/workbook.xml')
+        self.date_origin = '1904-01-01' if re.search(r'date1904="(?:1|true)"', workbook_xml) else '1899-12-30'
+        self.sheet_path = self._first_sheet_path(workbook_xml)
+        self.shared_strings = np.array(self._read_shared_strings(), dtype=object)
+        self.date_styles = self._read_date_styles()
+    
+    def _read_text(self, name):
+        return self._workbook.read(name).decode('utf-8')
+    
+    def _first_sheet_path(self, workbook_xml):
+        """工作簿中第一个工作表的路径"""
+        sheet = re.search(_XLSX_TAG_RE.format('sheet'), workbook_xml)
+        if sheet is None:
+            raise ValueError('工作簿中没有工作表')
+        relationships = {}
+        for tag in re.finditer(_XLSX_TAG_RE.format('Relationship'), self._read_text('xl/_rels/workbook.xml.rels')):
+            attrs = _xml_attrs(tag.group(1))
+            relationships[attrs.get('Id')] = attrs.get('Target', '')
+        target = relationships[_xml_attrs(sheet.group(1))['id']]
+        return target.lstrip('/') if target.startswith('/') else posixpath.normpath('xl/' + target)
+    
+    def _read_shared_strings(self):
+        try:
+            document = self._read_text('xl/sharedStrings.xml')
+        except KeyError:
+            return []
+        # 纯文本条目直接由分组取出, 富文本条目拼接各段文字(忽略注音)
+        strings = [''.join(_XLSX_TEXT_RE.findall(_XLSX_PHONETIC_RE.sub('', rich))) if rich else text
+                   for text, rich in _XLSX_STRING_ITEM_RE.findall(document)]
+        return [html.unescape(text) if '&' in text else text for text in strings]
+    
+    def _read_date_styles(self):
+        """数字格式为日期/时间的单元格样式序号"""
+        try:
+            document = self._read_text('xl/styles.xml')
+        except KeyError:
+            return set()
+        date_formats = set(_XLSX_DATE_FORMAT_IDS)
+        for tag in re.finditer(_XLSX_TAG_RE.format('numFmt'), document):
+            attrs = _xml_attrs(tag.group(1))
+            # 去掉引号内文字、方括号(颜色/条件/经过时间)和转义字符后再判断是否含日期时间占位符
+            code = re.sub(r'"[^"]*"|\[[^\]]*\]|\\.', '', attrs.get('formatCode', ''))
+            if re.search(r'[dmyhs]', code, re.I) and code.lower() != 'general':
+                date_formats.add(int(attrs.get('numFmtId', -1)))
+        
+        cell_formats = re.search(r'<(?:\w+:)?cellXfs\b[^>]*>(.*?)</(?:\w+:)?cellXfs>', document, re.S)
+        if cell_formats is None:
+            return set()
+        styles = re.finditer(_XLSX_TAG_RE.format('xf'), cell_formats.group(1))
+        return {index for index, tag in enumerate(styles)
+                if int(_xml_attrs(tag.group(1)).get('numFmtId', 0)) in date_formats}
+    
+    def iter_batches(self):
+        """按批产出工作表XML文本, 每批都截断在完整的行末尾"""
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        buffer, row_close = '', None
+        with self._workbook.open(self.sheet_path) as sheet:
+            while True:
+                chunk = sheet.read(self._batch_bytes)
+                final = not chunk
+                buffer += decoder.decode(chunk, final=final)
+                if row_close is None:
+                    sheet_data = re.search(r'<(\w+:)?sheetData\b', buffer)
+                    if sheet_data is None and not final:
+                        continue
+                    self._prefix = (sheet_data.group(1) or '') if sheet_data else ''
+                    row_close = f'</{self._prefix}row>'
+                end = buffer.rfind(row_close)
+                if end < 0 and not final:
+                    continue
+                cut = len(buffer) if final else end + len(row_close)
+                yield buffer[:cut]
+                buffer = buffer[cut:]
+                if final:
+                    return
+    
+    def _cell_kind(self, attrs):
+        """根据单元格属性判断取值类型: s 共享字符串, n 数字, d 日期, b 布尔, t 文本, e 错误"""
+        cell_type = re.search(r'\bt="(\w+)"', attrs)
+        cell_type = cell_type.group(1) if cell_type else 'n'
+        if cell_type == 'n':
+            style = re.search(r'\bs="(\d+)"', attrs)
+            return 'd' if style and int(style.group(1)) in self.date_styles else 'n'
+        if cell_type in ('inlineStr', 'str'):
+            return 't'
+        return cell_type if cell_type in ('s', 'b') else 'e'
+    
+    def _kind(self, attrs):
+        kind = self._kinds.get(attrs)
+        if kind is None:
+            kind = self._kinds[attrs] = self._cell_kind(attrs)
+        return kind
+    
+    def _cell_value(self, kind, content):
+        """单个单元格取值, 用于表头及结构不常见的单元格"""
+        if kind == 't' and '<v>' not in content:
+            text = ''.join(_XLSX_TEXT_RE.findall(content))
+            return html.unescape(text) if '&' in text else text
+        value = _XLSX_VALUE_RE.search(content)
+        if value is None or value.group(1) == '':
+            return None
+        raw = value.group(1)
+        if kind == 's':
+            return self.shared_strings[int(raw)]
+        if kind in ('n', 'd'):
+            return float(raw)
+        if kind == 'b':
+            return raw == '1'
+        if kind == 't':
+            return html.unescape(raw) if '&' in raw else raw
+        return None
+    
+    def _cell_pattern(self, letters):
+        """扫描投影列单元格的正则, 常见的 <v> 取值与内联字符串直接由分组取出, 其它列的单元格不产生匹配
+        
+        分组: 列号, 行号, 属性, 取值, 其它结构的单元格内容
+        """
+        p = re.escape(self._prefix)
+        letters = '|'.join(sorted(letters, key=len, reverse=True))
+        return re.compile(
+            f'<{p}c r="({letters})(\\d+)"([^/>]*)(?:/>|>(?:(?:<{p}v>|<{p}is><{p}t>)([^<]*)(?:</{p}v>|</{p}t></{p}is>)'
+            f'|([^<]*(?:<(?!/{p}c>)[^<]*)*))</{p}c>)')
+    
+    def _read_header(self, text):
+        """第一个非空行作为表头, 返回 (行号, {列号: 列名})"""
+        for row in _XLSX_ROW_RE.finditer(text):
+            header, row_number = {}, None
+            for letter, number, attrs, content in _XLSX_CELL_RE.findall(row.group(1) or ''):
+                name = self._cell_value(self._kind(attrs), content) if content else None
+                if name is not None:
+                    header.setdefault(letter, str(name).strip())
+                    row_number = int(number)
+            if header:
+                return row_number, header
+        return None, {}
+    
+    def read(self, columns):
+        header_row, projected, chunks = None, None, []
+        unreferenced_pattern = None
+        for text in self.iter_batches():
+            if unreferenced_pattern is None:
+                unreferenced_pattern = re.compile(f'<{re.escape(self._prefix)}c(?:[/>]|\\s+(?!r="))')
+            if unreferenced_pattern.search(text):
+                raise ValueError('单元格缺少位置引用')
+            if projected is None:
+                header_row, header = self._read_header(text)
+                if header_row is None:
+                    continue
+                # 只保留属于 columns 的列, 重复列名取第一次出现
+                projected = {}
+                for letter, name in header.items():
+                    if name in columns and name not in projected:
+                        projected[name] = letter
+                if not projected:
+                    return pd.DataFrame()
+                cell_pattern = self._cell_pattern(projected.values())
+            
+            matches = cell_pattern.findall(text)
+            if not matches:
+                continue
+            cells = pd.DataFrame.from_records(matches, columns=['letter', 'row', 'attrs', 'raw', 'other'])
+            del matches
+            letters, rows, attrs, raw, other = (cells[part].to_numpy() for part in cells.columns)
+            rows = rows.astype(np.int64)
+            letter_codes, unique_letters = pd.factorize(letters)
+            code_of = {letter: code for code, letter in enumerate(unique_letters)}
+            
+            frame = {}
+            for name, letter in projected.items():
+                mask = (letter_codes == code_of.get(letter, -1)) & (rows > header_row)
+                frame[name] = self._column_values(rows[mask], attrs[mask], raw[mask], other[mask])
+            frame = pd.DataFrame(frame).dropna(how='all')
+            if len(frame):
+                chunks.append(frame)
+        
+        if projected is None:
+            return pd.DataFrame()
+        if not chunks:
+            return pd.DataFrame(columns=list(projected))
+        data = pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+        return data.reset_index(drop=True)
+    
+    def _column_values(self, rows, attrs, raw, other):
+        """把一列单元格转换为以行号为索引的带类型Series
+        
+        全部为数字时为数值列(整数值转为int64), 全部为日期时为日期列, 否则为对象列。
+        """
+        if not len(rows):
+            return pd.Series(dtype=object)
+        codes, unique_attrs = pd.factorize(attrs)
+        kinds = np.array([self._kind(a) for a in unique_attrs], dtype=object)[codes]
+        has_raw = raw != ''
+        has_other = other != ''
+        numeric = ((kinds == 'n') | (kinds == 'd')) & has_raw
+        dates = (kinds == 'd') & has_raw
+        
+        if not has_other.any() and numeric.sum() == has_raw.sum():
+            # 纯数值/纯日期列: 直接构建带类型数组
+            numbers = np.full(len(rows), np.nan)
+            numbers[numeric] = raw[numeric].astype(np.float64)
+            column = pd.Series(numbers, index=rows)
+            if dates.any() and dates.sum() == numeric.sum():
+                return self._excel_dates(column)
+            if not dates.any():
+                if numeric.all() and (numbers % 1 == 0).all():
+                    column = column.astype(np.int64)
+                return column
+        
+        values = np.full(len(rows), None, dtype=object)
+        shared = (kinds == 's') & has_raw
+        if shared.any():
+            values[shared] = self.shared_strings[raw[shared].astype(np.int64)]
+        plain = numeric & ~dates
+        if plain.any():
+            # 与openpyxl一致: 整数值保持为int
+            numbers = raw[plain].astype(np.float64)
+            values[plain] = np.where(numbers % 1 == 0, numbers.astype(np.int64).astype(object), numbers.astype(object))
+        if dates.any():
+            values[dates] = self._excel_dates(pd.Series(raw[dates].astype(np.float64))).to_numpy(dtype=object)
+        boolean = (kinds == 'b') & has_raw
+        if boolean.any():
+            values[boolean] = raw[boolean] == '1'
+        text = (kinds == 't') & has_raw
+        if text.any():
+            strings = raw[text]
+            for i in np.flatnonzero(pd.Series(strings).str.contains('&', regex=False).to_numpy()):
+                strings[i] = html.unescape(strings[i])
+            values[text] = strings
+        # 含公式、富文本等其它结构的单元格逐个解析
+        for i in np.flatnonzero(has_other):
+            value = self._cell_value(kinds[i], other[i])
+            values[i] = self._excel_dates(pd.Series([value])).iloc[0] if kinds[i] == 'd' and value is not None else value
+        
+        column = pd.Series(values, index=rows)
+        if (kinds[column.notna().to_numpy()] == 'n').all():
+            # 只有公式等结构不常见的单元格时仍可能是纯数值列
+            column = column.astype(np.float64)
+            if column.notna().all() and (column % 1 == 0).all():
+                column = column.astype(np.int64)
+        return column
+    
+    def _excel_dates(self, serials):
+        """Excel日期序列号转换为时间戳(精确到毫秒)"""
+        return pd.to_datetime(serials, unit='D', origin=self.date_origin).dt.round('ms')
+
+def _local_timestamps(values, timezone=INGEST_TIMEZONE):
+    """带时区的时间换算为 timezone 的本地时间后去掉时区, 不带时区的原样返回"""
+    if getattr(values.dt, 'tz', None) is not None:
+        return values.dt.tz_convert(timezone).dt.tz_localize(None).copy()
+    return values.astype('datetime64[ns]')
+
+def _split_utc_offsets(text):
+    """拆出字符串末尾的UTC偏移, 返回 (去掉偏移的字符串, 偏移分钟数); 没有偏移的行为 NaN
+    
+    只看末尾7个字符(偏移及其前一位数字), 不同的取值很少, 去重后逐个解析再按编码展开。
+    """
+    codes, tails = pd.factorize(text.str[-7:])
+    widths = np.zeros(len(tails) + 1, dtype=np.int64)
+    minutes = np.full(len(tails) + 1, np.nan)
+    for i, tail in enumerate(tails):
+        match = UTC_OFFSET_PATTERN.search(tail)
+        if match:
+            offset = match.group()
+            widths[i] = len(offset)
+            minutes[i] = 0 if offset == 'Z' else \
+                (1 if offset[0] == '+' else -1) * (int(offset[1:3]) * 60 + int(offset[-2:]))
+    widths, minutes = widths[codes], minutes[codes]
+    
+    present = np.unique(widths)
+    if len(present) == 1 and present[0] > 0:
+        return text.str[:-present[0]], minutes
+    body = text.copy()
+    for width in present[present > 0]:
+        rows = widths == width
+        body.loc[rows] = text[rows].str[:-width]
+    return body, minutes
+
+def detect_timestamp_format(text):
+    """按列首部的样本检测时间字符串格式, 无法识别时返回 None"""
+    sample = text.dropna().head(TIMESTAMP_SAMPLE_SIZE * 2).astype(str).str.strip()
+    sample = sample[sample != ''].head(TIMESTAMP_SAMPLE_SIZE)
+    if sample.empty:
+        return None
+    body, minutes = _split_utc_offsets(sample)
+    suffix = '%z' if np.isnan(minutes).mean() < 0.5 else ''
+    
+    best, best_count = None, 0
+    for fmt in TIMESTAMP_FORMATS:
+        count = int(pd.to_datetime(body, format=fmt, errors='coerce').notna().sum())
+        if count > best_count:
+            best, best_count = fmt, count
+        if count == len(sample):
+            break
+    return best + suffix if best else None
+
+def _parse_mixed_timestamps(values, timezone, dayfirst=False):
+    """逐个推断格式解析, 只用于不符合列格式的少量值; 带UTC偏移与不带的值分开解析
+    
+    dayfirst 沿用列格式的日、月顺序, 同一列不会一部分按日在前、一部分按月在前解析。
+    """
+    text = values.astype(str).str.strip()
+    aware = text.str.contains(UTC_OFFSET_PATTERN).to_numpy()
+    result = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    if aware.any():
+        parsed = pd.to_datetime(text[aware], errors='coerce', format='mixed', dayfirst=dayfirst, utc=True)
+        result[aware] = _local_timestamps(parsed, timezone)
+    if not aware.all():
+        result[~aware] = pd.to_datetime(text[~aware], errors='coerce', format='mixed', dayfirst=dayfirst)
+    return result
+
+def parse_timestamps(values, fmt=None, timezone=INGEST_TIMEZONE):
+    """解析为 timezone 的本地时间(不带时区), 无法解析的为 NaT
+    
+    字符串列按检测(或给定)的格式整列解析, 末尾的UTC偏移按去重后的取值换算, 不逐个推断格式;
+    不符合该格式的少量值按相同的日、月顺序单独解析。已是时间类型的列只做时区换算。
+    """
+    values = values if isinstance(values, pd.Series) else pd.Series(values)
+    dayfirst = False
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return _local_timestamps(values, timezone)
+    if pd.api.types.infer_dtype(values, skipna=True) != 'string':
+        # Excel日期单元格等时间对象, 或混有其它类型的值
+        text = values
         try:
-            response = self.session.get(f"{self.server}/rest/api/2/issue/{issue_key}/worklog")
-            if response.status_code == 200:
-                worklog_data = response.json()
-                total_seconds = sum(log.get('timeSpentSeconds', 0) for log in worklog_data.get('worklogs', []))
-                return round(total_seconds / 60) if total_seconds > 0 else 0
-            return 0
-        except Exception as e:
-            print(f"获取工作日志失败: {e}")
-            return 0
+            result = _local_timestamps(pd.to_datetime(values, errors='coerce'), timezone)
+        except (ValueError, TypeError):
+            return _parse_mixed_timestamps(values, timezone)
+    else:
+        # 不整列去除首尾空白, 带空白的值解析失败后由逐个解析处理
+        text = values.astype(object)
+        fmt = fmt or detect_timestamp_format(text)
+        if fmt is None:
+            return _parse_mixed_timestamps(text, timezone)
+        result = _parse_formatted(text, fmt, timezone)
+        dayfirst = fmt.startswith('%d')
+    
+    remaining = (result.isna() & text.notna() & (text != '')).to_numpy()
+    if remaining.any():
+        result[remaining] = _parse_mixed_timestamps(text[remaining], timezone, dayfirst)
+    return result
+
+def _parse_formatted(text, fmt, timezone):
+    """按显式格式整列解析, 格式以 %z 结尾时先拆出UTC偏移再换算到 timezone"""
+    if fmt.endswith('%z'):
+        body, minutes = _split_utc_offsets(text)
+        result = pd.to_datetime(body, format=fmt[:-2], errors='coerce')
+        aware = ~np.isnan(minutes)
+        utc = result[aware] - pd.to_timedelta(minutes[aware], unit='m')
+        result[aware] = _local_timestamps(utc.dt.tz_localize('UTC'), timezone)
+    else:
+        result = pd.to_datetime(text, format=fmt, errors='coerce')
+    return result
+
+def prepare_tickets(data):
+    """导入数据统一的校验与清洗阶段, 上传和JIRA导入共用
+    
+    全部检查均为整列向量化运算, 耗时与行数成线性关系。
+    返回 (清洗后的数据, 校验报告); 缺少必填字段时报告中 missing_columns 非空, 数据原样返回。
+    """
+    report = {'total_rows': len(data), 'missing_columns': [], 'issues': {}}
+    
+    # 整行为空(如CSV末尾空行)
+    empty = data.isna().all(axis=1).to_numpy()
+    _record_issue(report, 'empty_rows', empty, data, 'dropped')
+    data = _drop_rows(data, empty)
+    
+    # 时间与数值类型转换, 无法解析的值置空; 时间统一为 INGEST_TIMEZONE 的本地时间
+    report['timestamp_formats'] = {}
+    for column in TICKET_TIME_COLUMNS:
+        if column in data.columns:
+            raw = data[column]
+            if pd.api.types.infer_dtype(raw, skipna=True) == 'string':
+                report['timestamp_formats'][column] = detect_timestamp_format(raw)
+            data[column] = parse_timestamps(raw, report['timestamp_formats'].get(column))
+            _record_issue(report, f'invalid_{column}', (data[column].isna() & raw.notna()).to_numpy(),
+                          data, 'set_null', [column], raw)
+    for column in TICKET_MINUTE_COLUMNS:
+        if column in data.columns:
+            raw = data[column]
+            data[column] = pd.to_numeric(raw, errors='coerce')
+            _record_issue(report, f'invalid_{column}', (data[column].isna() & raw.notna()).to_numpy(),
+                          data, 'set_null', [column], raw)
+    
+    # 智能处理时间字段：优先使用log_time，如果没有则使用actual_processing_minutes
+    if 'log_time' in data.columns and 'actual_processing_minutes' not in data.columns:
+        data['actual_processing_minutes'] = data['log_time']
+    elif 'log_time' in data.columns and 'actual_processing_minutes' in data.columns:
+        # 如果两个字段都存在，优先使用log_time（如果不为空）
+        data['actual_processing_minutes'] = data['log_time'].fillna(data['actual_processing_minutes'])
+    
+    report['missing_columns'] = [c for c in REQUIRED_TICKET_COLUMNS if c not in data.columns]
+    if report['missing_columns']:
+        report['valid_rows'] = 0
+        return data, report
+    
+    # 缺少工单ID
+    missing_id = data['ticket_id'].isna().to_numpy()
+    _record_issue(report, 'missing_ticket_id', missing_id, data, 'dropped')
+    data = _drop_rows(data, missing_id)
+    
+    # 重复工单ID, 保留最后一条(导出文件中通常为最新记录)
+    duplicated = data['ticket_id'].duplicated(keep='last').to_numpy()
+    _record_issue(report, 'duplicate_ticket_id', duplicated, data, 'dropped', ['ticket_id'])
+    data = _drop_rows(data, duplicated)
+    
+    # 负数或超出合理范围的处理时长
+    for column in TICKET_MINUTE_COLUMNS:
+        if column in data.columns:
+            minutes = data[column]
+            negative = (minutes < 0).to_numpy()
+            absurd = (minutes > MAX_PROCESSING_MINUTES).to_numpy()
+            _record_issue(report, f'negative_{column}', negative, data, 'set_null', [column])
+            _record_issue(report, f'absurd_{column}', absurd, data, 'set_null', [column])
+            data[column] = minutes.mask(negative | absurd)
+    
+    # 解决时间早于创建时间
+    if 'created_time' in data.columns and 'resolved_time' in data.columns:
+        resolved_before_created = (data['resolved_time'] < data['created_time']).to_numpy()
+        _record_issue(report, 'resolved_before_created', resolved_before_created, data, 'set_null',
+                      ['created_time', 'resolved_time'])
+        data['resolved_time'] = data['resolved_time'].mask(resolved_before_created)
+    
+    # 分单方式统一为大写, 无法识别的值保留但计入报告
+    method = data['assignment_method'].astype('string').str.strip().str.upper()
+    data['assignment_method'] = method
+    unknown_method = (~method.isin(VALID_ASSIGNMENT_METHODS)).to_numpy(dtype=bool, na_value=True)
+    _record_issue(report, 'unknown_assignment_method', unknown_method, data, 'kept', ['assignment_method'])
+    
+    data = data.reset_index(drop=True)
+    report['valid_rows'] = len(data)
+    report['dropped_rows'] = report['total_rows'] - len(data)
+    return data, report
+
+def _drop_rows(data, mask):
+    """删除掩码选中的行, 没有需要删除的行时不复制数据"""
+    return data.loc[~mask].copy() if mask.any() else data
+
+def _record_issue(report, name, mask, data, action, columns=None, raw=None):
+    """记录一类问题的数量及若干示例行"""
+    count = int(mask.sum())
+    if not count:
+        return
+    
+    columns = ['ticket_id'] + [c for c in (columns or []) if c != 'ticket_id'] if 'ticket_id' in data.columns \
+        else list(columns or data.columns)
+    samples = data.loc[mask, columns].head(VALIDATION_SAMPLE_ROWS).copy()
+    if raw is not None:
+        # 类型错误时展示原始值
+        samples[raw.name] = raw.loc[samples.index].astype(str)
+    samples.insert(0, 'row', samples.index)
+    
+    report['issues'][name] = {
+        'count': count,
+        'action': action,
+        'samples': json.loads(samples.to_json(orient='records', date_format='iso', force_ascii=False))
+    }
+
+def log_validation_report(source, report):
+    """打印校验摘要"""
+    if report['issues'] or report['missing_columns']:
+        issues = [f"{name}={issue['count']}" for name, issue in report['issues'].items()]
+        if report['missing_columns']:
+            issues.append(f"缺少字段={'/'.join(report['missing_columns'])}")
+        print(f"{source} 数据校验: {report.get('valid_rows', 0)}/{report['total_rows']} 行有效; {', '.join(issues)}")
+
+def get_request_projects():
+    """解析请求参数 ?projects=A,B 中的项目筛选"""
+    value = request.args.get('projects', '')
+    projects = [p.strip() for p in value.split(',') if p.strip()]
+    return projects or None
+
+def get_active_snapshot():
+    """当前请求使用的数据快照及项目筛选, 必要时加载示例数据
+    
+    只读取当前快照, 不等待后台导入; 导入完成前继续使用上一个版本。
+    """
+    snapshot = dataset_store.current()
+    if not snapshot.partitions:
+        load_sample_data()
+        snapshot = dataset_store.current()
+    
+    projects = get_request_projects()
+    if projects and not set(projects) & set(snapshot.partitions):
+        abort(make_response(jsonify({'error': f'未找到项目数据: {", ".join(projects)}'}), 404))
+    
+    return snapshot, projects
+
+def get_active_data():
+    """获取当前请求要分析的数据, 必要时加载示例数据"""
+    snapshot, projects = get_active_snapshot()
+    return snapshot.get_data(projects)
+
+def get_active_worklogs():
+    """当前请求要分析的工作日志明细及对应快照; 数据中没有工作日志时返回404"""
+    snapshot, projects = get_active_snapshot()
+    worklogs = snapshot.worklogs(projects)
+    if worklogs is None or worklogs.empty:
+        abort(make_response(jsonify({'error': '当前数据没有工作日志明细, 从JIRA导入的数据才包含工作日志'}), 404))
+    return snapshot, worklogs
 
 def load_sample_data():
     """加载示例数据"""
-    global jira_data, assignees_data
-    
     # 示例处理人员数据
-    assignees_data = pd.DataFrame([
+    sample_assignees = pd.DataFrame([
         {'employee_id': 'EMP001', 'name': '张三', 'department': 'IT支持', 'skill_level': 'SENIOR'},
         {'employee_id': 'EMP002', 'name': '李四', 'department': 'IT支持', 'skill_level': 'INTERMEDIATE'},
         {'employee_id': 'EMP003', 'name': '王五', 'department': '系统运维', 'skill_level': 'EXPERT'},
@@ -170,7 +2259,8 @@ def load_sample_data():
         sample_tickets.append({
             'ticket_id': f'TICKET-{i:03d}',
             'jira_key': f'PROJ-{i:04d}',
-            'summary': f'示例工单 {i}',
+            'summary': f"{['VPN无法连接', '邮箱密码重置', '打印机故障', '数据库备份失败', '服务器磁盘告警'][i % 5]} #{i}",
+            'reporter': f'用户{i % 7 + 1}',
             'assignee_employee_id': f'EMP{(i % 5) + 1:03d}',
             'priority': ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'][i % 4],
             'status': ['RESOLVED', 'CLOSED'][i % 2],
@@ -182,10 +2272,21 @@ def load_sample_data():
             'actual_processing_minutes': processing_minutes,
         })
     
-    jira_data = pd.DataFrame(sample_tickets)
-    jira_data['created_time'] = pd.to_datetime(jira_data['created_time'])
-    jira_data['assigned_time'] = pd.to_datetime(jira_data['assigned_time'])
-    jira_data['resolved_time'] = pd.to_datetime(jira_data['resolved_time'])
+    sample_data, _ = prepare_tickets(pd.DataFrame(sample_tickets))
+    partitions = partition_by_project(sample_data)
+    
+    # 示例工作日志: 每个工单由处理人分1~3次记录, 从分派后开始, 合计为处理时长
+    counts = 1 + np.arange(len(sample_data)) % 3
+    rows = np.repeat(np.arange(len(sample_data)), counts)
+    part = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    sample_worklogs = prepare_worklogs(pd.DataFrame({
+        'project_key': sample_data['project_key'].to_numpy()[rows],
+        'ticket_id': sample_data['ticket_id'].to_numpy()[rows],
+        'author_employee_id': sample_data['assignee_employee_id'].to_numpy()[rows],
+        'started': sample_data['assigned_time'].to_numpy()[rows] + pd.to_timedelta(part * 90 + 30, unit='m'),
+        'seconds': sample_data['actual_processing_minutes'].to_numpy()[rows] * 60 // counts[rows]
+    }))
+    dataset_store.replace(partitions, source='sample', assignees=sample_assignees, worklogs=sample_worklogs)
 
 def calculate_efficiency_metrics(data):
     """计算效率指标"""
@@ -247,34 +2348,30 @@ def calculate_efficiency_metrics(data):
     }
 
 @app.route('/')
+@dataset_conditional
 def dashboard():
     """主页仪表板"""
-    global jira_data
-    if jira_data is None:
-        load_sample_data()
-    
-    metrics = calculate_efficiency_metrics(jira_data)
+    metrics = calculate_efficiency_metrics(get_active_data())
     return render_template('dashboard.html', metrics=metrics)
 
 @app.route('/api/metrics')
+@dataset_conditional
 def api_metrics():
     """API: 获取效率指标"""
-    global jira_data
-    if jira_data is None:
-        load_sample_data()
-    
-    metrics = calculate_efficiency_metrics(jira_data)
+    metrics = calculate_efficiency_metrics(get_active_data())
     return jsonify(metrics)
 
 @app.route('/api/charts/comparison')
+@dataset_conditional
 def api_chart_comparison():
     """API: AI vs 人工分单对比图表"""
-    global jira_data
-    if jira_data is None:
-        load_sample_data()
+    import plotly.express as px
+    from plotly.utils import PlotlyJSONEncoder
+    
+    data = get_active_data()
     
     # 按分单方式分组统计
-    comparison = jira_data.groupby('assignment_method').agg({
+    comparison = data.groupby('assignment_method').agg({
         'actual_processing_minutes': ['mean', 'count'],
         'ticket_id': 'count'
     }).round(2)
@@ -295,36 +2392,42 @@ def api_chart_comparison():
     return jsonify(graphJSON)
 
 @app.route('/api/charts/workload')
+@dataset_conditional
 def api_chart_workload():
     """API: 工作负载分布图表"""
-    global jira_data, assignees_data
-    if jira_data is None or assignees_data is None:
-        load_sample_data()
+    import plotly.express as px
+    from plotly.utils import PlotlyJSONEncoder
+    
+    group_by = request.args.get('group_by', 'assignee')
+    if group_by not in ('assignee', 'department', 'skill_level'):
+        return jsonify({'error': 'group_by 仅支持 assignee、department、skill_level'}), 400
     
-    # 按处理人员统计工单数量
-    workload = jira_data['assignee_employee_id'].value_counts().reset_index()
-    workload.columns = ['employee_id', 'ticket_count']
+    snapshot, projects = get_active_snapshot()
+    data = snapshot.get_data(projects)
     
-    # 合并处理人员姓名
-    workload = workload.merge(assignees_data[['employee_id', 'name']], 
-                             left_on='employee_id', right_on='employee_id', how='left')
+    # 工单在导入时已解析为 assignee_key, 按键计数后直接取维度表中的姓名/部门/技能等级
+    stats = assignee_ticket_stats(data, snapshot.assignees())
+    if group_by == 'assignee':
+        workload = stats.loc[stats['ticket_count'] > 0, ['name', 'ticket_count']]
+    else:
+        workload = pd.DataFrame(assignee_breakdown(stats, group_by)).rename(columns={group_by: 'name'})
     
     # 创建工作负载图表
+    titles = {'assignee': '处理人员', 'department': '部门', 'skill_level': '技能等级'}
     fig = px.pie(
         workload, 
         values='ticket_count', 
         names='name',
-        title='处理人员工作负载分布'
+        title=f'{titles[group_by]}工作负载分布'
     )
     
     graphJSON = json.dumps(fig, cls=PlotlyJSONEncoder)
     return jsonify(graphJSON)
 
 @app.route('/api/upload', methods=['POST'])
+@upload_admission
 def api_upload():
     """API: 上传JIRA数据文件"""
-    global jira_data
-    
     if 'file' not in request.files:
         return jsonify({'error': '没有选择文件'}), 400
     
@@ -333,134 +2436,166 @@ def api_upload():
         return jsonify({'error': '没有选择文件'}), 400
     
     try:
-        # 根据文件类型读取数据，处理编码问题
-        if file.filename.endswith('.csv'):
-            # 保存原始文件内容
-            file.seek(0)
-            file_content = file.read()
-            
-            # 尝试多种编码方式读取CSV文件
-            encodings_to_try = [
-                'utf-8', 'utf-8-sig', 
-                'gbk', 'gb2312', 'gb18030', 
-                'big5', 'ascii',
-                'iso-8859-1', 'cp1252', 'latin1',
-                'windows-1252', 'ansi'
-            ]
-            
-            jira_data = None
-            last_error = None
-            
-            for encoding in encodings_to_try:
-                try:
-                    # 使用字节内容创建StringIO对象
-                    import io
-                    decoded_content = file_content.decode(encoding)
-                    csv_file = io.StringIO(decoded_content)
-                    jira_data = pd.read_csv(csv_file)
-                    print(f"成功使用 {encoding} 编码读取文件")
-                    break
-                except (UnicodeDecodeError, UnicodeError) as e:
-                    last_error = f"{encoding}: {str(e)}"
-                    continue
-                except Exception as e:
-                    last_error = f"{encoding}: {str(e)}"
-                    # 如果不是编码错误，继续尝试其他编码
-                    continue
-            
-            if jira_data is None:
-                # 尝试使用chardet自动检测编码
-                try:
-                    import chardet
-                    detected = chardet.detect(file_content)
-                    detected_encoding = detected['encoding']
-                    confidence = detected['confidence']
-                    
-                    if detected_encoding and confidence > 0.7:
-                        print(f"检测到编码: {detected_encoding} (置信度: {confidence:.2f})")
-                        try:
-                            import io
-                            decoded_content = file_content.decode(detected_encoding)
-                            csv_file = io.StringIO(decoded_content)
-                            jira_data = pd.read_csv(csv_file)
-                            print(f"成功使用检测到的编码 {detected_encoding} 读取文件")
-                        except Exception as e:
-                            print(f"使用检测到的编码失败: {e}")
-                except ImportError:
-                    print("chardet库未安装，跳过自动编码检测")
-                except Exception as e:
-                    print(f"自动编码检测失败: {e}")
-            
-            if jira_data is None:
-                # 最后尝试：使用多种方法忽略错误字符
-                fallback_methods = [
-                    ('utf-8', 'ignore'),
-                    ('gbk', 'ignore'), 
-                    ('gb18030', 'ignore'),
-                    ('iso-8859-1', 'ignore'),
-                    ('cp1252', 'replace')
+        if not file.filename.endswith(UPLOAD_FORMATS):
+            return jsonify({'error': '不支持的文件格式'}), 400
+        
+        # 解析后的数据集不小于文件本身, 文件已超出内存预算时不再解析
+        file_size = upload_size(file)
+        if not memory_budget.fits(file_size):
+            return jsonify({
+                'error': f'文件约 {file_size / (1 << 20):.0f}MB, 超出内存预算 {memory_budget.budget_bytes / (1 << 20):g}MB'
+            }), 413
+        
+        # 相同内容的文件: 已是当前数据集时直接返回当前版本, 否则读取缓存的规范化数据, 跳过解析
+        cache_key = upload_cache.key(upload_digest(file), file.filename)
+        source = f'upload:{cache_key[:16]}'
+        cached = upload_cache.get(cache_key)
+        snapshot = dataset_store.current()
+        if cached is not None and snapshot.source == source:
+            return jsonify({
+                'success': True,
+                'message': f'文件内容未变化, 沿用当前数据 {cached["rows"]} 条记录',
+                'rows': cached['rows'],
+                'columns': cached['columns'],
+                'validation': cached['validation'],
+                'version': snapshot.version,
+                'cached': True
+            })
+        
+        data = upload_cache.load(cache_key) if cached is not None else None
+        from_cache = data is not None
+        if from_cache:
+            report = cached['validation']
+            print(f"{file.filename} 命中上传缓存, 跳过解析")
+        else:
+            # 根据文件类型读取数据，处理编码问题
+            if file.filename.endswith('.csv'):
+                # 直接从上传流(较大的文件由Werkzeug暂存在磁盘)按编码解析, 不在内存中保留原始字节及解码后的副本
+                stream = file.stream
+                
+                # 尝试多种编码方式读取CSV文件
+                encodings_to_try = [
+                    'utf-8', 'utf-8-sig', 
+                    'gbk', 'gb2312', 'gb18030', 
+                    'big5', 'ascii',
+                    'iso-8859-1', 'cp1252', 'latin1',
+                    'windows-1252', 'ansi'
                 ]
                 
-                for encoding, error_handling in fallback_methods:
+                data = None
+                last_error = None
+                
+                for encoding in encodings_to_try:
                     try:
-                        import io
-                        decoded_content = file_content.decode(encoding, errors=error_handling)
-                        csv_file = io.StringIO(decoded_content)
-                        jira_data = pd.read_csv(csv_file)
-                        print(f"使用 {encoding} ({error_handling} 错误字符) 成功读取文件")
+                        stream.seek(0)
+                        data = pd.read_csv(stream, encoding=encoding)
+                        print(f"成功使用 {encoding} 编码读取文件")
                         break
+                    except (UnicodeDecodeError, UnicodeError) as e:
+                        last_error = f"{encoding}: {str(e)}"
+                        continue
                     except Exception as e:
+                        last_error = f"{encoding}: {str(e)}"
+                        # 如果不是编码错误，继续尝试其他编码
                         continue
+                
+                if data is None:
+                    # 尝试使用chardet自动检测编码
+                    try:
+                        import chardet
+                        stream.seek(0)
+                        detected = chardet.detect(stream.read(CHARDET_SAMPLE_BYTES))
+                        detected_encoding = detected['encoding']
+                        confidence = detected['confidence']
+                        
+                        if detected_encoding and confidence > 0.7:
+                            print(f"检测到编码: {detected_encoding} (置信度: {confidence:.2f})")
+                            try:
+                                stream.seek(0)
+                                data = pd.read_csv(stream, encoding=detected_encoding)
+                                print(f"成功使用检测到的编码 {detected_encoding} 读取文件")
+                            except Exception as e:
+                                print(f"使用检测到的编码失败: {e}")
+                    except ImportError:
+                        print("chardet库未安装，跳过自动编码检测")
+                    except Exception as e:
+                        print(f"自动编码检测失败: {e}")
+                
+                if data is None:
+                    # 最后尝试：使用多种方法忽略错误字符
+                    fallback_methods = [
+                        ('utf-8', 'ignore'),
+                        ('gbk', 'ignore'), 
+                        ('gb18030', 'ignore'),
+                        ('iso-8859-1', 'ignore'),
+                        ('cp1252', 'replace')
+                    ]
+                    
+                    for encoding, error_handling in fallback_methods:
+                        try:
+                            stream.seek(0)
+                            data = pd.read_csv(stream, encoding=encoding, encoding_errors=error_handling)
+                            print(f"使用 {encoding} ({error_handling} 错误字符) 成功读取文件")
+                            break
+                        except Exception as e:
+                            continue
+                
+                if data is None:
+                    return jsonify({
+                        'error': f'无法读取CSV文件，已尝试多种编码方式。建议: 1)用Excel打开文件，另存为UTF-8编码的CSV；2)检查文件是否损坏；3)确认文件确实是CSV格式。详细错误: {last_error}'
+                    }), 400
             
-            if jira_data is None:
+            elif file.filename.endswith('.xlsx'):
+                # 只读流式解析, 只读取已知工单字段
+                data = read_xlsx_tickets(file.stream)
+            else:
+                try:
+                    if file.filename.endswith('.json'):
+                        # 增量解析 tickets 数组, 按批构建数据块, 不一次性加载整个文档
+                        data = read_json_tickets(io.TextIOWrapper(file.stream, encoding='utf-8-sig'))
+                    else:
+                        data = read_ndjson_tickets(io.TextIOWrapper(file.stream, encoding='utf-8-sig'))
+                except (ValueError, UnicodeDecodeError) as e:
+                    return jsonify({'error': f'无法解析JSON文件: {e}'}), 400
+            
+            data, report = prepare_tickets(data)
+            log_validation_report(file.filename, report)
+            if report['missing_columns']:
                 return jsonify({
-                    'error': f'无法读取CSV文件，已尝试多种编码方式。建议: 1)用Excel打开文件，另存为UTF-8编码的CSV；2)检查文件是否损坏；3)确认文件确实是CSV格式。详细错误: {last_error}'
+                    'error': f'缺少必填字段: {", ".join(report["missing_columns"])}',
+                    'validation': report
                 }), 400
-                
-        elif file.filename.endswith('.xlsx'):
-            jira_data = pd.read_excel(file)
-        elif file.filename.endswith('.json'):
-            data = json.load(file)
-            if 'tickets' in data:
-                jira_data = pd.DataFrame(data['tickets'])
-            else:
-                jira_data = pd.DataFrame(data)
-        else:
-            return jsonify({'error': '不支持的文件格式'}), 400
+            if data.empty:
+                return jsonify({'error': '没有有效的工单记录', 'validation': report}), 400
+            upload_cache.put(cache_key, data, report)
+        
+        size = estimate_bytes(data)
+        if not memory_budget.fits(size):
+            return jsonify({
+                'error': f'数据集约 {size / (1 << 20):.0f}MB, 超出内存预算 {memory_budget.budget_bytes / (1 << 20):g}MB',
+                'validation': report
+            }), 413
         
-        # 数据预处理
-        if 'created_time' in jira_data.columns:
-            jira_data['created_time'] = pd.to_datetime(jira_data['created_time'])
-        if 'assigned_time' in jira_data.columns:
-            jira_data['assigned_time'] = pd.to_datetime(jira_data['assigned_time'])
-        if 'resolved_time' in jira_data.columns:
-            jira_data['resolved_time'] = pd.to_datetime(jira_data['resolved_time'])
-        
-        # 智能处理时间字段：优先使用log_time，如果没有则使用actual_processing_minutes
-        if 'log_time' in jira_data.columns and 'actual_processing_minutes' not in jira_data.columns:
-            jira_data['actual_processing_minutes'] = jira_data['log_time']
-        elif 'log_time' in jira_data.columns and 'actual_processing_minutes' in jira_data.columns:
-            # 如果两个字段都存在，优先使用log_time（如果不为空）
-            jira_data['actual_processing_minutes'] = jira_data['log_time'].fillna(jira_data['actual_processing_minutes'])
+        snapshot = dataset_store.replace(partition_by_project(data), source=source)
         
         return jsonify({
             'success': True,
-            'message': f'成功上传 {len(jira_data)} 条记录',
-            'rows': len(jira_data),
-            'columns': list(jira_data.columns)
+            'message': f'成功上传 {len(data)} 条记录',
+            'rows': len(data),
+            'columns': list(data.columns),
+            'validation': report,
+            'version': snapshot.version,
+            'cached': from_cache
         })
-        
+    
     except Exception as e:
         return jsonify({'error': f'文件处理失败: {str(e)}'}), 500
 
 @app.route('/api/efficiency/analysis')
+@dataset_conditional
 def api_efficiency_analysis():
     """API: 详细的效率分析对比"""
-    global jira_data
-    if jira_data is None:
-        load_sample_data()
-    
-    metrics = calculate_efficiency_metrics(jira_data)
+    metrics = calculate_efficiency_metrics(get_active_data())
     
     # 构建详细的效率分析报告
     analysis_report = {
@@ -520,101 +2655,670 @@ def api_jira_connect():
             })
         else:
             return jsonify({'error': message}), 400
-            
+    
     except Exception as e:
         return jsonify({'error': f'连接失败: {str(e)}'}), 500
 
-@app.route('/api/jira/projects')
-def api_jira_projects():
-    """API: 获取JIRA项目列表"""
-    global jira_connection
+@app.route('/api/jira/projects')
+def api_jira_projects():
+    """API: 获取JIRA项目列表"""
+    global jira_connection
+    
+    if not jira_connection:
+        return jsonify({'error': '请先连接JIRA服务器'}), 400
+    
+    try:
+        projects = jira_connection.get_projects()
+        return jsonify({
+            'success': True,
+            'projects': projects,
+            'count': len(projects)
+        })
+    except Exception as e:
+        return jsonify({'error': f'获取项目列表失败: {str(e)}'}), 500
+
+@app.route('/api/jira/import/<project_key>')
+def api_jira_import(project_key):
+    """API: 从JIRA导入项目数据"""
+    global jira_connection
+    
+    if not jira_connection:
+        return jsonify({'error': '请先连接JIRA服务器'}), 400
+    
+    max_results = request.args.get('max_results', 1000, type=int)
+    # merge=true 时保留其他项目已导入的数据
+    merge = request.args.get('merge', 'false').lower() == 'true'
+    
+    try:
+        issues = jira_connection.get_project_issues(project_key, max_results)
+        
+        if not issues:
+            return jsonify({'error': '未找到工单数据或项目不存在'}), 404
+        
+        # 转换为DataFrame并校验清洗
+        partitions, reports, worklogs = prepare_project_partitions({project_key: issues})
+        if not partitions:
+            return jsonify({'error': '没有有效的工单记录', 'validation': reports[project_key]}), 400
+        if merge:
+            dataset_store.merge(partitions, worklogs=worklogs)
+        else:
+            dataset_store.replace(partitions, source='jira_import', worklogs=worklogs)
+        
+        return jsonify({
+            'success': True,
+            'message': f'成功导入 {len(issues)} 条工单数据',
+            **summarize_imported_issues(project_key, issues),
+            'validation': reports[project_key]
+        })
+    
+    except Exception as e:
+        return jsonify({'error': f'导入数据失败: {str(e)}'}), 500
+
+def positive_number(data, name, default, cast=int):
+    """请求体中的正数参数, 缺省时为 default; 不是有限正数时抛出 ValueError, 错误信息可直接返回给客户端"""
+    value = data.get(name, default)
+    try:
+        number = cast(value)
+    except (TypeError, ValueError, OverflowError):
+        number = None
+    if number is None or isinstance(value, bool) or not np.isfinite(number) or number <= 0:
+        raise ValueError(f'{name} 必须是大于0的数字')
+    return number
+
+def boolean_flag(data, name, default):
+    """请求体中的布尔参数, 缺省时为 default; 只接受JSON布尔值("false" 等字符串会被误当作真), 否则抛出 ValueError"""
+    value = data.get(name, default)
+    if not isinstance(value, bool):
+        raise ValueError(f'{name} 必须是布尔值 true 或 false')
+    return value
+
+@app.route('/api/jira/import', methods=['POST'])
+def api_jira_import_projects():
+    """API: 并发导入多个JIRA项目, 按项目分区合并到当前数据集"""
+    global jira_connection
+    
+    if not jira_connection:
+        return jsonify({'error': '请先连接JIRA服务器'}), 400
+    
+    data = request.get_json() or {}
+    project_keys = [k for k in dict.fromkeys(data.get('project_keys') or []) if k]
+    if not project_keys:
+        return jsonify({'error': '请提供要导入的项目列表: project_keys'}), 400
+    
+    try:
+        max_results = positive_number(data, 'max_results', 1000)
+        max_workers = positive_number(data, 'max_workers', 4)
+        # 默认与已有项目数据合并, replace=true 时整体替换
+        replace = boolean_flag(data, 'replace', False)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        results = jira_connection.get_projects_issues(project_keys, max_results, max_workers)
+        
+        partitions, reports, worklogs = prepare_project_partitions(results)
+        if not partitions:
+            return jsonify({'error': '未找到工单数据或项目不存在', 'validation': reports}), 404
+        
+        if replace:
+            dataset_store.replace(partitions, source='jira_import', worklogs=worklogs)
+        else:
+            dataset_store.merge(partitions, worklogs=worklogs)
+        
+        total = sum(len(part) for part in partitions.values())
+        return jsonify({
+            'success': True,
+            'message': f'成功导入 {len(partitions)} 个项目共 {total} 条工单数据',
+            'projects': {key: {**summarize_imported_issues(key, results[key]), 'validation': reports[key]}
+                         for key in partitions},
+            'failed_projects': [key for key in project_keys if key not in partitions],
+            'loaded_projects': dataset_store.summary()
+        })
+    
+    except Exception as e:
+        return jsonify({'error': f'导入数据失败: {str(e)}'}), 500
+
+@app.route('/api/projects')
+def api_projects():
+    """API: 当前数据集中已加载的项目分区"""
+    snapshot = dataset_store.current()
+    return jsonify({
+        'success': True,
+        'version': snapshot.version,
+        'source': snapshot.source,
+        'updated_at': snapshot.created_at.isoformat(),
+        'projects': snapshot.summary()
+    })
+
+@app.route('/api/assignees')
+@dataset_conditional
+def api_assignees():
+    """API: 处理人维度表及按部门、技能等级汇总的工单数与平均处理时长"""
+    snapshot, projects = get_active_snapshot()
+    stats = assignee_ticket_stats(snapshot.get_data(projects), snapshot.assignees())
+    stats['avg_processing_minutes'] = (stats['total_minutes'] / stats['timed_ticket_count'].where(
+        stats['timed_ticket_count'] > 0)).round(2)
+    assignees = stats.drop(columns=['timed_ticket_count', 'total_minutes'])
+    return jsonify({
+        'success': True,
+        'assignees': json.loads(assignees.to_json(orient='records', force_ascii=False)),
+        'by_department': assignee_breakdown(stats, 'department'),
+        'by_skill_level': assignee_breakdown(stats, 'skill_level')
+    })
+
+@app.route('/api/assignees/upload', methods=['POST'])
+@upload_admission
+def api_assignees_upload():
+    """API: 上传人员名单(employee_id、name、department、skill_level, 可选 account_id)"""
+    file = request.files.get('file')
+    if file is None or file.filename == '':
+        return jsonify({'error': '没有选择文件'}), 400
+    
+    try:
+        if file.filename.endswith('.csv'):
+            content = file.read()
+            roster = None
+            for encoding in ('utf-8-sig', 'gb18030'):
+                try:
+                    roster = pd.read_csv(io.StringIO(content.decode(encoding)), dtype=str)
+                    break
+                except UnicodeDecodeError:
+                    continue
+            if roster is None:
+                return jsonify({'error': '无法识别CSV文件编码, 请另存为UTF-8编码'}), 400
+        elif file.filename.endswith('.xlsx'):
+            roster = read_xlsx_tickets(file.stream, columns=ASSIGNEE_ROSTER_COLUMNS)
+        elif file.filename.endswith('.json'):
+            try:
+                roster = read_json_tickets(io.TextIOWrapper(file.stream, encoding='utf-8-sig'))
+            except (ValueError, UnicodeDecodeError) as e:
+                return jsonify({'error': f'无法解析JSON文件: {e}'}), 400
+        else:
+            return jsonify({'error': '不支持的文件格式'}), 400
+        
+        if not {'employee_id', 'account_id', 'name'} & set(roster.columns):
+            return jsonify({'error': '人员名单至少需要 employee_id、account_id 或 name 之一'}), 400
+        roster = normalize_assignee_roster(roster)
+        
+        # 数据集为空时先加载示例数据, 名单合并进当前版本的维度表
+        get_active_data()
+        snapshot = dataset_store.update_assignees(roster)
+        return jsonify({
+            'success': True,
+            'message': f'成功导入 {len(roster)} 名处理人员',
+            'version': snapshot.version,
+            'assignees': len(snapshot.assignees())
+        })
+    except Exception as e:
+        return jsonify({'error': f'导入人员名单失败: {str(e)}'}), 500
+
+# 工单查询接口的保留参数, 其余参数均视为列筛选条件
+TICKET_QUERY_RESERVED_PARAMS = {'fields', 'sort', 'limit', 'cursor', 'format', 'projects'}
+TICKET_QUERY_MAX_LIMIT = 1000
+TICKET_FILTER_OPERATORS = ('gte', 'lte', 'gt', 'lt', 'contains')
+
+@app.route('/api/tickets')
+@dataset_conditional
+def api_tickets():
+    """API: 工单明细查询(游标分页、列投影、排序与筛选)
+    
+    参数:
+        fields: 逗号分隔的返回列, 默认全部
+        sort: 排序列, 前缀 - 表示降序, 默认 ticket_id
+        limit: 每页行数, 默认100, 最大1000
+        cursor: 上一页返回的 next_cursor
+        format: json(默认, columns + rows 紧凑格式) 或 ndjson
+        <列名>=A,B 等值筛选; <列名>__gte/__lte/__gt/__lt/__contains=值 范围及包含筛选
+    """
+    snapshot, projects = get_active_snapshot()
+    data = snapshot.get_data(projects)
+    
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()] or list(data.columns)
+    unknown = [f for f in fields if f not in data.columns]
+    if unknown:
+        return jsonify({'error': f'未知字段: {", ".join(unknown)}'}), 400
+    
+    sort = request.args.get('sort', 'ticket_id')
+    descending = sort.startswith('-')
+    sort_column = sort.lstrip('-')
+    if sort_column not in data.columns:
+        return jsonify({'error': f'无法排序, 未知字段: {sort_column}'}), 400
+    
+    limit = min(max(request.args.get('limit', 100, type=int), 1), TICKET_QUERY_MAX_LIMIT)
+    output_format = request.args.get('format', 'json')
+    if output_format not in ('json', 'ndjson'):
+        return jsonify({'error': '不支持的输出格式, 可选: json, ndjson'}), 400
+    
+    try:
+        mask = build_ticket_filter_mask(data, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    index = snapshot.cached(('ticket_sort', tuple(sorted(projects or [])), sort_column, descending),
+                            lambda: build_ticket_sort_index(data, sort_column, descending))
+    
+    start = 0
+    if request.args.get('cursor'):
+        try:
+            start = index.seek(decode_ticket_cursor(request.args['cursor']))
+        except (ValueError, TypeError, KeyError):
+            return jsonify({'error': '无效的分页游标'}), 400
+    
+    # 只扫描游标之后满足筛选条件的行
+    remaining = index.order[start:]
+    if mask is not None:
+        remaining = remaining[mask[remaining]]
+    rows = remaining[:limit + 1]
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    page = data.iloc[rows]
+    next_cursor = index.cursor_for(data, rows[-1]) if has_more else None
+    
+    if output_format == 'ndjson':
+        body = page[fields].to_json(orient='records', lines=True, date_format='iso', force_ascii=False)
+        response = make_response(body + ('\n' if body and not body.endswith('\n') else ''))
+        response.headers['Content-Type'] = 'application/x-ndjson; charset=utf-8'
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+    
+    body = '{{"version":{},"columns":{},"rows":{},"count":{},"total":{},"next_cursor":{}}}'.format(
+        snapshot.version,
+        json.dumps(fields, ensure_ascii=False),
+        page[fields].to_json(orient='values', date_format='iso', force_ascii=False),
+        len(rows),
+        int(mask.sum()) if mask is not None else len(data),
+        json.dumps(next_cursor)
+    )
+    response = make_response(body)
+    response.headers['Content-Type'] = 'application/json; charset=utf-8'
+    return response
+
+def build_ticket_filter_mask(data, args):
+    """根据查询参数构建筛选掩码(整列向量化比较), 无筛选条件时返回 None"""
+    mask = None
+    for param, value in args.items(multi=True):
+        if param in TICKET_QUERY_RESERVED_PARAMS:
+            continue
+        
+        column, _, operator = param.partition('__')
+        if column not in data.columns:
+            raise ValueError(f'无法筛选, 未知字段: {column}')
+        if operator and operator not in TICKET_FILTER_OPERATORS:
+            raise ValueError(f'不支持的筛选操作: {operator}')
+        
+        series = data[column]
+        if operator == 'contains':
+            condition = series.astype(str).str.contains(value, case=False, regex=False, na=False)
+        elif operator:
+            bound = _coerce_filter_values(series, [value])[0]
+            condition = {'gte': series >= bound, 'lte': series <= bound,
+                         'gt': series > bound, 'lt': series < bound}[operator]
+        else:
+            condition = series.isin(_coerce_filter_values(series, value.split(',')))
+        
+        condition = condition.to_numpy(dtype=bool, na_value=False)
+        mask = condition if mask is None else mask & condition
+    return mask
+
+def _coerce_filter_values(series, values):
+    """把查询参数中的字符串转换为与列相同的类型"""
+    try:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            parsed = parse_timestamps(pd.Series(values, dtype=object))
+            if parsed.isna().any():
+                raise ValueError
+            if getattr(series.dt, 'tz', None) is not None:
+                parsed = parsed.dt.tz_localize(INGEST_TIMEZONE).dt.tz_convert(series.dt.tz)
+            return list(parsed)
+        if pd.api.types.is_numeric_dtype(series):
+            return list(pd.to_numeric(values))
+    except (ValueError, TypeError):
+        raise ValueError(f'筛选值类型与字段 {series.name} 不匹配: {",".join(values)}')
+    return values
+
+class TicketSortIndex:
+    """工单排序索引: 按 (排序列, ticket_id) 排好的行号及对应的可比较键, 用于游标分页定位"""
+    def __init__(self, sort_column, order, keys, tiebreak, key_encoder, tiebreak_encoder, tiebreak_column):
+        self.sort_column = sort_column
+        self.order = order
+        self.sorted_keys = keys[order]
+        self.sorted_tiebreak = tiebreak[order]
+        self._key_encoder = key_encoder
+        self._tiebreak_encoder = tiebreak_encoder
+        self._tiebreak_column = tiebreak_column
+    
+    def cursor_for(self, data, row):
+        """根据一页最后一行生成游标(记录原始值, 数据版本变化后仍可定位)"""
+        value = data[self.sort_column].iloc[row]
+        tiebreak = data[self._tiebreak_column].iloc[row] if self._tiebreak_column else int(row)
+        return encode_ticket_cursor([_cursor_value(value), _cursor_value(tiebreak)])
+    
+    def seek(self, cursor):
+        """返回游标之后第一行在排序结果中的位置"""
+        key, exact = self._key_encoder(cursor[0])
+        if not exact:
+            return int(np.searchsorted(self.sorted_keys, key, side='right'))
+        
+        low = int(np.searchsorted(self.sorted_keys, key, side='left'))
+        high = int(np.searchsorted(self.sorted_keys, key, side='right'))
+        tiebreak, _ = self._tiebreak_encoder(cursor[1])
+        return low + int(np.searchsorted(self.sorted_tiebreak[low:high], tiebreak, side='right'))
+
+def build_ticket_sort_index(data, sort_column, descending):
+    """构建排序索引, 空值始终排在最后"""
+    keys, key_encoder = _sortable_keys(data[sort_column], descending)
+    if 'ticket_id' in data.columns:
+        # 按 ticket_id 本身排序时同样用它区分, 游标不依赖行号, 数据版本变化后仍能准确定位
+        tiebreak_column = 'ticket_id'
+        tiebreak, tiebreak_encoder = _sortable_keys(data['ticket_id'], False)
+    else:
+        # 没有可用的唯一列时按行号区分并列值
+        tiebreak_column = None
+        tiebreak = np.arange(len(data), dtype=np.float64)
+        tiebreak_encoder = lambda value: (float(value), True)
+    
+    order = np.lexsort((tiebreak, keys))
+    return TicketSortIndex(sort_column, order, keys, tiebreak, key_encoder, tiebreak_encoder, tiebreak_column)
+
+def _sortable_keys(series, descending):
+    """把一列转换为可直接比较的数值键, 并返回把游标原始值映射为键的函数
+    
+    映射函数返回 (键, 是否精确命中); 字符串值已不在当前数据中时, 键落在相邻两个取值之间。
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if getattr(series.dt, 'tz', None) is not None:
+            series = series.dt.tz_convert(None)
+        null = series.isna().to_numpy()
+        values = series.to_numpy(dtype='datetime64[ns]').view('i8').astype(np.float64)
+        
+        def encode_raw(value):
+            timestamp = pd.Timestamp(value)
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.tz_convert(None)
+            return float(timestamp.value), True
+    elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        null = np.isnan(values)
+        encode_raw = lambda value: (float(value), True)
+    else:
+        codes, uniques = pd.factorize(series.astype(object), sort=True)
+        uniques = np.asarray(uniques, dtype=object).astype(str)
+        null = codes < 0
+        values = codes.astype(np.float64)
+        
+        def encode_raw(value):
+            position = int(np.searchsorted(uniques, str(value)))
+            if position < len(uniques) and uniques[position] == str(value):
+                return float(position), True
+            return position - 0.5, False
+    
+    sign = -1.0 if descending else 1.0
+    keys = np.where(null, np.inf, values * sign)
+    
+    def encoder(value):
+        if value is None:
+            return np.inf, True
+        raw, exact = encode_raw(value)
+        return raw * sign, exact
+    
+    return keys, encoder
+
+def _cursor_value(value):
+    """游标中保存的原始值"""
+    if value is None or (not isinstance(value, (list, tuple)) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def encode_ticket_cursor(values):
+    """游标编码为URL安全的base64字符串"""
+    return base64.urlsafe_b64encode(json.dumps(values, ensure_ascii=False).encode('utf-8')).decode('ascii')
+
+def decode_ticket_cursor(cursor):
+    """解码分页游标"""
+    values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError('invalid cursor')
+    return values
+
+def prepare_project_partitions(results):
+    """把各项目抓取到的工单转换为校验清洗后的分区, 返回 (分区, 各项目校验报告, 工作日志明细)
+    
+    工作日志只保留成功生成分区的项目, 没有工作日志时为 None。
+    """
+    partitions, reports, worklogs = {}, {}, []
+    for key, issues in results.items():
+        if not issues:
+            continue
+        data, reports[key] = prepare_tickets(pd.DataFrame(issues).drop(columns='worklogs', errors='ignore'))
+        log_validation_report(f'JIRA项目 {key}', reports[key])
+        if not data.empty and not reports[key]['missing_columns']:
+            partitions[key] = data
+            entries = [entry for issue in issues for entry in issue.get('worklogs', ())]
+            if entries:
+                worklogs.append(pd.DataFrame.from_records(entries).assign(project_key=key))
+    worklogs = prepare_worklogs(pd.concat(worklogs, ignore_index=True)) if worklogs else None
+    return partitions, reports, worklogs
+
+def summarize_imported_issues(project_key, issues):
+    """导入结果摘要"""
+    return {
+        'project_key': project_key,
+        'total_issues': len(issues),
+        'issues_with_worklog': len([i for i in issues if i['log_time'] > 0]),
+        'issue_types': list(set(i['issue_type'] for i in issues)),
+        'assignees': list(set(i['assignee_name'] for i in issues if i['assignee_name'] != 'Unassigned'))
+    }
+
+def refresh_jira_projects(project_keys, max_results=1000, max_workers=4):
+    """后台刷新指定项目: 全部抓取完成后一次性发布新版本, 失败的项目保留旧数据"""
+    connection = jira_connection
+    if not connection:
+        raise RuntimeError('JIRA未连接')
+    
+    results = connection.get_projects_issues(project_keys, max_results, max_workers)
+    partitions, _, worklogs = prepare_project_partitions(results)
+    if partitions:
+        dataset_store.merge(partitions, source='scheduled_refresh', worklogs=worklogs)
+    print(f"后台刷新完成: {len(partitions)}/{len(project_keys)} 个项目")
+
+@app.route('/api/jira/refresh/schedule', methods=['GET'])
+def api_jira_refresh_status():
+    """API: 查看后台刷新任务状态"""
+    snapshot = dataset_store.current()
+    return jsonify({
+        'success': True,
+        'jobs': scheduler.status(),
+        'dataset_version': snapshot.version,
+        'dataset_source': snapshot.source,
+        'dataset_updated_at': snapshot.created_at.isoformat()
+    })
+
+@app.route('/api/jira/refresh/schedule', methods=['POST'])
+def api_jira_refresh_schedule():
+    """API: 配置后台定时刷新JIRA项目"""
+    if not jira_connection:
+        return jsonify({'error': '请先连接JIRA服务器'}), 400
+    
+    data = request.get_json() or {}
+    project_keys = [k for k in dict.fromkeys(data.get('project_keys') or []) if k]
+    if not project_keys:
+        return jsonify({'error': '请提供要刷新的项目列表: project_keys'}), 400
+    
+    try:
+        interval_minutes = positive_number(data, 'interval_minutes', 30, float)
+        max_results = positive_number(data, 'max_results', 1000)
+        max_workers = positive_number(data, 'max_workers', 4)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    scheduler.add_job(
+        REFRESH_JOB_NAME,
+        lambda: refresh_jira_projects(project_keys, max_results, max_workers),
+        interval_minutes * 60,
+        run_immediately=bool(data.get('run_immediately', True))
+    )
+    return jsonify({
+        'success': True,
+        'message': f'已配置每 {interval_minutes:g} 分钟刷新 {len(project_keys)} 个项目',
+        'project_keys': project_keys,
+        'jobs': scheduler.status()
+    })
+
+@app.route('/api/jira/refresh/schedule', methods=['DELETE'])
+def api_jira_refresh_cancel():
+    """API: 停止后台定时刷新"""
+    if not scheduler.remove_job(REFRESH_JOB_NAME):
+        return jsonify({'error': '未配置后台刷新任务'}), 404
+    return jsonify({'success': True, 'message': '已停止后台刷新'})
+
+@app.route('/api/jira/refresh', methods=['POST'])
+def api_jira_refresh_now():
+    """API: 立即触发一次后台刷新(不等待完成)"""
+    if not scheduler.run_now(REFRESH_JOB_NAME):
+        return jsonify({'error': '未配置后台刷新任务'}), 404
+    return jsonify({'success': True, 'message': '已触发后台刷新'}), 202
+
+def start_refresh_from_env():
+    """根据环境变量连接JIRA并启动后台刷新
     
-    if not jira_connection:
-        return jsonify({'error': '请先连接JIRA服务器'}), 400
+    JIRA_SERVER / JIRA_USERNAME / JIRA_TOKEN: 连接参数
+    JTAS_REFRESH_PROJECTS: 逗号分隔的项目列表
+    JTAS_REFRESH_INTERVAL_MINUTES: 刷新间隔(分钟), 默认30
     
+    配置了共享数据集目录时先竞选刷新锁; 未当选或连接失败时定期重试。
+    """
+    project_keys = [k.strip() for k in os.environ.get('JTAS_REFRESH_PROJECTS', '').split(',') if k.strip()]
+    server = os.environ.get('JIRA_SERVER')
+    if not project_keys or not server:
+        return False
     try:
-        projects = jira_connection.get_projects()
-        return jsonify({
-            'success': True,
-            'projects': projects,
-            'count': len(projects)
-        })
-    except Exception as e:
-        return jsonify({'error': f'获取项目列表失败: {str(e)}'}), 500
+        interval_minutes = float(os.environ.get('JTAS_REFRESH_INTERVAL_MINUTES', 30))
+    except ValueError:
+        interval_minutes = 0
+    if interval_minutes <= 0:
+        print("后台刷新未启动: JTAS_REFRESH_INTERVAL_MINUTES 必须是大于0的数字")
+        return False
+    
+    def start():
+        if not _claim_refresh_leadership():
+            return False
+        if _start_env_refresh(server, project_keys, interval_minutes):
+            return True
+        _release_refresh_leadership()
+        return False
+    
+    def retry():
+        if start():
+            scheduler.remove_job(REFRESH_ELECTION_JOB_NAME)
+    
+    if start():
+        return True
+    scheduler.add_job(REFRESH_ELECTION_JOB_NAME, retry, REFRESH_ELECTION_SECONDS, run_immediately=False)
+    return False
 
-@app.route('/api/jira/import/<project_key>')
-def api_jira_import(project_key):
-    """API: 从JIRA导入项目数据"""
-    global jira_connection, jira_data
+_refresh_leader_lock = None
+
+def _claim_refresh_leadership():
+    """竞选后台刷新; 没有共享数据集时每个进程各自刷新自己的数据, 总是当选"""
+    global _refresh_leader_lock
+    backend = dataset_store._backend
+    if backend is None or _refresh_leader_lock is not None:
+        return True
+    lock = backend.refresh_lock()
+    if not lock.try_acquire():
+        return False
+    _refresh_leader_lock = lock
+    return True
+
+def _release_refresh_leadership():
+    global _refresh_leader_lock
+    if _refresh_leader_lock is not None:
+        _refresh_leader_lock.release()
+        _refresh_leader_lock = None
+
+def _start_env_refresh(server, project_keys, interval_minutes):
+    global jira_connection
     
-    if not jira_connection:
-        return jsonify({'error': '请先连接JIRA服务器'}), 400
+    connector = JiraConnector()
+    success, message = connector.connect(server, os.environ.get('JIRA_USERNAME', ''), os.environ.get('JIRA_TOKEN', ''))
+    if not success:
+        print(f"后台刷新未启动: {message}")
+        return False
     
-    max_results = request.args.get('max_results', 1000, type=int)
+    jira_connection = connector
+    scheduler.add_job(REFRESH_JOB_NAME, lambda: refresh_jira_projects(project_keys), interval_minutes * 60)
+    print(f"后台刷新已启动: {', '.join(project_keys)} (每 {interval_minutes:g} 分钟)")
+    return True
+
+_refresh_started_pid = None
+_refresh_started_lock = threading.Lock()
+
+@app.before_request
+def ensure_refresh_started():
+    """每个服务进程处理第一个请求时按环境变量启动后台刷新, 每个进程只执行一次
     
-    try:
-        issues = jira_connection.get_project_issues(project_key, max_results)
-        
-        if not issues:
-            return jsonify({'error': '未找到工单数据或项目不存在'}), 404
-        
-        # 转换为DataFrame
-        jira_data = pd.DataFrame(issues)
-        
-        # 数据预处理
-        jira_data['created_time'] = pd.to_datetime(jira_data['created_time'])
-        if 'resolved_time' in jira_data.columns:
-            jira_data['resolved_time'] = pd.to_datetime(jira_data['resolved_time'])
-        
-        return jsonify({
-            'success': True,
-            'message': f'成功导入 {len(issues)} 条工单数据',
-            'project_key': project_key,
-            'total_issues': len(issues),
-            'issues_with_worklog': len([i for i in issues if i['log_time'] > 0]),
-            'issue_types': list(set(i['issue_type'] for i in issues)),
-            'assignees': list(set(i['assignee_name'] for i in issues if i['assignee_name'] != 'Unassigned'))
-        })
-        
-    except Exception as e:
-        return jsonify({'error': f'导入数据失败: {str(e)}'}), 500
+    在处理请求的进程中启动: debug重载器的监视进程、gunicorn --preload 的主进程都不处理请求,
+    不会各自再运行一份调度; 连接JIRA在后台线程中进行, 不阻塞该请求。
+    """
+    global _refresh_started_pid
+    if _refresh_started_pid == os.getpid():
+        return
+    with _refresh_started_lock:
+        if _refresh_started_pid == os.getpid():
+            return
+        _refresh_started_pid = os.getpid()
+    if os.environ.get('JTAS_REFRESH_PROJECTS') and os.environ.get('JIRA_SERVER'):
+        threading.Thread(target=start_refresh_from_env, name='jtas-refresh-start', daemon=True).start()
 
 @app.route('/api/jira/analysis/advanced')
+@dataset_conditional
 def api_jira_advanced_analysis():
     """API: JIRA项目管理专业分析"""
-    global jira_data
-    if jira_data is None or jira_data.empty:
+    if dataset_store.is_empty():
+        return jsonify({'error': '没有数据，请先导入JIRA项目数据'}), 400
+    
+    data = get_active_data()
+    if data.empty:
         return jsonify({'error': '没有数据，请先导入JIRA项目数据'}), 400
     
     try:
-        analysis = {
-            # 1. 项目健康度分析
-            'project_health': analyze_project_health(jira_data),
-            
-            # 2. 团队绩效分析
-            'team_performance': analyze_team_performance(jira_data),
-            
-            # 3. 工单流转分析
-            'workflow_analysis': analyze_workflow(jira_data),
-            
-            # 4. 质量指标分析
-            'quality_metrics': analyze_quality_metrics(jira_data),
-            
-            # 5. 资源分配分析
-            'resource_allocation': analyze_resource_allocation(jira_data),
-            
-            # 6. 趋势预测分析
-            'trend_prediction': analyze_trends(jira_data),
-            
-            # 7. 关键洞察和建议
-            'insights_and_recommendations': generate_insights(jira_data)
-        }
-        
+        analysis = build_advanced_analysis(data)
         return jsonify(analysis)
-        
+    
     except Exception as e:
         return jsonify({'error': f'分析失败: {str(e)}'}), 500
 
+def build_advanced_analysis(data):
+    """JIRA项目管理专业分析(高级分析接口与报告共用)"""
+    return {
+        # 1. 项目健康度分析
+        'project_health': analyze_project_health(data),
+        
+        # 2. 团队绩效分析
+        'team_performance': analyze_team_performance(data),
+        
+        # 3. 工单流转分析
+        'workflow_analysis': analyze_workflow(data),
+        
+        # 4. 质量指标分析
+        'quality_metrics': analyze_quality_metrics(data),
+        
+        # 5. 资源分配分析
+        'resource_allocation': analyze_resource_allocation(data),
+        
+        # 6. 趋势预测分析
+        'trend_prediction': analyze_trends(data),
+        
+        # 7. 关键洞察和建议
+        'insights_and_recommendations': generate_insights(data)
+    }
+
 def analyze_project_health(data):
     """项目健康度分析"""
     total_issues = len(data)
@@ -656,8 +3360,11 @@ def analyze_team_performance(data):
     }).round(2)
     
     team_stats.columns = ['total_tickets', 'avg_time', 'total_time', 'high_priority_count', 'resolved_count']
+    team_stats[['avg_time', 'total_time']] = team_stats[['avg_time', 'total_time']].fillna(0)
     team_stats['resolution_rate'] = (team_stats['resolved_count'] / team_stats['total_tickets'] * 100).round(2)
-    team_stats['efficiency_score'] = ((team_stats['resolved_count'] / team_stats['avg_time']) * 100).round(2)
+    # 平均处理时间为0或缺失时无法计算效率得分, 记为0
+    avg_time = team_stats['avg_time'].where(team_stats['avg_time'] > 0)
+    team_stats['efficiency_score'] = ((team_stats['resolved_count'] / avg_time) * 100).fillna(0).round(2)
     
     return {
         'team_statistics': team_stats.to_dict('index'),
@@ -735,23 +3442,861 @@ def analyze_resource_allocation(data):
         'workload_distribution': workload.to_dict(),
         'workload_balance_score': round(workload_balance, 2),
         'skill_analysis': skill_analysis.to_dict('index'),
-        'resource_utilization': calculate_resource_utilization(data)
+        'resource_utilization': calculate_resource_utilization(data),
+        'fairness': {method: fairness['summary'] for method, fairness in
+                     compute_assignment_fairness(data, 'week')['methods'].items()}
+    }
+
+@app.route('/api/fairness')
+@dataset_conditional
+def api_assignment_fairness():
+    """API: 分单公平性与负载均衡分析
+    
+    参数:
+        window: 时间窗口 day(默认) 或 week
+        rolling: 每个统计窗口包含的连续时间窗口数, 默认1, 最大 FAIRNESS_MAX_ROLLING
+        periods: 只返回最近的若干个窗口, 默认全部
+    """
+    window = request.args.get('window', 'day')
+    if window not in FAIRNESS_WINDOWS:
+        return jsonify({'error': f'不支持的时间窗口, 可选: {", ".join(FAIRNESS_WINDOWS)}'}), 400
+    rolling = request.args.get('rolling', 1, type=int)
+    if not 1 <= rolling <= FAIRNESS_MAX_ROLLING:
+        return jsonify({'error': f'rolling 取值范围为 1-{FAIRNESS_MAX_ROLLING}'}), 400
+    periods = None
+    if 'periods' in request.args:
+        try:
+            periods = positive_number(request.args, 'periods', None)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    return jsonify(compute_assignment_fairness(get_active_data(), window, rolling, periods))
+
+def compute_assignment_fairness(data, window='day', rolling=1, periods=None):
+    """按时间窗口和分单方式计算分单公平性
+    
+    工单按开始处理时间(assigned_time, 缺失时用 created_time)分桶, 构建 (窗口 × 处理人) 矩阵:
+    分单量用 bincount 计数; 并发负载用差分数组累加每张工单在各窗口内的在办时长, 除以窗口长度即平均并发工单数。
+    每个窗口只在有分单或在办工单的处理人之间比较, 未解决的工单视为在办至数据中的最后时间。
+    """
+    period = FAIRNESS_WINDOWS[window]
+    empty = {'window': window, 'rolling': rolling, 'assignees': 0, 'methods': {}}
+    if 'assignee_employee_id' not in data.columns or data.empty:
+        return empty
+    
+    def times(column):
+        if column not in data.columns:
+            return pd.Series(pd.NaT, index=data.index, dtype='datetime64[ns]')
+        return parse_timestamps(data[column])
+    
+    start = times('assigned_time').fillna(times('created_time'))
+    # 未分派的工单不参与比较(与分单回放一致), 已解析处理人的数据按 assignee_key 判断
+    assignee = data['assignee_employee_id']
+    assigned = data['assignee_key'].to_numpy(dtype=np.int64) >= 0 if 'assignee_key' in data.columns else \
+        (assignee != UNASSIGNED_NAME).to_numpy(dtype=bool, na_value=False)
+    valid = (start.notna() & assignee.notna()).to_numpy() & assigned
+    if not valid.any():
+        return empty
+    
+    # 统一换算为秒, 避免纳秒累加时的精度损失
+    start = start[valid].to_numpy('datetime64[s]').astype(np.int64)
+    end = times('resolved_time')[valid].to_numpy('datetime64[s]')
+    horizon = max(start.max(), end[~np.isnat(end)].astype(np.int64).max(initial=start.max()))
+    end = np.maximum(np.where(np.isnat(end), horizon, end.astype(np.int64)), start)
+    
+    first_day = pd.Timestamp(start.min(), unit='s').normalize()
+    if window == 'week':
+        first_day -= pd.Timedelta(days=first_day.weekday())
+    origin = int(first_day.timestamp())
+    first = (start - origin) // period
+    last = (end - origin) // period
+    buckets = int(last.max()) + 1
+    
+    codes, assignees = pd.factorize(data['assignee_employee_id'][valid].astype(str))
+    methods = (data['assignment_method'][valid].astype(str).to_numpy() if 'assignment_method' in data.columns
+               else np.full(len(codes), 'UNKNOWN', dtype=object))
+    labels = pd.date_range(first_day, periods=buckets, freq=f'{period // 86400}D').strftime('%Y-%m-%d')
+    
+    result = {'window': window, 'rolling': rolling, 'assignees': len(assignees), 'methods': {}}
+    for method in ['ALL'] + sorted(set(methods)):
+        mask = slice(None) if method == 'ALL' else methods == method
+        counts, busy = fairness_matrices(first[mask], last[mask], start[mask], end[mask], codes[mask],
+                                         origin, period, buckets, len(assignees))
+        result['methods'][method] = summarize_fairness(counts, busy, period, rolling, labels, assignees, periods)
+    return result
+
+def fairness_matrices(first, last, start, end, codes, origin, period, buckets, width):
+    """(窗口 × 处理人) 的分单量矩阵与在办时长(秒)矩阵
+    
+    每张工单先在 [first, last] 区间内每个窗口记满 period 秒(差分数组 + cumsum),
+    再扣除首个窗口中开始前、最后一个窗口中结束后的部分。
+    """
+    size = buckets * width
+    counts = np.bincount(first * width + codes, minlength=size).reshape(buckets, width)
+    
+    diff = np.bincount(np.concatenate([first * width + codes, (last + 1) * width + codes]),
+                       weights=np.concatenate([np.full(len(codes), period, dtype=np.float64),
+                                               np.full(len(codes), -period, dtype=np.float64)]),
+                       minlength=size + width)
+    busy = np.cumsum(diff.reshape(buckets + 1, width), axis=0)[:buckets]
+    head = (start - (origin + first * period)).astype(np.float64)
+    tail = ((origin + (last + 1) * period) - end).astype(np.float64)
+    busy -= np.bincount(np.concatenate([first * width + codes, last * width + codes]),
+                        weights=np.concatenate([head, tail]), minlength=size).reshape(buckets, width)
+    return counts, np.maximum(busy, 0)
+
+def rolling_sum(matrix, span):
+    """沿时间轴对连续 span 个窗口滚动求和"""
+    if span <= 1:
+        return matrix
+    total = np.cumsum(matrix, axis=0)
+    total[span:] = total[span:] - total[:-span]
+    return total
+
+def row_gini(matrix, active):
+    """逐行计算活跃处理人之间的 Gini 系数; 少于2人或总量为0的行为 NaN"""
+    values = np.sort(np.where(active, matrix, np.nan), axis=1)
+    values = np.nan_to_num(values)
+    n = active.sum(axis=1)
+    total = values.sum(axis=1)
+    weighted = (values * np.arange(1, matrix.shape[1] + 1)).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gini = 2 * weighted / (n * total) - (n + 1) / n
+    return np.where((n >= 2) & (total > 0), gini, np.nan)
+
+def row_max_min_ratio(matrix, active):
+    """逐行计算活跃处理人中最大负载与最小负载之比; 最小负载为0时为 NaN"""
+    high = np.where(active, matrix, -np.inf).max(axis=1)
+    low = np.where(active, matrix, np.inf).min(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = high / low
+    return np.where((active.sum(axis=1) >= 2) & (low > 0) & np.isfinite(low), ratio, np.nan)
+
+def summarize_fairness(counts, busy, period, rolling, labels, assignees, periods=None):
+    """汇总某种分单方式的公平性指标: 逐窗口序列、整体摘要及每个处理人的负载"""
+    tickets = rolling_sum(counts, rolling)
+    load = rolling_sum(busy, rolling) / (period * rolling)
+    active = (tickets > 0) | (load > 0)
+    
+    series = pd.DataFrame({
+        'period': labels,
+        'tickets': tickets.sum(axis=1),
+        'active_assignees': active.sum(axis=1),
+        'ticket_gini': row_gini(tickets, active),
+        'ticket_max_min_ratio': row_max_min_ratio(tickets, active),
+        'load_gini': row_gini(load, active),
+        'load_max_min_ratio': row_max_min_ratio(load, active),
+        'mean_concurrent_load': np.where(active.any(axis=1), load.sum(axis=1) / np.maximum(active.sum(axis=1), 1), 0),
+        'max_concurrent_load': load.max(axis=1, initial=0)
+    })
+    series = series[series['active_assignees'] > 0]
+    
+    total_tickets = counts.sum(axis=0)
+    ever_active = (total_tickets > 0) | (busy.sum(axis=0) > 0)
+    overall = pd.DataFrame({
+        'tickets': total_tickets,
+        'avg_concurrent_load': busy.sum(axis=0) / (period * len(labels)),
+        'peak_concurrent_load': load.max(axis=0, initial=0)
+    }, index=assignees)[ever_active]
+    
+    summary = {
+        'windows': len(series),
+        'tickets': int(total_tickets.sum()),
+        'overall_ticket_gini': _json_number(row_gini(total_tickets[None, :], ever_active[None, :])[0]),
+        'mean_ticket_gini': _json_number(series['ticket_gini'].mean()),
+        'mean_load_gini': _json_number(series['load_gini'].mean()),
+        'mean_ticket_max_min_ratio': _json_number(series['ticket_max_min_ratio'].mean()),
+        'mean_load_max_min_ratio': _json_number(series['load_max_min_ratio'].mean()),
+        'peak_concurrent_load': _json_number(series['max_concurrent_load'].max())
+    }
+    if periods:
+        series = series.tail(periods)
+    
+    return {
+        'summary': summary,
+        'series': _json_records(series.round(4)),
+        'assignees': _json_records(overall.round(4).rename_axis('assignee').reset_index())
+    }
+
+def _json_number(value):
+    return None if value is None or pd.isna(value) else round(float(value), 4)
+
+def _json_records(frame):
+    """DataFrame 转为记录列表, NaN 转为 None"""
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+@app.route('/api/simulation/dispatch')
+@dataset_conditional
+def api_dispatch_simulation():
+    """API: 分单策略回放对比
+    
+    参数:
+        policies: 逗号分隔的策略名, 默认全部(historical, fewest_tickets, least_loaded, round_robin)
+    """
+    names = [p.strip() for p in request.args.get('policies', '').split(',') if p.strip()] or list(DISPATCH_POLICIES)
+    unknown = [p for p in names if p not in DISPATCH_POLICIES]
+    if unknown:
+        return jsonify({'error': f'未知的分单策略: {", ".join(unknown)}, 可选: {", ".join(DISPATCH_POLICIES)}'}), 400
+    
+    simulator = DispatchSimulator.from_tickets(get_active_data())
+    if simulator is None:
+        return jsonify({'error': '没有可回放的工单, 需要 created_time、处理人及处理时长'}), 400
+    
+    return jsonify({
+        'tickets': simulator.size,
+        'skipped_tickets': simulator.skipped,
+        'assignees': len(simulator.assignees),
+        'observed': simulator.observed,
+        'policies': {name: simulator.summarize(simulator.run(DISPATCH_POLICIES[name])) for name in names}
+    })
+
+class DispatchPolicy:
+    """分单策略基类: choose 返回处理人序号, 可通过 assigned/completed 维护自身状态"""
+    def __init__(self, simulator):
+        self.simulator = simulator
+    
+    def choose(self, ticket, now):
+        raise NotImplementedError
+    
+    def assigned(self, assignee, ticket, now):
+        pass
+    
+    def completed(self, assignee):
+        pass
+
+class HistoricalPolicy(DispatchPolicy):
+    """按历史上实际的处理人分单"""
+    def choose(self, ticket, now):
+        return self.simulator.historical[ticket]
+
+class FewestTicketsPolicy(DispatchPolicy):
+    """人工分单常用的 "在办工单最少者优先", 在办数相同时优先累计分单较少者
+    
+    堆中保存 (在办数, 累计分单数, 处理人), 状态变化时压入新条目; 旧条目在到达堆顶时发现与当前状态不符再丢弃(延迟删除)。
+    """
+    def __init__(self, simulator):
+        super().__init__(simulator)
+        self.assigned_count = [0] * len(simulator.assignees)
+        self.heap = [(0, 0, a) for a in range(len(simulator.assignees))]
+    
+    def choose(self, ticket, now):
+        heap, open_tickets, assigned_count = self.heap, self.simulator.open_tickets, self.assigned_count
+        while True:
+            load, count, assignee = heap[0]
+            if load == open_tickets[assignee] and count == assigned_count[assignee]:
+                return assignee
+            heapq.heappop(heap)
+    
+    def assigned(self, assignee, ticket, now):
+        self.assigned_count[assignee] += 1
+        heapq.heappush(self.heap, (self.simulator.open_tickets[assignee], self.assigned_count[assignee], assignee))
+    
+    def completed(self, assignee):
+        heapq.heappush(self.heap, (self.simulator.open_tickets[assignee], self.assigned_count[assignee], assignee))
+
+class LeastLoadedPolicy(DispatchPolicy):
+    """剩余工作量最少(最早空闲)者优先; 每个处理人在堆中只有一个 (预计空闲时间, 处理人) 条目"""
+    def __init__(self, simulator):
+        super().__init__(simulator)
+        self.heap = [(0.0, a) for a in range(len(simulator.assignees))]
+    
+    def choose(self, ticket, now):
+        free_at, assignee = heapq.heappop(self.heap)
+        heapq.heappush(self.heap, (max(free_at, now) + self.simulator.service[ticket], assignee))
+        return assignee
+
+class RoundRobinPolicy(DispatchPolicy):
+    """轮流分单"""
+    def __init__(self, simulator):
+        super().__init__(simulator)
+        self.next = 0
+    
+    def choose(self, ticket, now):
+        assignee = self.next
+        self.next = (assignee + 1) % len(self.simulator.assignees)
+        return assignee
+
+# 可回放的分单策略; 新策略继承 DispatchPolicy 后在此注册
+DISPATCH_POLICIES = {
+    'historical': HistoricalPolicy,
+    'fewest_tickets': FewestTicketsPolicy,
+    'least_loaded': LeastLoadedPolicy,
+    'round_robin': RoundRobinPolicy
+}
+
+class DispatchSimulator:
+    """基于堆的离散事件分单回放
+    
+    工单按 created_time 依次到达, 由分单策略在真实处理人池中选择处理人; 每个处理人同一时间只处理一张工单,
+    其余按到达顺序排队, 处理时长取实际处理分钟数。事件堆中只保存处理完成事件(每个处理人至多一个),
+    到达事件本身已按时间排序, 直接与堆顶比较合并; 同一时刻先处理完成事件。
+    """
+    def __init__(self, arrivals, service, historical, assignees, skipped=0, observed=None):
+        self.arrivals = arrivals
+        self.service = service
+        self.historical = historical
+        self.assignees = assignees
+        self.size = len(arrivals)
+        self.skipped = skipped
+        self.observed = observed or {}
+        self.open_tickets = []
+    
+    @classmethod
+    def from_tickets(cls, data):
+        """从工单数据构建回放输入, 时间单位为分钟; 缺少创建时间或处理人的工单不参与回放"""
+        if 'created_time' not in data.columns or 'assignee_employee_id' not in data.columns:
+            return None
+        created = parse_timestamps(data['created_time'])
+        assignee = data['assignee_employee_id'].where(data['assignee_employee_id'] != 'Unassigned')
+        service = pd.Series(np.nan, index=data.index)
+        for column in ('actual_processing_minutes', 'log_time'):
+            if column in data.columns:
+                service = service.fillna(pd.to_numeric(data[column], errors='coerce'))
+        
+        valid = created.notna() & assignee.notna()
+        if not valid.any():
+            return None
+        service = service[valid]
+        service = service.fillna(service.median() if service.notna().any() else 0).clip(lower=0)
+        
+        order = np.argsort(created[valid].to_numpy(), kind='stable')
+        created = created[valid].to_numpy()[order]
+        arrivals = (created - created[0]) / np.timedelta64(1, 'm')
+        codes, assignees = pd.factorize(assignee[valid].astype(str).to_numpy()[order])
+        
+        return cls(arrivals.astype(np.float64).tolist(), service.to_numpy(np.float64)[order].tolist(),
+                   codes.tolist(), list(assignees), skipped=int((~valid).sum()),
+                   observed=cls.observed_metrics(data[valid]))
+    
+    @staticmethod
+    def observed_metrics(data):
+        """历史实际的等待(创建→分派)与完成(创建→解决)时间, 分钟"""
+        created = parse_timestamps(data['created_time'])
+        observed = {}
+        for name, column in (('wait', 'assigned_time'), ('completion', 'resolved_time')):
+            if column in data.columns:
+                minutes = (parse_timestamps(data[column]) - created).dt.total_seconds() / 60
+                observed[f'avg_{name}_minutes'] = _json_number(minutes.mean())
+                observed[f'p90_{name}_minutes'] = _json_number(minutes.quantile(0.9))
+        return observed
+    
+    def run(self, policy_class):
+        """回放全部工单, 返回每张工单的处理人、开始时间与完成时间"""
+        width = len(self.assignees)
+        arrivals, service = self.arrivals, self.service
+        assigned_to = [0] * self.size
+        started = [0.0] * self.size
+        finished = [0.0] * self.size
+        queues = [deque() for _ in range(width)]
+        current = [-1] * width
+        self.open_tickets = open_tickets = [0] * width
+        policy = policy_class(self)
+        events = []
+        heappush, heappop = heapq.heappush, heapq.heappop
+        
+        def complete():
+            now, assignee = heappop(events)
+            finished[current[assignee]] = now
+            open_tickets[assignee] -= 1
+            policy.completed(assignee)
+            if queues[assignee]:
+                ticket = queues[assignee].popleft()
+                current[assignee] = ticket
+                started[ticket] = now
+                heappush(events, (now + service[ticket], assignee))
+            else:
+                current[assignee] = -1
+        
+        for ticket in range(self.size):
+            now = arrivals[ticket]
+            while events and events[0][0] <= now:
+                complete()
+            assignee = policy.choose(ticket, now)
+            assigned_to[ticket] = assignee
+            open_tickets[assignee] += 1
+            policy.assigned(assignee, ticket, now)
+            if current[assignee] < 0:
+                current[assignee] = ticket
+                started[ticket] = now
+                heappush(events, (now + service[ticket], assignee))
+            else:
+                queues[assignee].append(ticket)
+        while events:
+            complete()
+        
+        return np.array(assigned_to), np.array(started), np.array(finished)
+    
+    def summarize(self, result):
+        """回放结果汇总: 等待时间、完成时间(分钟)及处理人之间的负载均衡"""
+        assigned_to, started, finished = result
+        arrivals = np.array(self.arrivals)
+        wait = started - arrivals
+        completion = finished - arrivals
+        width = len(self.assignees)
+        tickets = np.bincount(assigned_to, minlength=width)
+        busy = np.bincount(assigned_to, weights=np.array(self.service), minlength=width)
+        makespan = float(finished.max() - arrivals.min()) if self.size else 0.0
+        active = np.ones((1, width), dtype=bool)
+        
+        return {
+            'avg_wait_minutes': _json_number(wait.mean()),
+            'p50_wait_minutes': _json_number(np.percentile(wait, 50)),
+            'p90_wait_minutes': _json_number(np.percentile(wait, 90)),
+            'max_wait_minutes': _json_number(wait.max()),
+            'avg_completion_minutes': _json_number(completion.mean()),
+            'p90_completion_minutes': _json_number(np.percentile(completion, 90)),
+            'makespan_minutes': _json_number(makespan),
+            'load_balance': {
+                'ticket_gini': _json_number(row_gini(tickets[None, :], active)[0]),
+                'busy_gini': _json_number(row_gini(busy[None, :], active)[0]),
+                'ticket_max_min_ratio': _json_number(row_max_min_ratio(tickets[None, :], active)[0]),
+                'busy_max_min_ratio': _json_number(row_max_min_ratio(busy[None, :], active)[0]),
+                'avg_utilization': _json_number(busy.sum() / (makespan * width)) if makespan > 0 else None
+            },
+            'assignees': [{'assignee': name, 'tickets': int(count), 'busy_minutes': round(float(minutes), 2)}
+                          for name, count, minutes in zip(self.assignees, tickets, busy)]
+        }
+
+@app.route('/api/worklogs/utilization')
+@dataset_conditional
+def api_worklog_utilization():
+    """API: 基于工作日志明细的处理人日利用率
+    
+    参数:
+        start, end: 统计的起止日期(含, YYYY-MM-DD), 默认全部
+        assignee: 只统计指定 assignee_key 的处理人, daily 即为其每日工时
+    """
+    snapshot, worklogs = get_active_worklogs()
+    try:
+        start, end = (pd.Timestamp(request.args[name]).normalize() if request.args.get(name) else None
+                      for name in ('start', 'end'))
+    except ValueError:
+        return jsonify({'error': 'start、end 应为 YYYY-MM-DD 格式的日期'}), 400
+    
+    started = worklogs['started'].to_numpy()
+    keep = np.ones(len(worklogs), dtype=bool)
+    if start is not None:
+        keep &= started >= start.to_datetime64()
+    if end is not None:
+        keep &= started < (end + pd.Timedelta(days=1)).to_datetime64()
+    assignee = request.args.get('assignee', type=int)
+    if assignee is not None:
+        keep &= worklogs['author_key'].to_numpy() == assignee
+    
+    return jsonify(compute_worklog_utilization(worklogs[keep], snapshot.assignees()))
+
+def compute_worklog_utilization(worklogs, dimension, workday_hours=WORKDAY_HOURS):
+    """按处理人、按日汇总工作日志时长并计算利用率
+    
+    (处理人, 日期) 组合为一个整数键, 用 np.unique + bincount 一次聚合全部明细, 之后只处理有记录的单元格。
+    活跃日利用率 = 有记录日的平均工时 / 标准工时; 期间利用率按统计期内的工作日(周一至周五)计算。
+    """
+    result = {'worklogs': len(worklogs), 'workday_hours': workday_hours, 'assignees': [], 'daily': []}
+    if worklogs.empty:
+        return result
+    
+    keys = worklogs['author_key'].to_numpy(dtype=np.int64)
+    seconds = worklogs['seconds'].to_numpy(dtype=np.float64)
+    days = worklogs['started'].to_numpy().astype('datetime64[D]')
+    first_day, last_day = days.min(), days.max()
+    offsets = (days - first_day).astype(np.int64)
+    span = int(offsets.max()) + 1
+    workdays = max(int(np.busday_count(first_day, last_day + np.timedelta64(1, 'D'))), 1)
+    
+    attributed = (keys >= 0) & (keys < len(dimension))
+    cells, inverse = np.unique(keys[attributed] * span + offsets[attributed], return_inverse=True)
+    hours = np.bincount(inverse.reshape(-1), weights=seconds[attributed], minlength=len(cells)) / 3600
+    cell_keys, cell_days = cells // span, cells % span
+    
+    # 单元格按 (处理人, 日期) 排序, 每个处理人的单元格连续
+    starts = np.flatnonzero(np.r_[True, np.diff(cell_keys) != 0]) if len(cells) else np.array([], dtype=np.int64)
+    assignee_keys = cell_keys[starts]
+    active_days = np.diff(np.r_[starts, len(cells)])
+    total_hours = np.add.reduceat(hours, starts) if len(cells) else np.array([])
+    peak_hours = np.maximum.reduceat(hours, starts) if len(cells) else np.array([])
+    overloaded = np.add.reduceat((hours > workday_hours).astype(np.int64), starts) if len(cells) else np.array([])
+    
+    names = assignee_display_names(dimension)
+    departments = _dimension_values(dimension, 'department')
+    order = np.argsort(-total_hours, kind='stable')
+    result.update({
+        'start': str(first_day),
+        'end': str(last_day),
+        'workdays': workdays,
+        'logged_hours': round(float(seconds.sum()) / 3600, 2),
+        'unattributed_hours': round(float(seconds[~attributed].sum()) / 3600, 2),
+        'assignees': [{
+            'assignee_key': int(assignee_keys[i]),
+            'name': names[assignee_keys[i]],
+            'department': departments[assignee_keys[i]],
+            'active_days': int(active_days[i]),
+            'logged_hours': round(float(total_hours[i]), 2),
+            'avg_daily_hours': round(float(total_hours[i] / active_days[i]), 2),
+            'active_day_utilization': round(float(total_hours[i] / active_days[i] / workday_hours * 100), 2),
+            'period_utilization': round(float(total_hours[i] / (workdays * workday_hours) * 100), 2),
+            'overloaded_days': int(overloaded[i]),
+            'peak_daily_hours': round(float(peak_hours[i]), 2)
+        } for i in order]
+    })
+    
+    daily_hours = np.bincount(cell_days, weights=hours, minlength=span)
+    daily_assignees = np.bincount(cell_days, minlength=span)
+    result['daily'] = [{
+        'date': str(first_day + np.timedelta64(int(day), 'D')),
+        'hours': round(float(daily_hours[day]), 2),
+        'active_assignees': int(daily_assignees[day]),
+        'utilization': round(float(daily_hours[day] / (daily_assignees[day] * workday_hours) * 100), 2)
+    } for day in np.flatnonzero(daily_assignees)]
+    return result
+
+@app.route('/api/worklogs/first-work')
+@dataset_conditional
+def api_time_to_first_work():
+    """API: 工单分派后到开始处理(第一条工作日志)的时长, 按分单方式和优先级对比"""
+    snapshot, worklogs = get_active_worklogs()
+    return jsonify(compute_time_to_first_work(snapshot.get_data(get_request_projects()), worklogs))
+
+def compute_time_to_first_work(data, worklogs):
+    """工单从分派(缺失时用创建时间)到第一条工作日志开始的小时数统计
+    
+    明细按工单分组取最早的开始时间, 再按工单ID对齐到工单数据, 全部为整列运算。
+    开始时间早于分派时间(补记的日志)的工单单独计数, 不参与统计。
+    """
+    first = worklogs.groupby('ticket_id', observed=True, sort=False)['started'].min()
+    position = pd.Index(first.index.astype(str)).get_indexer(data['ticket_id'].astype(str))
+    found = position >= 0
+    first_work = np.full(len(data), np.datetime64('NaT'), dtype='datetime64[ns]')
+    first_work[found] = first.to_numpy(dtype='datetime64[ns]')[position[found]]
+    
+    reference = pd.Series(pd.NaT, index=data.index, dtype='datetime64[ns]')
+    for column in ('assigned_time', 'created_time'):
+        if column in data.columns:
+            reference = reference.fillna(parse_timestamps(data[column]))
+    hours = (first_work - reference.to_numpy()) / np.timedelta64(1, 'h')
+    backdated = hours < 0
+    valid = ~np.isnan(hours) & ~backdated
+    
+    def summarize(values):
+        if not len(values):
+            return {'tickets': 0}
+        return {
+            'tickets': int(len(values)),
+            'median_hours': round(float(np.median(values)), 2),
+            'mean_hours': round(float(values.mean()), 2),
+            'p90_hours': round(float(np.percentile(values, 90)), 2)
+        }
+    
+    result = {
+        'tickets': len(data),
+        'tickets_with_worklog': int(found.sum()),
+        'worklog_coverage': round(found.mean() * 100, 2) if len(data) else 0,
+        'backdated_tickets': int(backdated.sum()),
+        'overall': summarize(hours[valid])
+    }
+    for column in ('assignment_method', 'priority'):
+        if column in data.columns:
+            groups = data[column].astype(object).where(data[column].notna(), '未知').to_numpy()[valid]
+            codes, labels = pd.factorize(groups, sort=True)
+            result[f'by_{column}'] = {str(label): summarize(hours[valid][codes == i]) for i, label in enumerate(labels)}
+    return result
+
+def _shingle_hashes(texts, size=SIMILARITY_SHINGLE, max_chars=SIMILARITY_MAX_CHARS, chunk_size=20000):
+    """文本的字符n-gram哈希集合, 返回按文档排序、文档内去重的 (文档序号, 32位哈希) 数组
+    
+    文本(小写、合并空白、截断)按块转为定长UTF-32码点矩阵, n-gram哈希由相邻码点整列组合计算,
+    不逐个字符串循环; 短于n的文本整体作为一个n-gram, 空文本没有n-gram。
+    """
+    normalized = pd.Series(texts, dtype=object).fillna('').astype(str).str.lower()
+    normalized = normalized.str.split().str.join(' ').str.slice(0, max_chars)
+    keys = []
+    for start in range(0, len(normalized), chunk_size):
+        block = normalized.iloc[start:start + chunk_size].to_numpy(dtype=str)
+        width = max(block.dtype.itemsize // 4, size)
+        codes = np.frombuffer(block.astype(f'<U{width}').tobytes(), dtype=np.uint32)
+        codes = codes.reshape(len(block), width).astype(np.uint64)
+        grams = np.zeros((len(block), width - size + 1), dtype=np.uint64)
+        for offset in range(size):
+            grams = grams * np.uint64(0x10FFFF + 1) + codes[:, offset:width - size + 1 + offset]
+        # 乘法散列后取高32位
+        grams = (grams * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(32)
+        
+        lengths = np.char.str_len(block)[:, None]
+        positions = np.arange(grams.shape[1])[None, :]
+        valid = (positions + size <= lengths) | ((positions == 0) & (lengths > 0))
+        rows = np.broadcast_to(np.arange(start, start + len(block), dtype=np.uint64)[:, None], grams.shape)
+        keys.append((rows[valid] << np.uint64(32)) | grams[valid])
+    keys = np.unique(np.concatenate(keys)) if keys else np.array([], dtype=np.uint64)
+    return (keys >> np.uint64(32)).astype(np.int64), keys & np.uint64(0xFFFFFFFF)
+
+class SimilarityIndex:
+    """工单摘要的近似重复索引(MinHash + LSH)
+    
+    只为不同的摘要建立签名: 每个摘要的n-gram哈希集合经 BANDS × ROWS 个随机哈希函数取最小值,
+    每 ROWS 个签名值组合为一个分桶键。分桶键相同的摘要为候选, 再用签名估计Jaccard相似度过滤,
+    查找与关联都按分桶键排序或比较, 不做两两比较。
+    """
+    def __init__(self, texts):
+        self.size = len(texts)
+        permutations = SIMILARITY_BANDS * SIMILARITY_ROWS
+        rng = np.random.default_rng(20240101)
+        self._multipliers = rng.integers(1, 2 ** 63, permutations, dtype=np.uint64) | np.uint64(1)
+        self._offsets = rng.integers(0, 2 ** 63, permutations, dtype=np.uint64)
+        docs, hashes = _shingle_hashes(texts)
+        self.indexed = np.zeros(self.size, dtype=bool)
+        self.indexed[docs] = True
+        self.signatures = self._signatures(docs, hashes, self.size)
+        self.band_keys = self._band_keys(self.signatures)
+        self.ticket_docs = np.arange(self.size)
+    
+    @classmethod
+    def from_tickets(cls, data):
+        """按工单的 summary 建立索引; ticket_docs 为每张工单对应的摘要序号"""
+        if 'summary' not in data.columns:
+            return None
+        codes, texts = pd.factorize(data['summary'].astype(object).where(data['summary'].notna(), ''))
+        index = cls(np.asarray(texts, dtype=object))
+        index.ticket_docs = codes
+        return index
+    
+    @property
+    def nbytes(self):
+        return self.signatures.nbytes + self.band_keys.nbytes + self.indexed.nbytes + self.ticket_docs.nbytes
+    
+    def _signatures(self, docs, hashes, size):
+        """按文档分段取每个哈希函数下的最小值; 没有n-gram的文档签名全为最大值"""
+        signatures = np.full((size, len(self._multipliers)), np.iinfo(np.uint32).max, dtype=np.uint32)
+        if not len(docs):
+            return signatures
+        starts = np.flatnonzero(np.r_[True, docs[1:] != docs[:-1]])
+        for k, (multiplier, offset) in enumerate(zip(self._multipliers, self._offsets)):
+            permuted = (hashes * multiplier + offset) >> np.uint64(32)
+            signatures[docs[starts], k] = np.minimum.reduceat(permuted, starts)
+        return signatures
+    
+    @staticmethod
+    def _band_keys(signatures):
+        """每个分段的 ROWS 个签名值组合为一个64位分桶键, 形状为 (BANDS, 文档数)"""
+        keys = np.zeros((SIMILARITY_BANDS, len(signatures)), dtype=np.uint64)
+        for band in range(SIMILARITY_BANDS):
+            for column in range(band * SIMILARITY_ROWS, (band + 1) * SIMILARITY_ROWS):
+                keys[band] = keys[band] * np.uint64(0x100000001B3) + signatures[:, column]
+        return keys
+    
+    def similarity(self, left, right):
+        """两组摘要序号逐对的估计Jaccard相似度"""
+        return (self.signatures[left] == self.signatures[right]).mean(axis=1)
+    
+    def previous_similar(self, created, window):
+        """每张工单之前 window 内最近一张摘要相似的工单(行号), 没有为 -1
+        
+        每个分段按 (分桶键, 创建时间) 排序, 与同桶的前一张工单比较并校验相似度, 取各分段中最近的一张。
+        """
+        docs = self.ticket_docs
+        eligible = np.flatnonzero((docs >= 0) & self.indexed[np.maximum(docs, 0)] & (created != np.iinfo(np.int64).min))
+        previous = np.full(len(docs), -1, dtype=np.int64)
+        for band in range(SIMILARITY_BANDS):
+            keys = self.band_keys[band, docs[eligible]]
+            order = eligible[np.lexsort((created[eligible], keys))]
+            before, after = order[:-1], order[1:]
+            keys = self.band_keys[band, docs[order]]
+            linked = (keys[:-1] == keys[1:]) & (created[after] - created[before] <= window)
+            before, after = before[linked], after[linked]
+            similar = self.similarity(docs[before], docs[after]) >= SIMILARITY_THRESHOLD
+            before, after = before[similar], after[similar]
+            newer = (previous[after] < 0) | (created[before] > created[np.maximum(previous[after], 0)])
+            previous[after[newer]] = before[newer]
+        return previous
+    
+    def neighbors(self, text=None, doc=None, limit=10):
+        """与给定文本(或索引中的某个摘要)相似的摘要 [(摘要序号, 估计相似度)], 按相似度降序"""
+        if doc is not None:
+            signature, band_keys = self.signatures[doc], self.band_keys[:, doc]
+        else:
+            docs, hashes = _shingle_hashes([text])
+            if not len(docs):
+                return []
+            signature = self._signatures(docs, hashes, 1)[0]
+            band_keys = self._band_keys(signature[None, :])[:, 0]
+        candidates = np.flatnonzero((self.band_keys == band_keys[:, None]).any(axis=0) & self.indexed)
+        scores = (self.signatures[candidates] == signature).mean(axis=1)
+        keep = scores >= SIMILARITY_THRESHOLD
+        candidates, scores = candidates[keep], scores[keep]
+        order = np.argsort(-scores, kind='stable')[:limit]
+        return [(int(candidates[i]), float(scores[i])) for i in order]
+
+def get_similarity_index(snapshot, projects, data):
+    """按数据版本和项目筛选缓存的相似度索引"""
+    key = ('similarity_index', tuple(sorted(projects or [])))
+    return snapshot.cached(key, lambda: SimilarityIndex.from_tickets(data))
+
+@app.route('/api/similarity/dispatch-factors')
+@dataset_conditional
+def api_similarity_dispatch_factors():
+    """API: 同一报告人/相似摘要的工单分给同一处理人时是否解决得更快
+    
+    参数:
+        window_days: 短期上下文范围(天), 默认 SIMILARITY_WINDOW_DAYS
+    """
+    window_days = request.args.get('window_days', SIMILARITY_WINDOW_DAYS, type=float)
+    if window_days <= 0:
+        return jsonify({'error': 'window_days 必须大于0'}), 400
+    
+    snapshot, projects = get_active_snapshot()
+    data = snapshot.get_data(projects)
+    index = get_similarity_index(snapshot, projects, data)
+    return jsonify(compute_dispatch_factors(data, index, window_days))
+
+def _previous_in_group(groups, created, window):
+    """每张工单之前 window 内同组(如同一报告人)最近的一张工单(行号), 没有为 -1"""
+    previous = np.full(len(groups), -1, dtype=np.int64)
+    eligible = np.flatnonzero((groups >= 0) & (created != np.iinfo(np.int64).min))
+    order = eligible[np.lexsort((created[eligible], groups[eligible]))]
+    before, after = order[:-1], order[1:]
+    linked = (groups[before] == groups[after]) & (created[after] - created[before] <= window)
+    previous[after[linked]] = before[linked]
+    return previous
+
+def _context_effect(previous, assignees, hours, minutes, methods):
+    """以 previous 指向的工单为短期上下文, 比较分给与上下文相同/不同处理人, 以及没有上下文时的处理效率"""
+    has_context = (previous >= 0) & (assignees >= 0)
+    has_context[has_context] = assignees[previous[has_context]] >= 0
+    same = np.zeros(len(previous), dtype=bool)
+    same[has_context] = assignees[has_context] == assignees[previous[has_context]]
+    no_context = (previous < 0) & (assignees >= 0)
+    
+    def summarize(mask):
+        resolved, timed = hours[mask & ~np.isnan(hours)], minutes[mask & ~np.isnan(minutes)]
+        return {
+            'tickets': int(mask.sum()),
+            'median_resolution_hours': round(float(np.median(resolved)), 2) if len(resolved) else None,
+            'mean_resolution_hours': round(float(resolved.mean()), 2) if len(resolved) else None,
+            'median_processing_minutes': round(float(np.median(timed)), 2) if len(timed) else None
+        }
+    
+    with_context = int(has_context.sum())
+    result = {
+        'tickets_with_context': with_context,
+        'same_assignee_rate': round(same.sum() / with_context * 100, 2) if with_context else None,
+        'same_assignee': summarize(same),
+        'different_assignee': summarize(has_context & ~same),
+        'without_context': summarize(no_context)
     }
+    same_hours, other_hours = (result[k]['median_resolution_hours'] for k in ('same_assignee', 'different_assignee'))
+    result['median_resolution_change'] = round((same_hours - other_hours) / other_hours * 100, 2) \
+        if same_hours is not None and other_hours else None
+    if methods is not None:
+        result['by_assignment_method'] = {}
+        for method in pd.unique(methods[has_context]):
+            mask = has_context & (methods == method)
+            result['by_assignment_method'][str(method)] = {
+                'tickets_with_context': int(mask.sum()),
+                'same_assignee_rate': round((same & mask).sum() / mask.sum() * 100, 2)
+            }
+    return result
+
+def compute_dispatch_factors(data, index, window_days=SIMILARITY_WINDOW_DAYS):
+    """报告人相同、摘要相似两个分单因素的效果
+    
+    工单之前 window_days 内同一报告人(或摘要相似)的最近一张工单作为短期上下文, 比较分给与上下文
+    相同的处理人时, 解决时长(resolved_time - created_time)与处理时长是否更短。
+    """
+    result = {'tickets': len(data), 'window_days': window_days, 'factors': {}}
+    if data.empty or 'created_time' not in data.columns:
+        return result
+    
+    created = parse_timestamps(data['created_time'])
+    hours = np.full(len(data), np.nan)
+    if 'resolved_time' in data.columns:
+        hours = ((parse_timestamps(data['resolved_time']) - created) / pd.Timedelta(hours=1)).to_numpy(dtype=float)
+        hours[hours < 0] = np.nan
+    minutes = np.full(len(data), np.nan)
+    if 'actual_processing_minutes' in data.columns:
+        minutes = pd.to_numeric(data['actual_processing_minutes'], errors='coerce').to_numpy(dtype=float)
+    if 'assignee_key' in data.columns:
+        assignees = data['assignee_key'].to_numpy(dtype=np.int64)
+    else:
+        assignees = _identity_codes(data, 'assignee_employee_id')[0]
+    methods = data['assignment_method'].astype(object).to_numpy() if 'assignment_method' in data.columns else None
+    created = created.to_numpy(dtype='datetime64[ns]').view(np.int64)
+    window = int(window_days * 86400 * 1e9)
+    
+    if 'reporter' in data.columns:
+        previous = _previous_in_group(_identity_codes(data, 'reporter')[0], created, window)
+        result['factors']['same_reporter'] = _context_effect(previous, assignees, hours, minutes, methods)
+    if index is not None:
+        previous = index.previous_similar(created, window)
+        result['factors']['similar_summary'] = _context_effect(previous, assignees, hours, minutes, methods)
+        result['similarity_index'] = {
+            'distinct_summaries': index.size,
+            'indexed_summaries': int(index.indexed.sum()),
+            'bands': SIMILARITY_BANDS,
+            'rows_per_band': SIMILARITY_ROWS,
+            'threshold': SIMILARITY_THRESHOLD
+        }
+    return result
+
+@app.route('/api/similarity/lookup')
+@dataset_conditional
+def api_similarity_lookup():
+    """API: 查找与指定工单(ticket_id)或文本(summary)摘要相似的工单
+    
+    参数:
+        ticket_id / summary: 二选一
+        limit: 返回的工单数, 默认10, 最大100
+    """
+    ticket_id, text = request.args.get('ticket_id'), request.args.get('summary')
+    if not ticket_id and not text:
+        return jsonify({'error': '请提供 ticket_id 或 summary'}), 400
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+    
+    snapshot, projects = get_active_snapshot()
+    data = snapshot.get_data(projects)
+    index = get_similarity_index(snapshot, projects, data)
+    if index is None:
+        return jsonify({'error': '工单数据中没有 summary 字段'}), 400
+    
+    doc, reporter, row = None, None, None
+    if ticket_id:
+        matches = np.flatnonzero((data['ticket_id'].astype(str) == ticket_id).to_numpy())
+        if not len(matches):
+            return jsonify({'error': f'未找到工单: {ticket_id}'}), 404
+        row = matches[0]
+        doc = index.ticket_docs[row]
+        reporter = data['reporter'].iloc[row] if 'reporter' in data.columns else None
+    
+    neighbors = index.neighbors(text=text, doc=doc, limit=limit)
+    scores = np.zeros(index.size)
+    scores[[d for d, _ in neighbors]] = [score for _, score in neighbors]
+    rows = np.flatnonzero(np.isin(index.ticket_docs, [d for d, _ in neighbors]))
+    rows = rows[rows != row]
+    created = parse_timestamps(data['created_time']).to_numpy() if 'created_time' in data.columns else None
+    rows = rows[np.lexsort((-(created[rows].astype(np.int64)) if created is not None else rows,
+                            -scores[index.ticket_docs[rows]]))][:limit]
+    
+    columns = [c for c in ('ticket_id', 'summary', 'reporter', 'assignee_name', 'assignment_method', 'status',
+                           'created_time', 'resolved_time') if c in data.columns]
+    similar = data.iloc[rows][columns].astype(object)
+    similar = similar.where(similar.notna(), None)
+    similar['similarity'] = np.round(scores[index.ticket_docs[rows]], 3)
+    if reporter is not None and 'reporter' in data.columns:
+        similar['same_reporter'] = (data['reporter'].iloc[rows] == reporter).to_numpy()
+    return jsonify({
+        'query': {'ticket_id': ticket_id, 'summary': text if text else data['summary'].iloc[row]},
+        'similar_tickets': similar.to_dict('records')
+    })
 
 def analyze_trends(data):
     """趋势分析"""
     if 'created_time' not in data.columns:
         return {}
     
-    # 按月统计工单创建趋势
-    data['month'] = data['created_time'].dt.to_period('M')
-    monthly_creation = data.groupby('month').size().to_dict()
+    # 按月统计工单创建趋势(分区数据为共享只读, 不在原表上增加列)
+    monthly_creation = data.groupby(data['created_time'].dt.to_period('M')).size().to_dict()
     
     # 解决趋势
     if 'resolved_time' in data.columns:
-        resolved_data = data[data['resolved_time'].notna()]
-        resolved_data['resolved_month'] = resolved_data['resolved_time'].dt.to_period('M')
-        monthly_resolution = resolved_data.groupby('resolved_month').size().to_dict()
+        resolved_time = data['resolved_time'].dropna()
+        monthly_resolution = resolved_time.groupby(resolved_time.dt.to_period('M')).size().to_dict()
     else:
         monthly_resolution = {}
     
@@ -855,7 +4400,7 @@ def api_download_csv_template():
     
     # 创建CSV模板数据
     template_data = [
-        ['ticket_id', 'jira_key', 'summary', 'assignee_employee_id', 'priority', 'status', 'assignment_method', 'created_time', 'assigned_time', 'resolved_time', 'log_time', 'actual_processing_minutes'],
+        TICKET_TEMPLATE_COLUMNS,
         ['TICKET-001', 'PROJ-1001', '系统登录问题', 'EMP001', 'HIGH', 'RESOLVED', 'AI', '2024-01-15 10:00:00', '2024-01-15 10:05:00', '2024-01-15 11:00:00', '55', '55'],
         ['TICKET-002', 'PROJ-1002', '数据库连接超时', 'EMP002', 'CRITICAL', 'RESOLVED', 'MANUAL', '2024-01-15 11:00:00', '2024-01-15 11:30:00', '2024-01-15 13:00:00', '90', '90'],
         ['TICKET-003', 'PROJ-1003', '界面显示异常', 'EMP001', 'MEDIUM', 'RESOLVED', 'AI', '2024-01-15 14:00:00', '2024-01-15 14:02:00', '2024-01-15 14:45:00', '43', '43'],
@@ -1004,38 +4549,36 @@ def api_download_excel_template():
         )
         
         return response
-        
+    
     except Exception as e:
         return jsonify({'error': f'生成Excel模板失败: {str(e)}'}), 500
 
 @app.route('/api/export/excel')
 def api_export_excel():
     """API: 导出分析报告为Excel"""
-    global jira_data
-    if jira_data is None:
-        load_sample_data()
+    data = get_active_data()
     
     # 创建Excel文件
     output_file = 'jira_analysis_report.xlsx'
     
     with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
         # 原始数据
-        jira_data.to_excel(writer, sheet_name='原始数据', index=False)
+        data.to_excel(writer, sheet_name='原始数据', index=False)
         
         # 效率指标
-        metrics = calculate_efficiency_metrics(jira_data)
+        metrics = calculate_efficiency_metrics(data)
         metrics_df = pd.DataFrame([metrics])
         metrics_df.to_excel(writer, sheet_name='效率指标', index=False)
         
         # 按分单方式统计
-        method_stats = jira_data.groupby('assignment_method').agg({
+        method_stats = data.groupby('assignment_method').agg({
             'actual_processing_minutes': ['mean', 'std', 'count'],
             'ticket_id': 'count'
         }).round(2)
         method_stats.to_excel(writer, sheet_name='分单方式统计')
         
         # 按处理人员统计
-        assignee_stats = jira_data.groupby('assignee_employee_id').agg({
+        assignee_stats = data.groupby('assignee_employee_id').agg({
             'actual_processing_minutes': ['mean', 'count'],
             'ticket_id': 'count'
         }).round(2)
@@ -1043,6 +4586,453 @@ def api_export_excel():
     
     return send_file(output_file, as_attachment=True)
 
+# 报告生成: 静态图表及PDF排版在进程池中执行, 结果按数据版本缓存; 定时生成的报告写入报告目录
+REPORTS_DIR = os.environ.get('JTAS_REPORTS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reports'))
+REPORT_FORMATS = ('html', 'pdf')
+REPORT_JOB_NAME = 'report_build'
+REPORT_RENDER_WORKERS = max(1, int(os.environ.get('JTAS_REPORT_WORKERS', 2)))
+REPORT_TABLE_MAX_ROWS = 25
+REPORT_FONT_FAMILIES = ['Noto Sans CJK SC', 'Source Han Sans SC', 'WenQuanYi Micro Hei', 'WenQuanYi Zen Hei',
+                        'SimHei', 'Microsoft YaHei', 'PingFang SC', 'Heiti SC', 'DejaVu Sans']
+REPORT_METRIC_LABELS = {
+    'total_tickets': '工单总数',
+    'ai_tickets': 'AI分单工单数',
+    'manual_tickets': '人工分单工单数',
+    'avg_ai_processing_time': 'AI分单平均处理时间(分钟)',
+    'avg_manual_processing_time': '人工分单平均处理时间(分钟)',
+    'efficiency_improvement': '效率提升(%)',
+    'completion_rate': '完成率(%)',
+    'time_saved_total_hours': '累计节省时间(小时)',
+    'ai_speed_ratio': 'AI处理速度倍数'
+}
+
+_report_executor = None
+_report_executor_lock = threading.Lock()
+_report_builds = {}
+_report_builds_lock = threading.Lock()
+
+def report_charts_available():
+    """静态图表及PDF依赖 matplotlib(可选依赖)"""
+    import importlib.util
+    return importlib.util.find_spec('matplotlib') is not None
+
+def report_executor():
+    """报告渲染进程池, 首次使用时创建; 子进程以 spawn 方式启动, 不继承Web进程的线程与锁"""
+    global _report_executor
+    with _report_executor_lock:
+        if _report_executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            _report_executor = ProcessPoolExecutor(max_workers=REPORT_RENDER_WORKERS,
+                                                   mp_context=multiprocessing.get_context('spawn'))
+            atexit.register(shutdown_report_executor)
+        return _report_executor
+
+def shutdown_report_executor(wait=True):
+    """关闭报告渲染进程池(进程退出时自动调用), 之后再次使用时重新创建"""
+    global _report_executor
+    with _report_executor_lock:
+        executor, _report_executor = _report_executor, None
+    if executor is not None:
+        atexit.unregister(shutdown_report_executor)
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+def run_report_tasks(func, items):
+    """在进程池中并行执行渲染任务; 进程池不可用时在当前进程中执行"""
+    from concurrent.futures.process import BrokenProcessPool
+    try:
+        return list(report_executor().map(func, items))
+    except (OSError, BrokenProcessPool) as e:
+        print(f"报告渲染进程池不可用, 改为在当前进程中渲染: {e}")
+        shutdown_report_executor(wait=False)
+        return [func(item) for item in items]
+
+def single_flight(key, build):
+    """同一 key 同时只执行一次 build, 并发的调用者等待并共用其结果(或异常)"""
+    with _report_builds_lock:
+        future = _report_builds.get(key)
+        leader = future is None
+        if leader:
+            future = _report_builds[key] = Future()
+    if not leader:
+        return future.result()
+    
+    try:
+        future.set_result(build())
+    except BaseException as e:
+        future.set_exception(e)
+    finally:
+        with _report_builds_lock:
+            _report_builds.pop(key, None)
+    return future.result()
+
+def _report_pyplot():
+    """matplotlib(Agg后端)及中文字体配置"""
+    import warnings
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib import font_manager
+    
+    available = {font.name for font in font_manager.fontManager.ttflist}
+    plt.rcParams['font.sans-serif'] = [f for f in REPORT_FONT_FAMILIES if f in available] or ['DejaVu Sans']
+    plt.rcParams['axes.unicode_minus'] = False
+    # 系统缺少中文字体时仍可生成报告, 只是中文显示为方框
+    warnings.filterwarnings('ignore', message='Glyph .* missing from')
+    return plt
+
+def render_chart_png(spec):
+    """把图表描述(纯数据)渲染为PNG, 在渲染子进程中执行"""
+    plt = _report_pyplot()
+    from matplotlib.ticker import MaxNLocator
+    
+    fig, ax = plt.subplots(figsize=(8, 4.5), dpi=110)
+    labels, series = spec['labels'], spec['series']
+    if spec['kind'] == 'line':
+        for name, values in series.items():
+            ax.plot(labels, values, label=name, marker='o', markersize=3)
+        ax.xaxis.set_major_locator(MaxNLocator(10))
+        ax.tick_params(axis='x', labelrotation=30)
+    elif spec['kind'] == 'barh':
+        values = next(iter(series.values()))
+        ax.barh(labels[::-1], values[::-1], color='#667eea')
+    else:
+        positions = np.arange(len(labels))
+        width = 0.8 / max(1, len(series))
+        for i, (name, values) in enumerate(series.items()):
+            ax.bar(positions - 0.4 + width * (i + 0.5), values, width, label=name)
+        ax.set_xticks(positions, labels)
+    if len(series) > 1:
+        ax.legend()
+    ax.set_title(spec['title'])
+    ax.set_xlabel(spec.get('xlabel', ''))
+    ax.set_ylabel(spec.get('ylabel', ''))
+    ax.grid(axis='x' if spec['kind'] == 'barh' else 'y', alpha=0.3)
+    fig.tight_layout()
+    
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    plt.close(fig)
+    return buffer.getvalue()
+
+def render_pdf_report(report):
+    """把报告内容排版为A4 PDF: 各章节表格依次排布, 其后每页一个图表; 在渲染子进程中执行"""
+    import textwrap
+    plt = _report_pyplot()
+    from matplotlib.backends.backend_pdf import PdfPages
+    import matplotlib.image as mpimg
+    
+    line_height, margin = 0.022, 0.06
+    buffer = io.BytesIO()
+    with PdfPages(buffer) as pdf:
+        fig = plt.figure(figsize=(8.27, 11.69))
+        fig.text(margin, 0.95, report['title'], fontsize=18, weight='bold')
+        fig.text(margin, 0.93, report['subtitle'], fontsize=9, color='gray')
+        top = 0.9
+        
+        for section in report['sections']:
+            if 'paragraphs' in section:
+                lines = [line for paragraph in section['paragraphs']
+                         for line in textwrap.wrap(paragraph, 46) or ['']]
+            else:
+                lines = section['rows']
+            needed = line_height * (len(lines) + 2.5)
+            if top - needed < margin and top < 0.9:
+                pdf.savefig(fig)
+                plt.close(fig)
+                fig = plt.figure(figsize=(8.27, 11.69))
+                top = 0.95
+            
+            fig.text(margin, top, section['title'], fontsize=12, weight='bold')
+            top -= line_height * 1.2
+            if 'paragraphs' in section:
+                for line in lines:
+                    fig.text(margin, top, line, fontsize=9)
+                    top -= line_height
+            else:
+                height = line_height * (len(lines) + 1)
+                ax = fig.add_axes([margin, top - height, 1 - 2 * margin, height])
+                ax.axis('off')
+                table = ax.table(cellText=[[str(v) for v in row] for row in lines], colLabels=section['columns'],
+                                 loc='upper center', cellLoc='left', bbox=[0, 0, 1, 1])
+                table.auto_set_font_size(False)
+                table.set_fontsize(8)
+                top -= height
+            top -= line_height * 1.3
+        pdf.savefig(fig)
+        plt.close(fig)
+        
+        for chart in report['charts']:
+            fig = plt.figure(figsize=(8.27, 5.2))
+            ax = fig.add_axes([0, 0, 1, 1])
+            ax.imshow(mpimg.imread(io.BytesIO(chart['png']), format='png'))
+            ax.axis('off')
+            pdf.savefig(fig)
+            plt.close(fig)
+    return buffer.getvalue()
+
+def report_chart_specs(snapshot, data):
+    """报告中的图表描述; 只包含可序列化的纯数据, 以便发送到渲染子进程"""
+    specs = []
+    minutes = pd.to_numeric(data['actual_processing_minutes'], errors='coerce')
+    
+    by_method = minutes.groupby(data['assignment_method']).mean().dropna().round(2)
+    if not by_method.empty:
+        specs.append({'kind': 'bar', 'title': 'AI vs 人工分单 - 平均处理时间对比', 'labels': list(map(str, by_method.index)),
+                      'series': {'平均处理时间': by_method.tolist()}, 'xlabel': '分单方式', 'ylabel': '分钟'})
+    
+    stats = assignee_ticket_stats(data, snapshot.assignees())
+    top = stats[stats['ticket_count'] > 0].nlargest(15, 'ticket_count')
+    if not top.empty:
+        specs.append({'kind': 'barh', 'title': '处理人员工作负载(前15名)', 'labels': list(map(str, top['name'])),
+                      'series': {'工单数': top['ticket_count'].tolist()}, 'xlabel': '工单数'})
+    
+    if 'priority' in data.columns:
+        by_priority = minutes.groupby([data['priority'], data['assignment_method']]).mean().unstack().round(2)
+        if not by_priority.empty:
+            specs.append({'kind': 'bar', 'title': '各优先级平均处理时间', 'labels': list(map(str, by_priority.index)),
+                          'series': {str(c): by_priority[c].fillna(0).tolist() for c in by_priority.columns},
+                          'xlabel': '优先级', 'ylabel': '分钟'})
+    
+    if 'created_time' in data.columns and data['created_time'].notna().any():
+        # 时间跨度较长时按周汇总, 避免点数过多
+        created = data['created_time']
+        weekly = (created.max() - created.min()).days > 120
+        period = created.dt.to_period('W').dt.start_time if weekly else created.dt.floor('D')
+        trend = data.groupby([period, 'assignment_method']).size().unstack(fill_value=0)
+        specs.append({'kind': 'line', 'title': f"{'每周' if weekly else '每日'}新建工单趋势",
+                      'labels': [d.strftime('%Y-%m-%d' if weekly else '%m-%d') for d in trend.index],
+                      'series': {str(c): trend[c].tolist() for c in trend.columns}, 'ylabel': '工单数'})
+    return specs
+
+def report_chart_images(snapshot, projects):
+    """并行渲染报告图表, 按数据版本及项目范围缓存"""
+    def render():
+        if not report_charts_available():
+            print("matplotlib库未安装，报告中不包含图表")
+            return []
+        specs = report_chart_specs(snapshot, snapshot.get_data(projects))
+        return [{'title': spec['title'], 'png': png} for spec, png in zip(specs, run_report_tasks(render_chart_png, specs))]
+    key = ('report_charts', tuple(sorted(projects or [])))
+    return snapshot.cached(key, lambda: single_flight((snapshot.version,) + key, render))
+
+def _report_value(value):
+    """报告表格中的取值格式"""
+    if isinstance(value, (float, np.floating)):
+        return '-' if np.isnan(value) else f'{value:,.2f}'
+    return value
+
+def report_sections(metrics, analysis):
+    """把效率指标与高级分析结果整理为报告章节(表格或段落); 未能计算的部分为 None, 对应章节省略"""
+    sections = []
+    if metrics is not None:
+        sections.append({'title': '效率指标', 'columns': ['指标', '数值'],
+                         'rows': [[label, _report_value(metrics[key])] for key, label in REPORT_METRIC_LABELS.items()
+                                  if key in metrics]})
+    if analysis is None:
+        return sections
+    
+    health, quality = analysis['project_health'], analysis['quality_metrics']
+    sections.append({'title': '项目健康度与质量', 'columns': ['指标', '数值'], 'rows': [
+        ['健康度得分', _report_value(health['health_score'])],
+        ['健康状态', health['health_status']],
+        ['解决率(%)', _report_value(health['resolution_rate'])],
+        ['平均解决天数', _report_value(health['avg_resolution_days'])],
+        ['质量得分', _report_value(quality['quality_score'])],
+        ['高优先级占比(%)', _report_value(quality['high_priority_rate'])],
+        ['超期率(%)', _report_value(quality['overdue_rate'])],
+        ['未分派率(%)', _report_value(quality['unassigned_rate'])]
+    ]})
+    
+    team = sorted(analysis['team_performance'].get('team_statistics', {}).items(),
+                  key=lambda item: -item[1]['total_tickets'])[:REPORT_TABLE_MAX_ROWS]
+    if team:
+        sections.append({'title': '团队绩效', 'columns': ['处理人', '工单数', '平均处理时间', '解决率(%)', '效率得分'],
+                         'rows': [[name, int(s['total_tickets']), _report_value(s['avg_time']),
+                                   _report_value(s['resolution_rate']), _report_value(s['efficiency_score'])]
+                                  for name, s in team]})
+    
+    fairness = analysis['resource_allocation'].get('fairness') or {}
+    if fairness:
+        sections.append({'title': '分单公平性(按周)', 'columns': ['分单方式', '工单数Gini', '负载Gini', '工单数最大/最小比'],
+                         'rows': [[method, _report_value(s.get('mean_ticket_gini')), _report_value(s.get('mean_load_gini')),
+                                   _report_value(s.get('mean_ticket_max_min_ratio'))]
+                                  for method, s in fairness.items()]})
+    
+    insights = analysis.get('insights_and_recommendations') or []
+    if insights:
+        sections.append({'title': '关键洞察和建议', 'paragraphs': [
+            f"{item.get('message', '')} 建议: {item.get('recommendation', '')}" for item in insights]})
+    return sections
+
+def collect_report(snapshot, projects=None):
+    """汇总报告内容: 效率指标、高级分析及图表; 数据缺少某部分所需字段时省略该部分"""
+    data = snapshot.get_data(projects)
+    scope = sorted(projects) if projects else sorted(snapshot.partitions)
+    
+    def section(name, compute):
+        try:
+            return compute(data)
+        except Exception as e:
+            print(f"报告{name}失败: {e}")
+            return None
+    
+    metrics = section('效率指标', calculate_efficiency_metrics)
+    analysis = section('高级分析', build_advanced_analysis)
+    return {
+        'title': 'JIRA工单效率分析报告',
+        'subtitle': f"项目: {', '.join(scope)} | 数据版本: v{snapshot.version} ({snapshot.source}) | "
+                    f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+        'sections': report_sections(metrics, analysis),
+        'charts': report_chart_images(snapshot, projects)
+    }
+
+def build_report(snapshot, projects=None, fmt='html'):
+    """生成报告文件内容(bytes), 按数据版本、项目范围及格式缓存"""
+    def build():
+        report = collect_report(snapshot, projects)
+        if fmt == 'pdf':
+            return run_report_tasks(render_pdf_report, [report])[0]
+        charts = [{'title': c['title'], 'src': 'data:image/png;base64,' + base64.b64encode(c['png']).decode('ascii')}
+                  for c in report['charts']]
+        with app.app_context():
+            return render_template('report.html', report=report, charts=charts).encode('utf-8')
+    # 同一版本、项目范围及格式的报告并发请求时只生成一次
+    key = ('report', fmt, tuple(sorted(projects or [])))
+    return snapshot.cached(key, lambda: single_flight((snapshot.version,) + key, build))
+
+def report_file_name(projects, version, fmt, now=None):
+    """报告文件名: 项目范围-生成时间-数据版本"""
+    scope = '_'.join(re.sub(r'[^A-Za-z0-9_-]', '_', p) for p in projects) if projects else 'ALL'
+    return f"{scope}-{(now or datetime.now()).strftime('%Y%m%d-%H%M')}-v{version}.{fmt}"
+
+def build_scheduled_reports(formats, per_project=False, projects=None):
+    """后台任务: 为当前数据版本生成报告并写入报告目录, 不占用Web请求线程"""
+    snapshot = dataset_store.current()
+    if not snapshot.partitions:
+        return []
+    selected = sorted(set(projects) & set(snapshot.partitions)) if projects else sorted(snapshot.partitions)
+    groups = [[key] for key in selected] if per_project else [selected if projects else None]
+    
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    now, written = datetime.now(), []
+    for group in groups:
+        for fmt in formats:
+            path = os.path.join(REPORTS_DIR, report_file_name(group, snapshot.version, fmt, now))
+            if os.path.exists(path):
+                continue
+            content = build_report(snapshot, group, fmt)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(content)
+            os.replace(path + '.tmp', path)
+            written.append(os.path.basename(path))
+    print(f"报告生成完成: {len(written)} 个文件")
+    return written
+
+def parse_report_formats(value):
+    """解析报告格式列表, 不支持的格式返回 None"""
+    formats = [f.strip().lower() for f in (value if isinstance(value, list) else str(value).split(',')) if f.strip()]
+    if not formats or any(f not in REPORT_FORMATS for f in formats):
+        return None
+    if 'pdf' in formats and not report_charts_available():
+        return None
+    return list(dict.fromkeys(formats))
+
+@app.route('/api/reports/export')
+def api_report_export():
+    """API: 导出当前数据的分析报告(HTML/PDF), 同一数据版本复用已生成的报告"""
+    fmt = request.args.get('format', 'html').lower()
+    if fmt not in REPORT_FORMATS:
+        return jsonify({'error': 'format 仅支持 html、pdf'}), 400
+    if fmt == 'pdf' and not report_charts_available():
+        return jsonify({'error': '生成PDF报告需要安装matplotlib'}), 501
+    
+    snapshot, projects = get_active_snapshot()
+    try:
+        content = build_report(snapshot, projects, fmt)
+    except Exception as e:
+        return jsonify({'error': f'生成报告失败: {str(e)}'}), 500
+    return send_file(io.BytesIO(content), mimetype='application/pdf' if fmt == 'pdf' else 'text/html',
+                     as_attachment=True, download_name=report_file_name(projects, snapshot.version, fmt))
+
+@app.route('/api/reports')
+def api_reports():
+    """API: 已生成的报告列表及定时任务状态"""
+    reports = []
+    if os.path.isdir(REPORTS_DIR):
+        for entry in os.scandir(REPORTS_DIR):
+            if entry.is_file() and entry.name.rsplit('.', 1)[-1] in REPORT_FORMATS:
+                stat = entry.stat()
+                reports.append({'name': entry.name, 'size': stat.st_size,
+                                'created_at': datetime.fromtimestamp(stat.st_mtime).isoformat()})
+    reports.sort(key=lambda r: r['created_at'], reverse=True)
+    return jsonify({'success': True, 'reports': reports, 'job': scheduler.status().get(REPORT_JOB_NAME)})
+
+@app.route('/api/reports/<name>')
+def api_report_download(name):
+    """API: 下载已生成的报告"""
+    if name.rsplit('.', 1)[-1] not in REPORT_FORMATS:
+        return jsonify({'error': '报告不存在'}), 404
+    return send_from_directory(REPORTS_DIR, name, as_attachment=True)
+
+@app.route('/api/reports/schedule', methods=['POST'])
+def api_report_schedule():
+    """API: 配置定时生成报告(可按项目分别生成)"""
+    data = request.get_json() or {}
+    formats = parse_report_formats(data.get('formats', 'html'))
+    if formats is None:
+        return jsonify({'error': 'formats 仅支持 html、pdf(pdf需要安装matplotlib)'}), 400
+    try:
+        interval_minutes = positive_number(data, 'interval_minutes', 24 * 60, float)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    projects = [k for k in dict.fromkeys(data.get('projects') or []) if k] or None
+    per_project = bool(data.get('per_project', False))
+    
+    scheduler.add_job(
+        REPORT_JOB_NAME,
+        lambda: build_scheduled_reports(formats, per_project, projects),
+        interval_minutes * 60,
+        run_immediately=bool(data.get('run_immediately', True))
+    )
+    return jsonify({
+        'success': True,
+        'message': f'已配置每 {interval_minutes:g} 分钟生成报告',
+        'formats': formats,
+        'per_project': per_project,
+        'projects': projects,
+        'jobs': scheduler.status()
+    })
+
+@app.route('/api/reports/schedule', methods=['DELETE'])
+def api_report_schedule_cancel():
+    """API: 停止定时生成报告"""
+    if not scheduler.remove_job(REPORT_JOB_NAME):
+        return jsonify({'error': '未配置定时报告任务'}), 404
+    return jsonify({'success': True, 'message': '已停止定时生成报告'})
+
+@app.errorhandler(413)
+def request_too_large(e):
+    """上传超过 JTAS_MAX_UPLOAD_MB 时返回JSON错误"""
+    return jsonify({'error': f'上传文件超过大小上限 {MAX_UPLOAD_MB:g}MB'}), 413
+
+@app.route('/api/admin/memory')
+def api_admin_memory():
+    """API: 数据集分区、派生缓存及上传的内存统计"""
+    return jsonify(memory_budget.report())
+
+@app.route('/api/admin/memory/evict', methods=['POST'])
+def api_admin_memory_evict():
+    """API: 立即执行预算检查; clear_caches 为真时清空当前版本的全部派生缓存"""
+    data = request.get_json(silent=True) or {}
+    if data.get('clear_caches'):
+        snapshot = dataset_store.current()
+        for key, _, _ in snapshot.cache_usage():
+            snapshot.evict_cached(key)
+            memory_budget.evicted_caches += 1
+    memory_budget.enforce()
+    return jsonify({'success': True, **memory_budget.report()})
+
 if __name__ == '__main__':
     # 确保模板目录存在
     os.makedirs('templates', exist_ok=True)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+分单回放模拟基准测试
+
+生成合成工单(泊松到达、对数正态处理时长), 对每种分单策略回放并统计耗时。
+
+用法:
+    python scripts/benchmark_dispatch.py                          默认100万工单、20名处理人
+    python scripts/benchmark_dispatch.py --tickets 200000 --assignees 50
+    python scripts/benchmark_dispatch.py --policies fewest_tickets,least_loaded
+    python scripts/benchmark_dispatch.py --max-seconds 10         任一策略超过阈值时以非零状态退出(用于回归检查)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app import DISPATCH_POLICIES, DispatchSimulator
+
+def synthetic_tickets(tickets, assignees, utilization, seed):
+    """按目标利用率生成到达间隔, 使各处理人平均负载接近 utilization"""
+    rng = np.random.default_rng(seed)
+    minutes = rng.lognormal(mean=3.5, sigma=0.8, size=tickets)
+    gaps = rng.exponential(minutes.mean() / (assignees * utilization), size=tickets)
+    created = pd.Timestamp('2024-01-01') + pd.to_timedelta(np.cumsum(gaps), unit='m')
+    return pd.DataFrame({
+        'ticket_id': np.arange(tickets),
+        'assignee_employee_id': [f'EMP{i:03d}' for i in rng.integers(0, assignees, tickets)],
+        'assignment_method': rng.choice(['AI', 'MANUAL'], tickets),
+        'created_time': created,
+        'actual_processing_minutes': minutes.round(1)
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description='JTAS dispatch replay benchmark')
+    parser.add_argument('--tickets', type=int, default=1000000)
+    parser.add_argument('--assignees', type=int, default=20)
+    parser.add_argument('--utilization', type=float, default=0.8, help='处理人平均利用率')
+    parser.add_argument('--policies', default=','.join(DISPATCH_POLICIES))
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--max-seconds', type=float, help='单个策略回放耗时上限')
+    args = parser.parse_args()
+    
+    data = synthetic_tickets(args.tickets, args.assignees, args.utilization, args.seed)
+    start = time.perf_counter()
+    simulator = DispatchSimulator.from_tickets(data)
+    report = {
+        'tickets': simulator.size,
+        'assignees': len(simulator.assignees),
+        'prepare_seconds': round(time.perf_counter() - start, 3),
+        'policies': {}
+    }
+    
+    for name in args.policies.split(','):
+        start = time.perf_counter()
+        result = simulator.run(DISPATCH_POLICIES[name])
+        elapsed = time.perf_counter() - start
+        summary = simulator.summarize(result)
+        report['policies'][name] = {
+            'replay_seconds': round(elapsed, 3),
+            'tickets_per_second': int(simulator.size / elapsed),
+            'avg_wait_minutes': summary['avg_wait_minutes'],
+            'p90_wait_minutes': summary['p90_wait_minutes'],
+            'avg_completion_minutes': summary['avg_completion_minutes'],
+            'ticket_gini': summary['load_balance']['ticket_gini']
+        }
+    
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    
+    slow = [name for name, r in report['policies'].items()
+            if args.max_seconds is not None and r['replay_seconds'] > args.max_seconds]
+    if slow:
+        print(f"回放耗时超过上限 {args.max_seconds}s: {', '.join(slow)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
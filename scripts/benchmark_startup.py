@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+启动耗时基准测试
+
+在全新的Python进程中测量 "导入app" 与 "冷启动到第一个请求返回" 的耗时, 多次运行取中位数。
+
+用法:
+    python scripts/benchmark_startup.py                    进程内(test client)模式
+    python scripts/benchmark_startup.py --mode server      启动真实HTTP服务并轮询第一个响应
+    python scripts/benchmark_startup.py --max-seconds 1.5  中位数超过阈值时以非零状态退出(用于回归检查)
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 子进程中执行: 输出导入耗时与首个请求完成耗时(秒)
+INPROCESS_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get({path!r})
+served = time.perf_counter()
+print(json.dumps({{
+    'import_seconds': imported - start,
+    'first_request_seconds': served - start,
+    'status': response.status_code,
+    'heavy_modules_loaded': sorted(m for m in ('plotly', 'requests') if m in sys.modules)
+}}))
+"""
+
+# 子进程中执行: 启动不带重载的开发服务器
+SERVER_PROBE = """
+import sys
+sys.path.insert(0, {root!r})
+from app import app
+app.run(host='127.0.0.1', port={port}, debug=False, use_reloader=False)
+"""
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def run_inprocess(path):
+    """在新进程中导入app并通过test client发出第一个请求"""
+    output = subprocess.check_output(
+        [sys.executable, '-c', INPROCESS_PROBE.format(root=ROOT_DIR, path=path)],
+        cwd=ROOT_DIR, stderr=subprocess.DEVNULL
+    )
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+def run_server(path, timeout=30):
+    """启动HTTP服务, 轮询直到第一个请求成功返回"""
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-c', SERVER_PROBE.format(root=ROOT_DIR, port=port)],
+        cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}{path}', timeout=5) as response:
+                    return {
+                        'first_request_seconds': time.perf_counter() - start,
+                        'status': response.status
+                    }
+            except OSError:
+                if process.poll() is not None:
+                    raise RuntimeError('服务进程启动失败')
+                time.sleep(0.02)
+        raise RuntimeError(f'{timeout} 秒内服务未响应')
+    finally:
+        process.terminate()
+        process.wait()
+
+def summarize(values):
+    return {
+        'min': round(min(values), 3),
+        'median': round(statistics.median(values), 3),
+        'max': round(max(values), 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='JTAS startup benchmark')
+    parser.add_argument('--mode', choices=['inprocess', 'server'], default='inprocess')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--path', default='/api/metrics', help='首个请求的URL路径')
+    parser.add_argument('--max-seconds', type=float, help='冷启动到首个响应的中位数上限')
+    args = parser.parse_args()
+    
+    results = []
+    for _ in range(args.runs):
+        results.append(run_inprocess(args.path) if args.mode == 'inprocess' else run_server(args.path))
+    
+    report = {
+        'mode': args.mode,
+        'runs': args.runs,
+        'path': args.path,
+        'first_request_seconds': summarize([r['first_request_seconds'] for r in results]),
+        'statuses': sorted(set(r['status'] for r in results))
+    }
+    if args.mode == 'inprocess':
+        report['import_seconds'] = summarize([r['import_seconds'] for r in results])
+        report['heavy_modules_loaded'] = results[-1]['heavy_modules_loaded']
+    
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    
+    if args.max_seconds is not None and report['first_request_seconds']['median'] > args.max_seconds:
+        print(f"冷启动中位数 {report['first_request_seconds']['median']}s 超过上限 {args.max_seconds}s")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+仪表板轮询负载测试
+
+生成指定规模的合成工单并通过 /api/upload 导入, 然后以多个并发客户端按路由权重持续请求,
+统计每个路由的吞吐量(RPS)、p50/p99延迟及单次冷请求的内存峰值增量。
+
+用法:
+    python scripts/load_test.py                                   进程内(test client)模式, 10万工单, 8并发
+    python scripts/load_test.py --mode server                     启动真实HTTP服务(开发服务器)
+    python scripts/load_test.py --mode server --gunicorn-workers 4
+    python scripts/load_test.py --url http://127.0.0.1:5000 --skip-upload
+    python scripts/load_test.py --routes "/api/metrics=4,/api/charts/workload=1" --concurrency 32 --duration 30
+    python scripts/load_test.py --etag                           模拟携带 If-None-Match 轮询的仪表板
+    python scripts/load_test.py --min-rps 200 --max-p99-ms 500   不满足阈值时以非零状态退出(用于回归检查)
+
+内存峰值通过重置 /proc/<pid>/clear_refs 中的 VmHWM 测量, 仅在 Linux 上且能访问服务进程时可用。
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_ROUTES = '/=1,/api/metrics=4,/api/charts/comparison=2,/api/charts/workload=2,/api/jira/analysis/advanced=1'
+
+# 子进程中执行: 启动不带重载的多线程开发服务器
+SERVER_PROBE = """
+import sys
+sys.path.insert(0, {root!r})
+from app import app
+app.run(host='127.0.0.1', port={port}, debug=False, use_reloader=False, threaded=True)
+"""
+
+def synthetic_tickets(tickets, assignees, projects, seed):
+    """生成包含高级分析所需字段的合成工单"""
+    rng = np.random.default_rng(seed)
+    minutes = rng.lognormal(mean=4.0, sigma=0.7, size=tickets).round(1)
+    created = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.uniform(0, 180 * 24 * 60, tickets), unit='m')
+    assigned = created + pd.to_timedelta(rng.exponential(30, tickets), unit='m')
+    resolved = assigned + pd.to_timedelta(minutes * rng.uniform(1, 4, tickets), unit='m')
+    status = rng.choice(['Resolved', 'Closed', 'Done', 'In Progress', 'Open'], tickets, p=[.4, .2, .2, .1, .1])
+    keys = [f'P{i}' for i in range(projects)]
+    project = np.array(keys)[rng.integers(0, projects, tickets)]
+    ids = np.arange(1, tickets + 1).astype(str)
+    
+    return pd.DataFrame({
+        'ticket_id': np.char.add('T-', ids),
+        'jira_key': np.char.add(np.char.add(project, '-'), ids),
+        'summary': '负载测试工单',
+        'assignee_employee_id': np.char.add('EMP', rng.integers(0, assignees, tickets).astype(str)),
+        'priority': rng.choice(['Low', 'Medium', 'High', 'Critical'], tickets),
+        'status': status,
+        'issue_type': rng.choice(['Bug', 'Task', 'Story'], tickets),
+        'reporter': np.char.add('user', rng.integers(0, 200, tickets).astype(str)),
+        'assignment_method': rng.choice(['AI', 'MANUAL'], tickets),
+        'created_time': created.strftime('%Y-%m-%d %H:%M:%S'),
+        'assigned_time': assigned.strftime('%Y-%m-%d %H:%M:%S'),
+        'resolved_time': pd.Series(resolved.strftime('%Y-%m-%d %H:%M:%S')).where(
+            np.isin(status, ['Resolved', 'Closed', 'Done'])),
+        'log_time': minutes,
+        'actual_processing_minutes': minutes
+    })
+
+def parse_routes(value):
+    """解析路由权重 "/api/metrics=4,/api/tickets?limit=50=2"
+    
+    路由可带查询参数: 最后一个 = 之后为数字、且不是查询参数本身的取值时才视为权重。
+    """
+    routes = {}
+    for item in value.split(','):
+        path, _, weight = item.strip().rpartition('=')
+        if not re.fullmatch(r'\d+(?:\.\d+)?', weight) or ('?' in path and '=' not in re.split(r'[?&]', path)[-1]):
+            path, weight = item.strip(), ''
+        if path:
+            routes[path] = float(weight or 1)
+    return routes
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def process_tree(pid):
+    """进程及其全部子进程(gunicorn master + workers)"""
+    pids, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        pids.append(current)
+        for task in os.listdir(f'/proc/{current}/task'):
+            try:
+                with open(f'/proc/{current}/task/{task}/children') as f:
+                    pending.extend(int(p) for p in f.read().split())
+            except OSError:
+                pass
+    return pids
+
+def read_status_kb(pid, field):
+    with open(f'/proc/{pid}/status') as f:
+        return int(re.search(rf'{field}:\s+(\d+)', f.read()).group(1))
+
+class MemoryProbe:
+    """通过 VmHWM 测量一次请求期间进程(及子进程)的常驻内存峰值增量"""
+    def __init__(self, pid):
+        self.pid = pid
+    
+    def available(self):
+        try:
+            self.reset()
+            return True
+        except (OSError, AttributeError):
+            return False
+    
+    def reset(self):
+        baseline = {}
+        for pid in process_tree(self.pid):
+            with open(f'/proc/{pid}/clear_refs', 'w') as f:
+                f.write('5')
+            baseline[pid] = read_status_kb(pid, 'VmRSS')
+        return baseline
+    
+    def peak_delta_mb(self, baseline):
+        delta = 0
+        for pid, rss in baseline.items():
+            try:
+                delta += max(0, read_status_kb(pid, 'VmHWM') - rss)
+            except OSError:
+                pass
+        return round(delta / 1024, 1)
+    
+    def rss_mb(self):
+        total = 0
+        for pid in process_tree(self.pid):
+            try:
+                total += read_status_kb(pid, 'VmRSS')
+            except OSError:
+                pass
+        return round(total / 1024, 1)
+
+class InProcessClient:
+    """Flask test client; 每个线程使用独立的client"""
+    def __init__(self):
+        sys.path.insert(0, ROOT_DIR)
+        from app import app
+        self.app = app
+        self._local = threading.local()
+    
+    def _client(self):
+        if not hasattr(self._local, 'client'):
+            self._local.client = self.app.test_client()
+        return self._local.client
+    
+    def get(self, path, headers=None):
+        response = self._client().get(path, headers=headers or {})
+        response.get_data()
+        return response.status_code, response.headers.get('ETag')
+    
+    def upload(self, name, content):
+        response = self._client().post('/api/upload', data={'file': (io.BytesIO(content), name)},
+                                       content_type='multipart/form-data')
+        return response.status_code, response.get_json()
+
+class HttpClient:
+    """通过HTTP请求本地或远程服务"""
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+    
+    def get(self, path, headers=None):
+        request = urllib.request.Request(self.base_url + path, headers=headers or {})
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                response.read()
+                return response.status, response.headers.get('ETag')
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code, e.headers.get('ETag')
+    
+    def upload(self, name, content):
+        boundary = f'jtas-load-test-{random.getrandbits(64):x}'
+        body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{name}"\r\n'
+                f'Content-Type: application/octet-stream\r\n\r\n').encode('utf-8') + content + \
+            f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        request = urllib.request.Request(self.base_url + '/api/upload', data=body, method='POST',
+                                         headers={'Content-Type': f'multipart/form-data; boundary={boundary}'})
+        try:
+            with urllib.request.urlopen(request, timeout=600) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read() or b'{}')
+
+def start_server(args):
+    """启动开发服务器或gunicorn, 返回 (进程, 基础URL)"""
+    port = free_port()
+    env = dict(os.environ)
+    if args.gunicorn_workers:
+        # 多worker时数据集需通过共享目录发布, 否则上传只对接收请求的worker可见
+        env.setdefault('JTAS_SHARED_DATASET_DIR', tempfile.mkdtemp(prefix='jtas-load-'))
+        command = ['gunicorn', '-w', str(args.gunicorn_workers), '--threads', str(args.gunicorn_threads),
+                   '-b', f'127.0.0.1:{port}', '--timeout', '600', 'app:app']
+    else:
+        command = [sys.executable, '-c', SERVER_PROBE.format(root=ROOT_DIR, port=port)]
+    process = subprocess.Popen(command, cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    
+    base_url = f'http://127.0.0.1:{port}'
+    start = time.perf_counter()
+    while time.perf_counter() - start < 60:
+        try:
+            with urllib.request.urlopen(base_url + '/api/projects', timeout=5):
+                return process, base_url
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError('服务进程启动失败')
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError('60 秒内服务未响应')
+
+def measure_memory(client, probe, routes):
+    """导入数据后(响应缓存为空时)逐个路由发出一次冷请求, 测量内存峰值增量与耗时"""
+    results = {}
+    for path in routes:
+        baseline = probe.reset() if probe else None
+        start = time.perf_counter()
+        status, _ = client.get(path)
+        results[path] = {
+            'cold_status': status,
+            'cold_latency_ms': round((time.perf_counter() - start) * 1000, 1),
+            'cold_peak_rss_delta_mb': probe.peak_delta_mb(baseline) if probe else None
+        }
+    return results
+
+def run_load(client, routes, concurrency, duration, max_requests, use_etag, accept_encoding, seed):
+    """并发客户端按权重随机选择路由持续请求, 返回各路由的延迟样本及整体耗时"""
+    paths, weights = list(routes), list(routes.values())
+    samples = {path: [] for path in paths}
+    errors = {path: 0 for path in paths}
+    not_modified = {path: 0 for path in paths}
+    lock = threading.Lock()
+    counter = iter(range(max_requests)) if max_requests else None
+    deadline = time.perf_counter() + duration
+    
+    def worker(index):
+        rng = random.Random(seed + index)
+        etags, local = {}, []
+        while time.perf_counter() < deadline:
+            if counter is not None:
+                with lock:
+                    if next(counter, None) is None:
+                        break
+            path = rng.choices(paths, weights)[0]
+            headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+            if use_etag and path in etags:
+                headers['If-None-Match'] = etags[path]
+            start = time.perf_counter()
+            status, etag = client.get(path, headers)
+            local.append((path, time.perf_counter() - start, status))
+            if etag:
+                etags[path] = etag
+        with lock:
+            for path, latency, status in local:
+                samples[path].append(latency)
+                if status == 304:
+                    not_modified[path] += 1
+                elif status >= 400:
+                    errors[path] += 1
+    
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, errors, not_modified, time.perf_counter() - started
+
+def summarize(samples, errors, not_modified, elapsed):
+    """各路由及整体的 RPS、p50/p99/平均延迟"""
+    def stats(latencies, error_count, not_modified_count):
+        values = np.array(latencies) * 1000
+        if not len(values):
+            return {'requests': 0}
+        return {
+            'requests': len(values),
+            'errors': error_count,
+            'not_modified': not_modified_count,
+            'rps': round(len(values) / elapsed, 1),
+            'p50_ms': round(float(np.percentile(values, 50)), 2),
+            'p99_ms': round(float(np.percentile(values, 99)), 2),
+            'mean_ms': round(float(values.mean()), 2)
+        }
+    
+    routes = {path: stats(samples[path], errors[path], not_modified[path]) for path in samples}
+    overall = stats([v for values in samples.values() for v in values], sum(errors.values()),
+                    sum(not_modified.values()))
+    return routes, overall
+
+def main():
+    parser = argparse.ArgumentParser(description='JTAS dashboard polling load test')
+    parser.add_argument('--mode', choices=['inprocess', 'server'], default='inprocess')
+    parser.add_argument('--url', help='压测已运行的服务(不启动新进程)')
+    parser.add_argument('--pid', type=int, help='--url 模式下服务进程的PID, 用于测量内存')
+    parser.add_argument('--gunicorn-workers', type=int, default=0, help='server模式使用gunicorn及worker数')
+    parser.add_argument('--gunicorn-threads', type=int, default=4)
+    parser.add_argument('--routes', default=DEFAULT_ROUTES, help='路由及权重, 如 "/api/metrics=4,/=1"')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10, help='压测时长(秒)')
+    parser.add_argument('--requests', type=int, default=0, help='请求总数上限(0表示只按时长)')
+    parser.add_argument('--etag', action='store_true', help='客户端携带 If-None-Match 轮询')
+    parser.add_argument('--accept-encoding', default='gzip, deflate, br', help='请求头 Accept-Encoding, 空字符串表示不压缩')
+    parser.add_argument('--tickets', type=int, default=100000)
+    parser.add_argument('--assignees', type=int, default=50)
+    parser.add_argument('--projects', type=int, default=4)
+    parser.add_argument('--skip-upload', action='store_true', help='使用服务当前的数据集')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--min-rps', type=float, help='整体RPS下限')
+    parser.add_argument('--max-p99-ms', type=float, help='任一路由p99延迟上限(毫秒)')
+    args = parser.parse_args()
+    
+    routes = parse_routes(args.routes)
+    process = None
+    if args.url:
+        client, pid = HttpClient(args.url), args.pid
+    elif args.mode == 'server':
+        process, base_url = start_server(args)
+        client, pid = HttpClient(base_url), process.pid
+    else:
+        client, pid = InProcessClient(), os.getpid()
+    probe = MemoryProbe(pid) if pid else None
+    if probe and not probe.available():
+        probe = None
+    
+    try:
+        report = {
+            'mode': 'url' if args.url else args.mode,
+            'concurrency': args.concurrency,
+            'etag': args.etag,
+            'accept_encoding': args.accept_encoding,
+            'routes': {}
+        }
+        if not args.skip_upload:
+            data = synthetic_tickets(args.tickets, args.assignees, args.projects, args.seed)
+            content = data.to_csv(index=False).encode('utf-8')
+            start = time.perf_counter()
+            status, body = client.upload('load_test.csv', content)
+            if status != 200:
+                raise RuntimeError(f'导入合成数据失败: {status} {body}')
+            report['dataset'] = {'tickets': args.tickets, 'assignees': args.assignees, 'projects': args.projects,
+                                 'csv_mb': round(len(content) / (1 << 20), 1),
+                                 'upload_seconds': round(time.perf_counter() - start, 2)}
+        
+        cold = measure_memory(client, probe, routes)
+        samples, errors, not_modified, elapsed = run_load(client, routes, args.concurrency, args.duration,
+                                                          args.requests, args.etag, args.accept_encoding, args.seed)
+        per_route, overall = summarize(samples, errors, not_modified, elapsed)
+        for path in routes:
+            report['routes'][path] = {**per_route[path], **cold[path]}
+        report['overall'] = {**overall, 'seconds': round(elapsed, 2)}
+        if probe:
+            report['overall']['rss_mb'] = probe.rss_mb()
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    
+    failures = []
+    if args.min_rps is not None and report['overall'].get('rps', 0) < args.min_rps:
+        failures.append(f"整体RPS {report['overall'].get('rps', 0)} 低于下限 {args.min_rps}")
+    if args.max_p99_ms is not None:
+        failures += [f"{path} p99 {r['p99_ms']}ms 超过上限 {args.max_p99_ms}ms"
+                     for path, r in report['routes'].items() if r.get('p99_ms', 0) > args.max_p99_ms]
+    failures += [f"{path} 有 {r['errors']} 个错误响应" for path, r in report['routes'].items() if r.get('errors')]
+    if failures:
+        print('\n'.join(failures))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
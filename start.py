@@ -1,17 +1,46 @@
 #!/usr/bin/env python3
 """
 JIRA效率分析系统启动脚本
+
+用法:
+    python start.py              依赖未变化时跳过安装, 直接启动
+    python start.py --fast       快速启动: 跳过依赖检查, 关闭调试重载
+    python start.py --reinstall  强制重新安装依赖
 """
 
+import argparse
+import hashlib
 import subprocess
 import sys
 import os
 
+# 记录上次成功安装时的依赖指纹
+FINGERPRINT_FILE = '.deps_fingerprint'
+
+def dependency_fingerprint():
+    """依赖指纹: requirements.txt 内容 + 当前解释器路径及版本"""
+    digest = hashlib.sha256()
+    with open('requirements.txt', 'rb') as f:
+        digest.update(f.read())
+    digest.update(sys.executable.encode('utf-8'))
+    digest.update(sys.version.encode('utf-8'))
+    return digest.hexdigest()
+
+def dependencies_up_to_date():
+    """依赖指纹与上次安装一致时无需重新安装"""
+    try:
+        with open(FINGERPRINT_FILE, encoding='utf-8') as f:
+            return f.read().strip() == dependency_fingerprint()
+    except OSError:
+        return False
+
 def install_requirements():
     """安装依赖包"""
     print("Installing Python dependencies...")
     try:
         subprocess.check_call([sys.executable, '-m', 'pip', 'install', '-r', 'requirements.txt'])
+        with open(FINGERPRINT_FILE, 'w', encoding='utf-8') as f:
+            f.write(dependency_fingerprint())
         print("Dependencies installed successfully!")
         return True
     except subprocess.CalledProcessError as e:
@@ -26,7 +55,7 @@ def check_python_version():
     print(f"Python version: {sys.version}")
     return True
 
-def start_application():
+def start_application(debug=True):
     """启动应用"""
     print("Starting JIRA Efficiency Analysis System...")
     print("Web Interface: http://localhost:5000")
@@ -35,14 +64,23 @@ def start_application():
     
     try:
         from app import app
-        app.run(debug=True, host='0.0.0.0', port=5000)
+        app.run(debug=debug, host='0.0.0.0', port=5000)
     except ImportError as e:
         print(f"Import failed: {e}")
         print("Please ensure all dependencies are installed")
     except KeyboardInterrupt:
         print("\nSystem stopped")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='JIRA Efficiency Analysis System')
+    parser.add_argument('--fast', action='store_true',
+                        help='跳过依赖检查并关闭调试重载, 用于容器重启等场景')
+    parser.add_argument('--reinstall', action='store_true', help='强制重新安装依赖')
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    
     print("=" * 50)
     print("JIRA Efficiency Analysis System - Python Version")
     print("=" * 50)
@@ -56,13 +94,17 @@ def main():
         print("requirements.txt not found")
         return
     
-    # 安装依赖
-    if not install_requirements():
+    # 安装依赖(依赖指纹未变化时跳过)
+    if args.fast:
+        print("Fast start: skipping dependency check")
+    elif not args.reinstall and dependencies_up_to_date():
+        print("Dependencies unchanged, skipping installation")
+    elif not install_requirements():
         print("Please run manually: pip install -r requirements.txt")
         return
     
     # 启动应用
-    start_application()
+    start_application(debug=not args.fast)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""测试公共设置: 临时目录中的缓存/转存目录, 以及构造、发布工单数据的辅助函数"""
+
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# 导入app之前设置, 避免使用或污染系统临时目录中的共享路径, 也不自动开启JIRA刷新
+TEST_DIR = tempfile.mkdtemp(prefix='jtas-tests-')
+os.environ['JTAS_UPLOAD_CACHE_DIR'] = os.path.join(TEST_DIR, 'upload-cache')
+os.environ['JTAS_SPILL_DIR'] = os.path.join(TEST_DIR, 'spill')
+os.environ['JTAS_REPORTS_DIR'] = os.path.join(TEST_DIR, 'reports')
+os.environ['JTAS_TIMEZONE'] = 'Asia/Shanghai'
+for name in ('JTAS_SHARED_DATASET_DIR', 'JTAS_REFRESH_PROJECTS', 'JIRA_SERVER', 'JTAS_MEMORY_BUDGET_MB'):
+    os.environ.pop(name, None)
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app as jtas
+
+
+def make_tickets(n=40, projects=('P1', 'P2'), seed=0):
+    """构造原始工单数据(时间为字符串, 与上传的CSV一致)"""
+    rng = np.random.default_rng(seed)
+    created = pd.Timestamp('2024-03-01') + pd.to_timedelta(rng.integers(0, 20 * 86400, n), unit='s')
+    return pd.DataFrame({
+        'ticket_id': [f'T-{i:04d}' for i in range(n)],
+        'project_key': [projects[i % len(projects)] for i in range(n)],
+        'summary': [f'工单 {i}' for i in range(n)],
+        'assignee_employee_id': [f'EMP{i % 4 + 1:03d}' for i in range(n)],
+        'priority': [['LOW', 'MEDIUM', 'HIGH'][i % 3] for i in range(n)],
+        'status': [['RESOLVED', 'CLOSED', 'OPEN'][i % 3] for i in range(n)],
+        'assignment_method': [['AI', 'MANUAL'][i % 2] for i in range(n)],
+        'created_time': created.strftime('%Y-%m-%d %H:%M:%S'),
+        'assigned_time': (created + pd.Timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S'),
+        'resolved_time': (created + pd.to_timedelta(rng.integers(2, 48, n), unit='h')).strftime('%Y-%m-%d %H:%M:%S'),
+        'actual_processing_minutes': rng.integers(10, 300, n),
+    })
+
+
+def publish(frame, source='test', worklogs=None):
+    """清洗后发布为当前数据版本, 返回快照"""
+    data, report = jtas.prepare_tickets(frame.copy())
+    assert not report['missing_columns']
+    return jtas.dataset_store.replace(jtas.partition_by_project(data), source, worklogs=worklogs)
+
+
+@pytest.fixture
+def client():
+    return jtas.app.test_client()
+
+
+@pytest.fixture
+def tickets():
+    return make_tickets()
@@ -0,0 +1,93 @@
+"""处理人维度表: 导入时解析一次, 人员名单合并"""
+
+import io
+
+import pandas as pd
+
+import app as jtas
+from tests.conftest import make_tickets, publish
+
+
+def roster():
+    return pd.DataFrame({
+        'employee_id': ['EMP001', 'EMP002', None],
+        'account_id': [None, None, 'acc-9'],
+        'name': ['张三', '李四', '王五'],
+        'department': ['支持', '研发', '研发'],
+        'skill_level': ['L1', 'L2', None],
+    })
+
+
+def test_resolve_matches_employee_account_and_name():
+    dimension = jtas.merge_assignee_roster(jtas.empty_assignee_dimension(), roster())
+    tickets = pd.DataFrame({
+        'assignee_employee_id': ['EMP001', 'EMP001', '王五', None, 'EMP404'],
+        'assignee_account_id': [None, None, 'acc-9', None, None],
+        'assignee_name': [None, None, None, None, None],
+    })
+    resolved, dimension = jtas.resolve_assignees(tickets, dimension)
+    keys = resolved['assignee_key'].tolist()
+    assert keys[0] == keys[1] == 0
+    assert keys[2] == 2
+    assert keys[3] == jtas.UNASSIGNED_KEY
+    assert keys[4] == 3 and len(dimension) == 4
+    assert resolved['assignee_name'].tolist() == ['张三', '张三', '王五', jtas.UNASSIGNED_NAME, 'EMP404']
+
+
+def test_roster_merge_keeps_keys_and_updates_attributes():
+    dimension = jtas.merge_assignee_roster(jtas.empty_assignee_dimension(), roster())
+    update = pd.DataFrame({'employee_id': ['EMP002', 'EMP003'], 'department': ['运维', None]})
+    merged = jtas.merge_assignee_roster(dimension, update)
+    assert merged['assignee_key'].tolist() == [0, 1, 2, 3]
+    assert merged.set_index('employee_id').loc['EMP002', 'department'] == '运维'
+    assert merged.set_index('employee_id').loc['EMP002', 'name'] == '李四'
+
+
+def test_normalize_roster_keeps_last_duplicate():
+    normalized = jtas.normalize_assignee_roster(pd.DataFrame({
+        'employee_id': ['E1', 'E1', None], 'name': ['旧', '新', None], 'extra': [1, 2, 3]}))
+    assert normalized.columns.tolist() == jtas.ASSIGNEE_ROSTER_COLUMNS
+    assert normalized['name'].tolist() == ['新']
+
+
+def test_roster_update_renames_all_partitions_and_survives_replace(tickets):
+    publish(tickets)
+    jtas.dataset_store.update_assignees(roster())
+    data = jtas.dataset_store.get_data()
+    names = dict(zip(data['assignee_employee_id'], data['assignee_name']))
+    assert names['EMP001'] == '张三' and names['EMP002'] == '李四' and names['EMP003'] == 'EMP003'
+    
+    snapshot = publish(make_tickets(seed=4))
+    assert set(snapshot.get_data()['assignee_name']) >= {'张三', '李四'}
+    assert len(snapshot.assignees()) == 5
+
+
+def test_assignee_stats(client, tickets):
+    publish(tickets)
+    csv = roster().to_csv(index=False).encode('utf-8')
+    response = client.post('/api/assignees/upload', data={'file': (io.BytesIO(csv), 'roster.csv')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200, response.get_json()
+    
+    body = client.get('/api/assignees').get_json()
+    counts = {row['employee_id']: row['ticket_count'] for row in body['assignees']}
+    assert counts['EMP001'] == (tickets['assignee_employee_id'] == 'EMP001').sum()
+    departments = {row['department']: row['ticket_count'] for row in body['by_department']}
+    assert departments['支持'] == counts['EMP001']
+    assert departments['研发'] == counts['EMP002']
+    assert departments['未知'] == counts['EMP003'] + counts['EMP004']
+
+
+def test_all_unassigned_upload_into_empty_store(client, monkeypatch):
+    monkeypatch.setattr(jtas, 'dataset_store', jtas.DatasetStore())
+    frame = make_tickets(5)
+    frame['assignee_employee_id'] = jtas.UNASSIGNED_NAME
+    body = frame.to_csv(index=False).encode('utf-8')
+    response = client.post('/api/upload', data={'file': (io.BytesIO(body), 'unassigned.csv')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200, response.get_json()
+    
+    data = jtas.dataset_store.get_data()
+    assert (data['assignee_key'] == jtas.UNASSIGNED_KEY).all()
+    assert (data['assignee_name'] == jtas.UNASSIGNED_NAME).all()
+    assert jtas.dataset_store.current().assignees().empty
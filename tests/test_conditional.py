@@ -0,0 +1,71 @@
+"""读接口的ETag/Last-Modified条件请求、响应缓存及压缩"""
+
+import gzip
+from datetime import datetime, timedelta
+
+from werkzeug.http import http_date
+
+import app as jtas
+from tests.conftest import make_tickets, publish
+
+
+def test_etag_not_modified_until_new_version(client, tickets):
+    publish(tickets)
+    first = client.get('/api/metrics')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    
+    assert client.get('/api/metrics', headers={'If-None-Match': etag}).status_code == 304
+    
+    publish(make_tickets(seed=1))
+    changed = client.get('/api/metrics', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+
+def test_if_modified_since_for_settled_version(client, tickets):
+    snapshot = publish(tickets)
+    snapshot.created_at = datetime.now() - timedelta(minutes=5)
+    response = client.get('/api/metrics')
+    last_modified = response.headers['Last-Modified']
+    
+    assert client.get('/api/metrics', headers={'If-Modified-Since': last_modified}).status_code == 304
+
+
+def test_no_stale_304_for_versions_in_same_second(client, tickets):
+    # 两个版本在同一秒内发布: 持有第一个版本时间的客户端必须拿到新版本
+    publish(tickets)
+    first = client.get('/api/metrics')
+    assert 'Last-Modified' not in first.headers
+    
+    older = datetime.now().replace(microsecond=0)
+    publish(make_tickets(seed=1))
+    second = client.get('/api/metrics', headers={'If-Modified-Since': http_date(older)})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+
+
+def test_gzip_for_large_responses(client, tickets):
+    publish(tickets)
+    plain = client.get('/api/tickets?limit=1000')
+    compressed = client.get('/api/tickets?limit=1000', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert gzip.decompress(compressed.get_data()) == plain.get_data()
+    
+    small = client.get('/api/tickets?fields=ticket_id&limit=1', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+
+
+def test_response_reused_within_version(client, tickets, monkeypatch):
+    publish(tickets)
+    calls = []
+    original = jtas.build_ticket_filter_mask
+    monkeypatch.setattr(jtas, 'build_ticket_filter_mask', lambda *args: calls.append(1) or original(*args))
+    first = client.get('/api/tickets?limit=5').get_data()
+    assert client.get('/api/tickets?limit=5').get_data() == first
+    assert len(calls) == 1
+    
+    publish(make_tickets(seed=1))
+    client.get('/api/tickets?limit=5')
+    assert len(calls) == 2
@@ -0,0 +1,85 @@
+"""分单策略回放模拟器"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app as jtas
+from tests.conftest import publish
+
+
+def simulator(arrivals, service, historical, width):
+    return jtas.DispatchSimulator(list(map(float, arrivals)), list(map(float, service)), list(historical),
+                                  [f'EMP{i}' for i in range(width)])
+
+
+def reference(arrivals, service, choose):
+    """逐张工单的直接实现: 处理人按分单顺序依次处理, choose(已分单工单, 当前时间) 返回处理人"""
+    assigned, started, finished, free_at = [], [], [], {}
+    for ticket, now in enumerate(arrivals):
+        assignee = choose(assigned, finished, now)
+        start = max(now, free_at.get(assignee, now))
+        assigned.append(assignee)
+        started.append(start)
+        finished.append(start + service[ticket])
+        free_at[assignee] = finished[-1]
+    return np.array(assigned), np.array(started), np.array(finished)
+
+
+def test_single_assignee_queue():
+    assigned, started, finished = simulator([0, 1, 2], [10, 10, 10], [0, 0, 0], 1).run(jtas.HistoricalPolicy)
+    assert started.tolist() == [0, 10, 20]
+    assert finished.tolist() == [10, 20, 30]
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_policies_match_reference(seed):
+    rng = np.random.default_rng(seed)
+    arrivals = np.sort(rng.integers(0, 500, 60)).astype(float)
+    service = rng.integers(0, 60, 60).astype(float)
+    historical = rng.integers(0, 4, 60)
+    sim = simulator(arrivals, service, historical, 4)
+    
+    def fewest(assigned, finished, now):
+        open_count = [sum(1 for a, f in zip(assigned, finished) if a == i and f > now) for i in range(4)]
+        return min(range(4), key=lambda i: (open_count[i], assigned.count(i), i))
+    
+    def least_loaded(assigned, finished, now):
+        free = [max([f for a, f in zip(assigned, finished) if a == i], default=0.0) for i in range(4)]
+        return min(range(4), key=lambda i: (free[i], i))
+    
+    expected = {
+        jtas.HistoricalPolicy: reference(arrivals, service, lambda assigned, *_: historical[len(assigned)]),
+        jtas.RoundRobinPolicy: reference(arrivals, service, lambda assigned, *_: len(assigned) % 4),
+        jtas.FewestTicketsPolicy: reference(arrivals, service, fewest),
+        jtas.LeastLoadedPolicy: reference(arrivals, service, least_loaded),
+    }
+    for policy, result in expected.items():
+        for actual, wanted in zip(sim.run(policy), result):
+            np.testing.assert_allclose(actual, wanted, err_msg=policy.__name__)
+
+
+def test_from_tickets_and_summary():
+    data = pd.DataFrame({
+        'created_time': pd.to_datetime(['2024-03-01 09:10', '2024-03-01 09:00', None, '2024-03-01 09:20']),
+        'assignee_employee_id': ['B', 'A', 'A', 'Unassigned'],
+        'actual_processing_minutes': [30, None, 5, 10],
+    })
+    sim = jtas.DispatchSimulator.from_tickets(data)
+    assert sim.skipped == 2
+    assert sim.arrivals == [0.0, 10.0]
+    assert sim.service == [30.0, 30.0]
+    assert [sim.assignees[code] for code in sim.historical] == ['A', 'B']
+    
+    summary = sim.summarize(sim.run(jtas.HistoricalPolicy))
+    assert summary['avg_wait_minutes'] == 0
+    assert summary['makespan_minutes'] == 40
+    assert summary['load_balance']['ticket_gini'] == 0
+
+
+def test_api_dispatch_simulation(client, tickets):
+    publish(tickets)
+    body = client.get('/api/simulation/dispatch?policies=historical,round_robin').get_json()
+    assert set(body['policies']) == {'historical', 'round_robin'}
+    assert body['tickets'] == len(tickets)
+    assert client.get('/api/simulation/dispatch?policies=random').status_code == 400
@@ -0,0 +1,117 @@
+"""分单公平性与负载均衡分析"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app as jtas
+from tests.conftest import make_tickets, publish
+
+
+def naive_gini(values):
+    values = np.asarray(values, dtype=float)
+    return np.abs(values[:, None] - values[None, :]).sum() / (2 * len(values) ** 2 * values.mean())
+
+
+def test_row_gini_matches_pairwise_definition():
+    rng = np.random.default_rng(1)
+    matrix = rng.integers(0, 10, (6, 5)).astype(float)
+    active = rng.random((6, 5)) > 0.3
+    active[0] = [True, False, False, False, False]
+    matrix[1] = 0
+    gini = jtas.row_gini(matrix, active)
+    assert np.isnan(gini[0]) and np.isnan(gini[1])
+    for row in range(2, 6):
+        if active[row].sum() >= 2 and matrix[row][active[row]].sum() > 0:
+            assert gini[row] == pytest.approx(naive_gini(matrix[row][active[row]]))
+
+
+def test_max_min_ratio():
+    matrix = np.array([[4.0, 2.0, 9.0], [3.0, 0.0, 1.0]])
+    active = np.array([[True, True, False], [True, True, True]])
+    ratio = jtas.row_max_min_ratio(matrix, active)
+    assert ratio[0] == 2 and np.isnan(ratio[1])
+
+
+def test_matrices_match_per_ticket_overlap():
+    rng = np.random.default_rng(2)
+    period, origin, buckets, width = 86400, 0, 6, 3
+    start = rng.integers(0, 3 * period, 25)
+    end = start + rng.integers(0, 3 * period, 25)
+    codes = rng.integers(0, width, 25)
+    first, last = start // period, end // period
+    counts, busy = jtas.fairness_matrices(first, last, start, end, codes, origin, period, buckets, width)
+    
+    expected_counts = np.zeros((buckets, width))
+    expected_busy = np.zeros((buckets, width))
+    for s, e, c in zip(start, end, codes):
+        expected_counts[s // period, c] += 1
+        for b in range(buckets):
+            expected_busy[b, c] += max(0, min(e, (b + 1) * period) - max(s, b * period))
+    np.testing.assert_array_equal(counts, expected_counts)
+    np.testing.assert_allclose(busy, expected_busy)
+
+
+def test_rolling_sum():
+    matrix = np.arange(10).reshape(5, 2)
+    np.testing.assert_array_equal(jtas.rolling_sum(matrix, 2)[1:], matrix[1:] + matrix[:-1])
+
+
+def test_compute_fairness_by_method():
+    data = pd.DataFrame({
+        'assignee_employee_id': ['A', 'A', 'A', 'B', 'C'],
+        'assignment_method': ['AI', 'AI', 'MANUAL', 'AI', 'MANUAL'],
+        'created_time': pd.to_datetime(['2024-03-04 09:00'] * 5),
+        'assigned_time': pd.to_datetime(['2024-03-04 09:00'] * 5),
+        'resolved_time': pd.to_datetime(['2024-03-04 21:00'] * 5),
+    })
+    result = jtas.compute_assignment_fairness(data)
+    assert result['assignees'] == 3
+    assert set(result['methods']) == {'ALL', 'AI', 'MANUAL'}
+    overall = result['methods']['ALL']
+    assert overall['summary']['tickets'] == 5
+    assert overall['summary']['overall_ticket_gini'] == pytest.approx(round(naive_gini([3, 1, 1]), 4))
+    load = {row['assignee']: row['avg_concurrent_load'] for row in overall['assignees']}
+    assert load == {'A': 1.5, 'B': 0.5, 'C': 0.5}
+
+
+def test_api_fairness(client, tickets):
+    publish(tickets)
+    body = client.get('/api/fairness?window=week&rolling=2&periods=1').get_json()
+    assert body['window'] == 'week' and len(body['methods']['ALL']['series']) == 1
+    assert client.get('/api/fairness?window=month').status_code == 400
+    assert client.get(f'/api/fairness?rolling={jtas.FAIRNESS_MAX_ROLLING + 1}').status_code == 400
+
+
+def test_unassigned_tickets_are_excluded():
+    data = pd.DataFrame({
+        'assignee_employee_id': ['A', 'B', jtas.UNASSIGNED_NAME, jtas.UNASSIGNED_NAME, None],
+        'assignment_method': ['AI'] * 5,
+        'created_time': pd.to_datetime(['2024-03-04 09:00'] * 5),
+        'resolved_time': pd.to_datetime(['2024-03-04 10:00'] * 5),
+    })
+    result = jtas.compute_assignment_fairness(data)
+    assert result['assignees'] == 2
+    summary = result['methods']['ALL']['summary']
+    assert summary['tickets'] == 2 and summary['overall_ticket_gini'] == 0
+    
+    # 已解析处理人的数据按 assignee_key 判断
+    resolved, _ = jtas.resolve_assignees(data, jtas.empty_assignee_dimension())
+    assert jtas.compute_assignment_fairness(resolved) == result
+
+
+def test_unassigned_excluded_from_published_data(client):
+    frame = make_tickets(12)
+    frame.loc[frame.index % 3 == 0, 'assignee_employee_id'] = jtas.UNASSIGNED_NAME
+    publish(frame)
+    body = client.get('/api/fairness').get_json()
+    assert body['assignees'] == frame.loc[frame.index % 3 != 0, 'assignee_employee_id'].nunique()
+    assert jtas.UNASSIGNED_NAME not in {row['assignee'] for row in body['methods']['ALL']['assignees']}
+
+
+@pytest.mark.parametrize('periods', ['0', '-3', 'abc'])
+def test_api_rejects_bad_periods(client, tickets, periods):
+    publish(tickets)
+    response = client.get(f'/api/fairness?periods={periods}')
+    assert response.status_code == 400
+    assert 'periods' in response.get_json()['error']
@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+import app as jtas
+
+
+class FakeConnector:
+    """只返回预置工单的JIRA连接"""
+    def __init__(self, issues):
+        self.issues = issues
+        self.calls = []
+    
+    def get_projects_issues(self, project_keys, max_results, max_workers):
+        self.calls.append((tuple(project_keys), max_results, max_workers))
+        return {key: self.issues.get(key, []) for key in project_keys}
+
+
+def issue(key, i, assignee='EMP001'):
+    return {
+        'ticket_id': f'{key}-{i}', 'jira_key': f'{key}-{i}', 'summary': f'问题 {i}', 'project_key': key,
+        'assignee_employee_id': assignee, 'assignee_name': assignee, 'assignment_method': 'MANUAL',
+        'priority': 'HIGH', 'status': 'Done', 'issue_type': 'Bug', 'reporter': '',
+        'created_time': '2024-03-01T08:00:00.000+0800', 'assigned_time': '2024-03-01T08:00:00.000+0800',
+        'resolved_time': '2024-03-01T18:00:00.000+0800', 'log_time': 60, 'actual_processing_minutes': 60,
+        'worklogs': [{'ticket_id': f'{key}-{i}', 'author_account_id': assignee, 'author_name': assignee,
+                      'started': '2024-03-01T09:00:00.000+0800', 'seconds': 3600}]
+    }
+
+
+@pytest.fixture
+def connector(monkeypatch):
+    fake = FakeConnector({'P1': [issue('P1', i) for i in range(3)], 'P2': [issue('P2', i) for i in range(2)]})
+    monkeypatch.setattr(jtas, 'jira_connection', fake)
+    return fake
+
+
+def test_import_projects_merges_partitions(client, connector):
+    response = client.post('/api/jira/import', json={'project_keys': ['P1', 'P2', 'P3'], 'replace': True})
+    body = response.get_json()
+    assert response.status_code == 200, body
+    assert body['failed_projects'] == ['P3']
+    assert body['loaded_projects'] == {'P1': 3, 'P2': 2}
+    assert connector.calls == [(('P1', 'P2', 'P3'), 1000, 4)]
+    
+    created = jtas.dataset_store.get_data(['P1'])['created_time']
+    assert created.iloc[0] == pd.Timestamp('2024-03-01 08:00')
+
+
+@pytest.mark.parametrize('field, value', [('max_results', 'abc'), ('max_results', 0), ('max_workers', -1),
+                                          ('max_workers', None), ('max_results', True)])
+def test_import_projects_rejects_bad_numbers(client, connector, field, value):
+    response = client.post('/api/jira/import', json={'project_keys': ['P1'], field: value})
+    assert response.status_code == 400
+    assert field in response.get_json()['error']
+    assert not connector.calls
+
+
+@pytest.mark.parametrize('value', ['false', 'true', 0, 1, None])
+def test_import_projects_rejects_non_boolean_replace(client, connector, value):
+    response = client.post('/api/jira/import', json={'project_keys': ['P1'], 'replace': value})
+    assert response.status_code == 400
+    assert 'replace' in response.get_json()['error']
+    assert not connector.calls
+
+
+def test_import_projects_replace_false_keeps_other_projects(client, connector):
+    client.post('/api/jira/import', json={'project_keys': ['P1'], 'replace': True})
+    response = client.post('/api/jira/import', json={'project_keys': ['P2'], 'replace': False})
+    assert response.status_code == 200
+    assert set(jtas.dataset_store.get_data(None)['project_key']) == {'P1', 'P2'}
+    
+    client.post('/api/jira/import', json={'project_keys': ['P2'], 'replace': True})
+    assert set(jtas.dataset_store.get_data(None)['project_key']) == {'P2'}
+
+
+def test_positive_number():
+    assert jtas.positive_number({}, 'n', 5) == 5
+    assert jtas.positive_number({'n': '2.5'}, 'n', 1, float) == 2.5
+    for value in ('x', float('inf'), float('nan'), -3):
+        with pytest.raises(ValueError):
+            jtas.positive_number({'n': value}, 'n', 1, float)
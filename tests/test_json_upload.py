@@ -0,0 +1,71 @@
+import io
+import json
+
+import pytest
+
+import app as jtas
+from tests.conftest import make_tickets
+
+
+def ticket_records(n=5):
+    return json.loads(make_tickets(n).to_json(orient='records'))
+
+
+def test_top_level_array_in_batches():
+    records = ticket_records(7)
+    frame = jtas.read_json_tickets(io.StringIO(json.dumps(records)), batch_size=3)
+    assert len(frame) == 7
+    assert frame['ticket_id'].tolist() == [r['ticket_id'] for r in records]
+
+
+def test_tickets_array_with_other_keys():
+    document = {'exported_at': '2024-03-01', 'tickets': ticket_records(4)}
+    assert len(jtas.read_json_tickets(io.StringIO(json.dumps(document)))) == 4
+
+
+def test_column_oriented_tickets_object():
+    columns = make_tickets(3).to_dict(orient='list')
+    columns['actual_processing_minutes'] = [int(v) for v in columns['actual_processing_minutes']]
+    frame = jtas.read_json_tickets(io.StringIO(json.dumps({'tickets': columns})))
+    assert frame['ticket_id'].tolist() == columns['ticket_id']
+
+
+def test_reader_values_across_chunk_boundaries():
+    records = ticket_records(20)
+    reader = jtas.JsonStreamReader(io.StringIO(json.dumps(records)), chunk_chars=7)
+    assert list(reader.iter_array()) == records
+
+
+def test_malformed_json_reports_position():
+    with pytest.raises(ValueError, match='字符位置 17 '):
+        jtas.read_json_tickets(io.StringIO('[{"a": 1}, {"a": }]'))
+    with pytest.raises(ValueError, match='字符位置'):
+        jtas.read_json_tickets(io.StringIO('[{"a": 1} {"a": 2}]'))
+
+
+def test_ndjson_lines():
+    text = '\n'.join(json.dumps(r) for r in ticket_records(3)) + '\n\n'
+    assert len(jtas.read_ndjson_tickets(io.StringIO(text))) == 3
+    with pytest.raises(ValueError, match='第 2 行'):
+        jtas.read_ndjson_tickets(io.StringIO('{"a": 1}\n{oops}\n'))
+
+
+def upload(client, name, body):
+    return client.post('/api/upload', data={'file': (io.BytesIO(body.encode('utf-8')), name)},
+                       content_type='multipart/form-data')
+
+
+def test_upload_column_oriented_json(client):
+    columns = json.loads(make_tickets(6).to_json(orient='columns'))
+    columns = {key: list(values.values()) for key, values in columns.items()}
+    response = upload(client, 'columns.json', json.dumps({'tickets': columns}))
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['rows'] == 6
+
+
+def test_upload_malformed_json_is_bad_request(client):
+    response = upload(client, 'broken.json', '{"tickets": [{"ticket_id": "A",')
+    assert response.status_code == 400
+    assert 'JSON' in response.get_json()['error']
+    response = upload(client, 'broken.ndjson', '{"ticket_id": "A"}\nnot json\n')
+    assert response.status_code == 400
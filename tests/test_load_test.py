@@ -0,0 +1,53 @@
+"""仪表板轮询负载测试脚本"""
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+from tests.conftest import ROOT_DIR
+
+SCRIPT = os.path.join(ROOT_DIR, 'scripts', 'load_test.py')
+
+
+def load_script():
+    spec = importlib.util.spec_from_file_location('load_test', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_parse_routes_and_summarize():
+    load_test = load_script()
+    assert load_test.parse_routes('/api/metrics=4, /=1,/api/fairness') == \
+        {'/api/metrics': 4.0, '/': 1.0, '/api/fairness': 1.0}
+    assert load_test.parse_routes('/api/tickets?limit=5=2,/api/tickets?limit=5&sort=-ticket_id') == \
+        {'/api/tickets?limit=5': 2.0, '/api/tickets?limit=5&sort=-ticket_id': 1.0}
+    
+    routes, overall = load_test.summarize({'/a': [0.01, 0.03], '/b': []}, {'/a': 1, '/b': 0},
+                                          {'/a': 0, '/b': 0}, elapsed=2.0)
+    assert routes['/b'] == {'requests': 0}
+    assert routes['/a']['rps'] == 1.0 and routes['/a']['errors'] == 1
+    assert overall['p50_ms'] == 20.0
+
+
+def test_synthetic_tickets_pass_validation():
+    import app as jtas
+    data = load_script().synthetic_tickets(200, 5, 3, seed=1)
+    prepared, report = jtas.prepare_tickets(data)
+    assert not report['missing_columns'] and report['valid_rows'] == 200
+    assert prepared['jira_key'].str.split('-').str[0].isin(['P0', 'P1', 'P2']).all()
+
+
+def test_in_process_run_reports_every_route():
+    result = subprocess.run(
+        [sys.executable, SCRIPT, '--tickets', '300', '--requests', '30', '--concurrency', '2', '--etag',
+         '--routes', '/api/metrics=2,/api/tickets?limit=5=1'],
+        cwd=ROOT_DIR, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stdout[-2000:] + result.stderr[-2000:]
+    report = json.loads(result.stdout[result.stdout.rindex('{\n  "mode"'):])
+    assert set(report['routes']) == {'/api/metrics', '/api/tickets?limit=5'}
+    assert report['dataset']['tickets'] == 300
+    assert report['overall']['requests'] == 30 and report['overall']['errors'] == 0
+    assert report['overall']['not_modified'] > 0
@@ -0,0 +1,77 @@
+"""内存预算: 派生缓存淘汰、分区转存及内存统计"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app as jtas
+from tests.conftest import make_tickets, publish
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    """在测试内修改全局内存预算, 结束后恢复"""
+    for name in ('budget_bytes', 'spill_dir', 'evicted_caches', 'spilled_partitions'):
+        monkeypatch.setattr(jtas.memory_budget, name, getattr(jtas.memory_budget, name))
+    return jtas.memory_budget
+
+
+def test_least_recently_used_cache_evicted_first(budget, tickets):
+    snapshot = publish(tickets)
+    budget.spill_dir = None
+    snapshot.cached('old', lambda: np.zeros(100_000))
+    snapshot.cached('new', lambda: np.zeros(100_000))
+    snapshot.cached('old', lambda: pytest.fail('缓存命中时不应重新计算'))
+    
+    usage = budget.usage(snapshot)
+    budget.budget_bytes = usage['partitions'] + usage['caches'] - 1
+    budget.enforce()
+    assert [key for key, _, _ in snapshot.cache_usage()] == ['old']
+    assert budget.evicted_caches == 1
+
+
+def test_partitions_spilled_to_mapped_files(budget, tickets, tmp_path):
+    pytest.importorskip('pyarrow')
+    snapshot = publish(tickets)
+    expected = {key: frame.copy() for key, frame in snapshot.partitions.items()}
+    budget.spill_dir = str(tmp_path / 'spill')
+    budget.budget_bytes = 1
+    budget.enforce()
+    
+    assert jtas.dataset_store.current() is snapshot
+    assert set(snapshot.spilled) == set(expected)
+    assert sorted(os.listdir(tmp_path / 'spill')) == sorted(os.path.basename(p) for p in snapshot.spilled.values())
+    assert os.stat(tmp_path / 'spill').st_mode & 0o777 == 0o700
+    for key, frame in expected.items():
+        pd.testing.assert_frame_equal(snapshot.partitions[key].astype(object), frame.astype(object),
+                                      check_dtype=False)
+    assert budget.usage(snapshot)['partitions'] == 0
+    
+    # 发布新版本后, 旧版本的转存文件被清理
+    budget.budget_bytes = 0
+    publish(make_tickets(seed=2))
+    budget.budget_bytes = 1
+    budget.enforce()
+    assert len(os.listdir(tmp_path / 'spill')) == len(jtas.dataset_store.current().spilled)
+
+
+def test_fits(budget):
+    budget.budget_bytes = 100
+    budget.spill_dir = None
+    assert budget.fits(100) and not budget.fits(101)
+    budget.budget_bytes = 0
+    assert budget.fits(10 ** 12)
+
+
+def test_memory_report(client, tickets):
+    publish(tickets)
+    client.get('/api/metrics')
+    report = client.get('/api/admin/memory').get_json()
+    assert report['dataset']['version'] == jtas.dataset_store.current().version
+    assert {p['project'] for p in report['dataset']['partitions']} == {'P1', 'P2'}
+    assert report['usage']['uploads_in_flight'] == 0
+    
+    cleared = client.post('/api/admin/memory/evict', json={'clear_caches': True}).get_json()
+    assert cleared['usage']['caches_mb'] == 0
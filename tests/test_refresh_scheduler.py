@@ -0,0 +1,85 @@
+import threading
+import time
+
+import app as jtas
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_replacing_running_job_does_not_overlap():
+    scheduler = jtas.BackgroundScheduler()
+    release = threading.Event()
+    active, peak, runs = [0], [0], []
+    lock = threading.Lock()
+    
+    def job(tag):
+        def run():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            runs.append(tag)
+            release.wait(5)
+            with lock:
+                active[0] -= 1
+        return run
+    
+    scheduler.add_job('refresh', job('old'), 3600)
+    assert wait_until(lambda: runs == ['old'])
+    scheduler.add_job('refresh', job('new'), 3600)
+    time.sleep(0.3)
+    assert runs == ['old'] and scheduler.status()['refresh']['running']
+    release.set()
+    assert wait_until(lambda: runs == ['old', 'new'])
+    assert peak[0] == 1
+
+
+def test_refresh_lock_elects_single_holder(tmp_path):
+    first = jtas._FileLock(str(tmp_path / '.refresh.lock'))
+    second = jtas._FileLock(str(tmp_path / '.refresh.lock'))
+    assert first.try_acquire()
+    assert not second.try_acquire()
+    first.release()
+    assert second.try_acquire()
+    second.release()
+
+
+def test_refresh_started_once_per_process(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(jtas, 'start_refresh_from_env', lambda: calls.append(1))
+    monkeypatch.setattr(jtas, '_refresh_started_pid', None)
+    monkeypatch.setenv('JTAS_REFRESH_PROJECTS', 'P1')
+    monkeypatch.setenv('JIRA_SERVER', 'https://jira.example.com')
+    client.get('/api/metrics')
+    client.get('/api/metrics')
+    assert wait_until(lambda: calls == [1])
+    time.sleep(0.1)
+    assert calls == [1]
+
+
+def test_env_refresh_waits_for_leadership(monkeypatch):
+    monkeypatch.setenv('JTAS_REFRESH_PROJECTS', 'P1')
+    monkeypatch.setenv('JIRA_SERVER', 'https://jira.example.com')
+    started = []
+    monkeypatch.setattr(jtas, '_claim_refresh_leadership', lambda: False)
+    monkeypatch.setattr(jtas, '_start_env_refresh', lambda *args: started.append(args) or True)
+    try:
+        assert jtas.start_refresh_from_env() is False
+        assert jtas.REFRESH_ELECTION_JOB_NAME in jtas.scheduler.status()
+        assert not started
+    finally:
+        jtas.scheduler.remove_job(jtas.REFRESH_ELECTION_JOB_NAME)
+
+
+def test_schedule_rejects_bad_interval(client, monkeypatch):
+    monkeypatch.setattr(jtas, 'jira_connection', object())
+    for payload in ({'interval_minutes': 'soon'}, {'interval_minutes': 0}, {'max_results': 'all'}):
+        response = client.post('/api/jira/refresh/schedule', json={'project_keys': ['P1'], **payload})
+        assert response.status_code == 400
+    assert jtas.REFRESH_JOB_NAME not in jtas.scheduler.status()
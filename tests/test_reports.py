@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+
+import pytest
+
+import app as jtas
+from tests.conftest import make_tickets, publish
+
+
+def test_report_without_status_omits_efficiency_section(client):
+    publish(make_tickets(30).drop(columns='status'))
+    response = client.get('/api/reports/export?format=html')
+    assert response.status_code == 200
+    report = jtas.collect_report(jtas.dataset_store.current())
+    assert '效率指标' not in [section['title'] for section in report['sections']]
+
+
+def test_report_sections_and_file_name(client):
+    snapshot = publish(make_tickets(30))
+    report = jtas.collect_report(snapshot, ['P1'])
+    titles = [section['title'] for section in report['sections']]
+    assert titles[0] == '效率指标'
+    assert 'P1' in report['subtitle']
+    name = jtas.report_file_name(['P1', 'a/b'], snapshot.version, 'html')
+    assert name.startswith('P1_a_b-') and name.endswith(f'-v{snapshot.version}.html')
+
+
+def test_scheduled_reports_written_once_per_version(client):
+    snapshot = publish(make_tickets(20))
+    written = jtas.build_scheduled_reports(['html'], per_project=True)
+    assert sorted(name.split('-')[0] for name in written) == ['P1', 'P2']
+    assert all(os.path.exists(os.path.join(jtas.REPORTS_DIR, name)) for name in written)
+    assert all(f'-v{snapshot.version}.' in name for name in written)
+
+
+@pytest.mark.parametrize('payload', [{'interval_minutes': 'daily'}, {'interval_minutes': -5},
+                                     {'formats': 'docx'}])
+def test_report_schedule_validation(client, payload):
+    assert client.post('/api/reports/schedule', json=payload).status_code == 400
+    assert jtas.REPORT_JOB_NAME not in jtas.scheduler.status()
+
+
+def test_single_flight_shares_one_build():
+    started, release, calls = threading.Event(), threading.Event(), []
+    
+    def build():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return object()
+    
+    results = []
+    leader = threading.Thread(target=lambda: results.append(jtas.single_flight(('k',), build)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(jtas.single_flight(('k',), build)))
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert len(calls) == 1
+    assert len(results) == 2 and results[0] is results[1]
+    assert not jtas._report_builds
+    
+    def fail():
+        raise RuntimeError('boom')
+    with pytest.raises(RuntimeError):
+        jtas.single_flight(('k',), fail)
+    assert jtas.single_flight(('k',), lambda: 1) == 1
+
+
+def test_concurrent_exports_build_report_once(client, monkeypatch):
+    publish(make_tickets(20))
+    collect, calls = jtas.collect_report, []
+    
+    def slow_collect(snapshot, projects=None):
+        calls.append(1)
+        time.sleep(0.2)
+        return collect(snapshot, projects)
+    monkeypatch.setattr(jtas, 'collect_report', slow_collect)
+    monkeypatch.setattr(jtas, 'report_charts_available', lambda: False)
+    
+    responses = []
+    threads = [threading.Thread(target=lambda: responses.append(
+        jtas.app.test_client().get('/api/reports/export?format=html'))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert [r.status_code for r in responses] == [200] * 3
+    assert len({r.get_data() for r in responses}) == 1
+    assert len(calls) == 1
+
+
+def test_report_executor_shut_down_at_exit(monkeypatch):
+    registered = []
+    monkeypatch.setattr(jtas.atexit, 'register', registered.append)
+    monkeypatch.setattr(jtas, '_report_executor', None)
+    executor = jtas.report_executor()
+    assert registered == [jtas.shutdown_report_executor]
+    assert jtas.report_executor() is executor
+    
+    jtas.shutdown_report_executor()
+    assert jtas._report_executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
@@ -0,0 +1,106 @@
+"""多worker共享的Arrow数据集后端"""
+
+import os
+
+import pandas as pd
+import pytest
+
+import app as jtas
+from tests.conftest import make_tickets
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def stores(tmp_path):
+    """模拟两个worker: 各自的 DatasetStore 指向同一个共享目录"""
+    return (jtas.DatasetStore(jtas.SharedDatasetBackend(str(tmp_path))),
+            jtas.DatasetStore(jtas.SharedDatasetBackend(str(tmp_path))))
+
+
+def partitions(seed=0):
+    data, _ = jtas.prepare_tickets(make_tickets(seed=seed))
+    return jtas.partition_by_project(data)
+
+
+def test_other_worker_sees_published_version(stores):
+    writer, reader = stores
+    snapshot = writer.replace(partitions(), 'upload')
+    current = reader.current()
+    assert current.version == snapshot.version == 1
+    assert current.summary() == snapshot.summary()
+    assert current.created_at == snapshot.created_at
+    pd.testing.assert_frame_equal(current.get_data(['P1']).astype(object),
+                                  snapshot.get_data(['P1']).astype(object), check_dtype=False)
+
+
+def test_merge_from_another_worker_keeps_projects_and_links_unchanged(stores, tmp_path):
+    writer, other = stores
+    writer.replace(partitions(), 'upload')
+    data, _ = jtas.prepare_tickets(make_tickets(6, projects=('P2',), seed=5))
+    snapshot = other.merge(jtas.partition_by_project(data))
+    assert snapshot.version == 2
+    assert snapshot.summary() == {'P1': 20, 'P2': 6}
+    assert writer.current().version == 2
+    
+    # 未变化的P1分区以硬链接复用
+    meta = other._backend._read_meta(2)
+    old = tmp_path / 'v1' / other._backend._read_meta(1)['partitions']['P1']
+    new = tmp_path / 'v2' / meta['partitions']['P1']
+    assert os.stat(old).st_ino == os.stat(new).st_ino
+
+
+def test_old_versions_are_cleaned_up(stores, tmp_path):
+    writer, _ = stores
+    for seed in range(5):
+        writer.replace(partitions(seed), 'upload')
+    versions = sorted(name for name in os.listdir(tmp_path) if name.startswith('v'))
+    assert versions == ['v3', 'v4', 'v5']
+
+
+def test_mixed_object_column_round_trip(tmp_path):
+    path = str(tmp_path / 'mixed.arrow')
+    frame = pd.DataFrame({'value': [1, 'a', None], 'n': [1, 2, 3]})
+    jtas.SharedDatasetBackend._write_table(frame, path)
+    loaded = jtas.SharedDatasetBackend._read_table(path)
+    assert loaded['value'].tolist()[:2] == ['1', 'a']
+    assert pd.isna(loaded['value'][2])
+    assert loaded['n'].tolist() == [1, 2, 3]
+
+
+def test_leftover_version_directory_is_skipped(stores, tmp_path):
+    writer, reader = stores
+    writer.replace(partitions(), 'upload')
+    # 进程在提升版本号前崩溃留下的目录
+    (tmp_path / 'v2').mkdir()
+    (tmp_path / 'v2' / 'partial.arrow').write_bytes(b'')
+    
+    snapshot = writer.replace(partitions(1), 'upload')
+    assert snapshot.version == 3
+    assert reader.current().version == 3
+    assert writer.replace(partitions(2), 'upload').version == 4
+
+
+def test_version_counter_reset_does_not_overwrite(stores, tmp_path):
+    writer, reader = stores
+    writer.replace(partitions(), 'upload')
+    writer.replace(partitions(1), 'upload')
+    assert reader.current().version == 2
+    
+    os.remove(tmp_path / 'CURRENT')
+    fresh = jtas.DatasetStore(jtas.SharedDatasetBackend(str(tmp_path)))
+    snapshot = fresh.replace(partitions(2), 'upload')
+    assert snapshot.version == 3
+    assert reader.current().version == 3
+
+
+def test_failed_write_removes_temporary_directory(stores, tmp_path, monkeypatch):
+    writer, _ = stores
+    
+    def fail(frame, path):
+        raise OSError('disk full')
+    monkeypatch.setattr(jtas.SharedDatasetBackend, '_write_table', staticmethod(fail))
+    with pytest.raises(OSError):
+        writer.replace(partitions(), 'upload')
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('.tmp-')]
+    assert writer.current().version == 0
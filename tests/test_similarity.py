@@ -0,0 +1,84 @@
+"""摘要相似度索引(MinHash + LSH)及分单因素分析"""
+
+import numpy as np
+import pandas as pd
+
+import app as jtas
+from tests.conftest import make_tickets, publish
+
+DAY = 86400 * 10 ** 9
+
+
+def shingles(text, size=jtas.SIMILARITY_SHINGLE):
+    text = ' '.join(text.lower().split())[:jtas.SIMILARITY_MAX_CHARS]
+    return {text[i:i + size] for i in range(len(text) - size + 1)} or ({text} if text else set())
+
+
+def test_shingle_hashes_match_python_ngrams():
+    texts = ['Printer  offline on Floor 3', 'VPN', 'ab', '', None, '打印机无法连接网络']
+    docs, hashes = jtas._shingle_hashes(texts, chunk_size=2)
+    counts = np.bincount(docs, minlength=len(texts))
+    assert counts.tolist() == [len(shingles(t or '')) for t in texts]
+    
+    _, same = jtas._shingle_hashes(['printer offline ON floor 3'])
+    assert sorted(same.tolist()) == sorted(hashes[docs == 0].tolist())
+
+
+def test_signature_similarity_estimates_jaccard():
+    texts = ['邮件服务器无法发送外部邮件, 请尽快处理', '邮件服务器无法发送外部邮件, 请今天处理',
+             '员工入职需要开通VPN账号和门禁权限']
+    index = jtas.SimilarityIndex(np.array(texts, dtype=object))
+    exact = len(shingles(texts[0]) & shingles(texts[1])) / len(shingles(texts[0]) | shingles(texts[1]))
+    estimate = index.similarity(np.array([0]), np.array([1]))[0]
+    assert abs(estimate - exact) < 0.3
+    assert index.similarity(np.array([0]), np.array([2]))[0] < 0.2
+    
+    assert [doc for doc, _ in index.neighbors(doc=0)] == [0, 1]
+    assert index.neighbors(text='员工入职需要开通VPN账号和门禁权限')[0] == (2, 1.0)
+    assert index.neighbors(text='') == []
+
+
+def test_previous_similar_respects_window():
+    data = pd.DataFrame({'summary': ['磁盘空间不足告警 server-01', '磁盘空间不足告警 server-01', '无关的请求',
+                                     '磁盘空间不足告警 server-01', None]})
+    index = jtas.SimilarityIndex.from_tickets(data)
+    created = np.array([0, 1, 2, 30, 31], dtype=np.int64) * DAY
+    assert index.previous_similar(created, 7 * DAY).tolist() == [-1, 0, -1, -1, -1]
+    assert index.previous_similar(created, 60 * DAY).tolist() == [-1, 0, -1, 1, -1]
+
+
+def test_previous_in_group():
+    groups = np.array([0, 1, 0, 0, -1])
+    created = np.array([0, 1, 2, 20, 3], dtype=np.int64) * DAY
+    assert jtas._previous_in_group(groups, created, 7 * DAY).tolist() == [-1, -1, 0, -1, -1]
+
+
+def test_dispatch_factors_same_reporter():
+    data = pd.DataFrame({
+        'created_time': pd.to_datetime(['2024-03-01 09:00', '2024-03-01 10:00', '2024-03-01 11:00']),
+        'resolved_time': pd.to_datetime(['2024-03-01 12:00', '2024-03-01 11:00', '2024-03-01 15:00']),
+        'reporter': ['r1', 'r1', 'r1'],
+        'assignee_employee_id': ['A', 'A', 'B'],
+        'assignment_method': ['AI', 'AI', 'MANUAL'],
+    })
+    factor = jtas.compute_dispatch_factors(data, None)['factors']['same_reporter']
+    assert factor['tickets_with_context'] == 2 and factor['same_assignee_rate'] == 50
+    assert factor['same_assignee']['median_resolution_hours'] == 1
+    assert factor['different_assignee']['median_resolution_hours'] == 4
+    assert factor['median_resolution_change'] == -75
+
+
+def test_similarity_endpoints(client):
+    frame = make_tickets(6)
+    frame['summary'] = ['无法登录系统 账号被锁定'] * 3 + ['打印机卡纸', '网络很慢', '无法登录系统 账号被锁定了']
+    frame['reporter'] = 'u1'
+    publish(frame)
+    body = client.get('/api/similarity/lookup?ticket_id=T-0000').get_json()
+    assert {t['ticket_id'] for t in body['similar_tickets']} == {'T-0001', 'T-0002', 'T-0005'}
+    assert all(t['same_reporter'] for t in body['similar_tickets'])
+    assert client.get('/api/similarity/lookup?ticket_id=missing').status_code == 404
+    assert client.get('/api/similarity/lookup').status_code == 400
+    
+    factors = client.get('/api/similarity/dispatch-factors?window_days=30').get_json()
+    assert set(factors['factors']) == {'same_reporter', 'similar_summary'}
+    assert client.get('/api/similarity/dispatch-factors?window_days=0').status_code == 400
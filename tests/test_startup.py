@@ -0,0 +1,32 @@
+"""快速启动: 延迟导入的依赖及 start.py 的依赖指纹"""
+
+import subprocess
+import sys
+
+import start
+from tests.conftest import ROOT_DIR
+
+
+def test_import_does_not_load_optional_dependencies():
+    # pyarrow 由pandas自身导入, 不在检查之列
+    code = ('import sys, app; '
+            'print("loaded:" + ",".join(m for m in ("plotly", "requests", "openpyxl", "chardet") if m in sys.modules))')
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, capture_output=True, text=True,
+                            env={'PATH': '', 'JTAS_UPLOAD_CACHE_ENTRIES': '0'}, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == 'loaded:'
+
+
+def test_dependency_fingerprint_skips_reinstall(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'requirements.txt').write_text('pandas\n')
+    calls = []
+    monkeypatch.setattr(start.subprocess, 'check_call', lambda *args, **kwargs: calls.append(args))
+    
+    assert not start.dependencies_up_to_date()
+    assert start.install_requirements()
+    assert start.dependencies_up_to_date()
+    assert len(calls) == 1
+    
+    (tmp_path / 'requirements.txt').write_text('pandas\nflask\n')
+    assert not start.dependencies_up_to_date()
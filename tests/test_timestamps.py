@@ -0,0 +1,78 @@
+import pandas as pd
+
+import app as jtas
+
+
+def parsed(values, **kwargs):
+    return jtas.parse_timestamps(pd.Series(values, dtype=object), **kwargs).dt.strftime('%Y-%m-%d %H:%M').tolist()
+
+
+def test_iso_column():
+    values = ['2024-03-01T08:00:00.123456', '2024-03-02T09:30:00.000001', '2024-03-03T10:00:00']
+    assert jtas.detect_timestamp_format(pd.Series(values)) == '%Y-%m-%dT%H:%M:%S.%f'
+    assert parsed(values) == ['2024-03-01 08:00', '2024-03-02 09:30', '2024-03-03 10:00']
+
+
+def test_day_first_column():
+    values = ['03/04/2024', '25/03/2024', '12/01/2024']
+    assert jtas.detect_timestamp_format(pd.Series(values)) == '%d/%m/%Y'
+    assert parsed(values) == ['2024-04-03 00:00', '2024-03-25 00:00', '2024-01-12 00:00']
+
+
+def test_month_first_column():
+    values = ['03/04/2024', '03/25/2024', '12/01/2024']
+    assert jtas.detect_timestamp_format(pd.Series(values)) == '%m/%d/%Y'
+    assert parsed(values) == ['2024-03-04 00:00', '2024-03-25 00:00', '2024-12-01 00:00']
+
+
+def test_ambiguous_column_is_month_first():
+    assert parsed(['03/04/2024 10:00', '12/01/2024 11:00']) == ['2024-03-04 10:00', '2024-12-01 11:00']
+
+
+def test_values_outside_format_keep_column_order():
+    # 样本只含日在前可判定的值, 不符合格式(带秒)的值也按日在前解析
+    values = ['25/03/2024 10:00', '13/04/2024 11:00', '03/04/2024 12:00:30']
+    assert parsed(values) == ['2024-03-25 10:00', '2024-04-13 11:00', '2024-04-03 12:00']
+
+
+def test_utc_offsets_normalized_to_ingest_timezone():
+    values = ['2024-03-01T08:00:00.000+0800', '2024-03-01T00:30:00.000+0000', '2024-03-01T08:00:00.000-0500',
+              '2024-03-01T08:00:00+08:00', '2024-03-01T00:00:00Z', None, 'garbage']
+    assert jtas.detect_timestamp_format(pd.Series(values[:3])) == '%Y-%m-%dT%H:%M:%S.%f%z'
+    result = jtas.parse_timestamps(pd.Series(values, dtype=object))
+    assert result.dt.tz is None
+    assert result.dt.strftime('%Y-%m-%d %H:%M').tolist()[:5] == [
+        '2024-03-01 08:00', '2024-03-01 08:30', '2024-03-01 21:00', '2024-03-01 08:00', '2024-03-01 08:00']
+    assert result.iloc[5:].isna().all()
+
+
+def test_other_timezone():
+    result = jtas.parse_timestamps(pd.Series(['2024-03-01T08:00:00.000+0800']), timezone='UTC')
+    assert result.iloc[0] == pd.Timestamp('2024-03-01 00:00')
+
+
+def test_datetime_objects_and_aware_columns():
+    objects = pd.Series([pd.Timestamp('2024-01-01 08:00'), None, pd.Timestamp('2024-01-01 08:00', tz='UTC')],
+                        dtype=object)
+    assert parsed(objects)[0] == '2024-01-01 08:00'
+    assert parsed(objects)[2] == '2024-01-01 16:00'
+    aware = pd.Series(pd.to_datetime(['2024-01-01T00:00Z']))
+    assert jtas.parse_timestamps(aware).iloc[0] == pd.Timestamp('2024-01-01 08:00')
+
+
+def test_prepare_tickets_mixed_offsets_and_empty_resolved():
+    frame = pd.DataFrame({
+        'ticket_id': ['A', 'B'], 'assignee_employee_id': ['E1', 'E2'], 'assignment_method': ['AI', 'MANUAL'],
+        'actual_processing_minutes': [10, 20], 'created_time': ['2024-03-01T08:00:00.000+0800'] * 2,
+        'assigned_time': ['2024-03-01T09:00:00.000+0800', None], 'resolved_time': [None, None]})
+    data, report = jtas.prepare_tickets(frame)
+    assert report['timestamp_formats']['created_time'] == '%Y-%m-%dT%H:%M:%S.%f%z'
+    assert all(data[c].dtype == 'datetime64[ns]' for c in jtas.TICKET_TIME_COLUMNS)
+    assert data['created_time'].iloc[0] == pd.Timestamp('2024-03-01 08:00')
+
+
+def test_worklog_started_in_ingest_timezone():
+    worklogs = jtas.prepare_worklogs(pd.DataFrame({
+        'ticket_id': ['A', 'A'], 'author_account_id': ['x', 'x'],
+        'started': ['2024-03-01T00:30:00.000+0000', '2024-03-01T09:00:00.000+0800'], 'seconds': [60, 60]}))
+    assert worklogs['started'].tolist() == [pd.Timestamp('2024-03-01 08:30'), pd.Timestamp('2024-03-01 09:00')]
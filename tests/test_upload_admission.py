@@ -0,0 +1,53 @@
+"""上传准入: 同时进行的上传总量及解析前的内存预算检查"""
+
+import io
+
+import pytest
+
+import app as jtas
+from tests.conftest import make_tickets
+
+
+def csv_upload(client, frame, name='tickets.csv'):
+    body = frame.to_csv(index=False).encode('utf-8')
+    return client.post('/api/upload', data={'file': (io.BytesIO(body), name)},
+                       content_type='multipart/form-data')
+
+
+def test_reserve_upload_counts_first_upload():
+    budget = jtas.MemoryBudget(upload_budget_bytes=100)
+    assert budget.reserve_upload(150) is None
+    
+    token = budget.reserve_upload(80)
+    assert token is not None
+    assert budget.reserve_upload(30) is None
+    budget.release_upload(token)
+    assert budget.reserve_upload(30) is not None
+
+
+def test_upload_over_upload_budget_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(jtas.memory_budget, 'upload_budget_bytes', 1024)
+    response = csv_upload(client, make_tickets(200))
+    assert response.status_code == 413
+    assert '上传预算' in response.get_json()['error']
+
+
+def test_concurrent_uploads_get_503(client, monkeypatch):
+    monkeypatch.setattr(jtas.memory_budget, 'upload_budget_bytes', 1 << 20)
+    token = jtas.memory_budget.reserve_upload(1 << 20)
+    try:
+        response = csv_upload(client, make_tickets(10))
+    finally:
+        jtas.memory_budget.release_upload(token)
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '30'
+
+
+def test_file_over_memory_budget_is_rejected_before_parsing(client, monkeypatch):
+    monkeypatch.setattr(jtas.memory_budget, 'budget_bytes', 1024)
+    monkeypatch.setattr(jtas.memory_budget, 'spill_dir', None)
+    monkeypatch.setattr(jtas.pd, 'read_csv',
+                        lambda *args, **kwargs: pytest.fail('超出预算的文件不应被解析'))
+    response = csv_upload(client, make_tickets(200))
+    assert response.status_code == 413
+    assert '内存预算' in response.get_json()['error']
@@ -0,0 +1,71 @@
+"""按内容寻址的上传缓存"""
+
+import io
+import os
+
+import pytest
+
+import app as jtas
+from tests.conftest import make_tickets
+
+pytest.importorskip('pyarrow')
+
+
+def test_put_load_round_trip(tmp_path):
+    cache = jtas.UploadCache(str(tmp_path / 'cache'), 4)
+    data, report = jtas.prepare_tickets(make_tickets(12))
+    key = cache.key('abc', 'tickets.CSV')
+    assert key == f'abc-csv-v{jtas.INGEST_SCHEMA_VERSION}'
+    assert cache.get(key) is None
+    
+    cache.put(key, data, report)
+    meta = cache.get(key)
+    assert meta['rows'] == 12
+    assert meta['columns'] == list(data.columns)
+    assert cache.load(key)['ticket_id'].tolist() == data['ticket_id'].tolist()
+
+
+def test_prune_keeps_recent_entries(tmp_path):
+    cache = jtas.UploadCache(str(tmp_path / 'cache'), 2)
+    data, report = jtas.prepare_tickets(make_tickets(4))
+    for i, key in enumerate(['a', 'b', 'c']):
+        cache.put(key, data, report)
+        os.utime(tmp_path / 'cache' / f'{key}.json', (i, i))
+    cache._prune()
+    assert cache.get('a') is None
+    assert cache.get('b') is not None and cache.get('c') is not None
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid'), reason='需要POSIX权限')
+def test_directory_is_private(tmp_path):
+    directory = tmp_path / 'cache'
+    directory.mkdir(mode=0o777)
+    os.chmod(directory, 0o777)
+    cache = jtas.UploadCache(str(directory), 4)
+    assert cache.enabled()
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+
+
+def test_foreign_directory_disables_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(jtas.os, 'getuid', lambda: os.stat(tmp_path).st_uid + 1, raising=False)
+    cache = jtas.UploadCache(str(tmp_path / 'cache'), 4)
+    assert not cache.enabled()
+    assert cache.get('missing') is None
+
+
+def test_symlinked_directory_disables_cache(tmp_path):
+    (tmp_path / 'target').mkdir()
+    os.symlink(tmp_path / 'target', tmp_path / 'cache')
+    assert not jtas.UploadCache(str(tmp_path / 'cache'), 4).enabled()
+
+
+def test_same_file_uploaded_twice_uses_cache(client):
+    body = make_tickets(15, seed=3).to_csv(index=False).encode('utf-8')
+    
+    def upload():
+        return client.post('/api/upload', data={'file': (io.BytesIO(body), 'same.csv')},
+                           content_type='multipart/form-data').get_json()
+    first = upload()
+    assert first['success'] and not first.get('cached')
+    second = upload()
+    assert second['cached'] and second['version'] == first['version']
@@ -0,0 +1,83 @@
+"""导入数据的校验与清洗阶段"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+import app as jtas
+from tests.conftest import make_tickets
+
+
+def dirty_tickets():
+    frame = make_tickets(10)
+    frame.loc[1, 'actual_processing_minutes'] = -5
+    frame.loc[2, 'actual_processing_minutes'] = jtas.MAX_PROCESSING_MINUTES + 1
+    frame.loc[3, 'resolved_time'] = '2024-02-01 00:00:00'
+    frame.loc[4, 'ticket_id'] = frame.loc[5, 'ticket_id']
+    frame.loc[6, 'ticket_id'] = None
+    frame.loc[7, 'created_time'] = 'not a date'
+    frame.loc[8, 'assignment_method'] = ' ai '
+    frame.loc[9, 'assignment_method'] = 'ROBOT'
+    frame['actual_processing_minutes'] = frame['actual_processing_minutes'].astype(object)
+    frame.loc[0, 'actual_processing_minutes'] = 'abc'
+    return pd.concat([frame, pd.DataFrame([{}])], ignore_index=True)
+
+
+def test_issues_are_counted_and_cleaned():
+    data, report = jtas.prepare_tickets(dirty_tickets())
+    issues = report['issues']
+    assert report['total_rows'] == 11
+    assert {name: issue['count'] for name, issue in issues.items()} == {
+        'empty_rows': 1,
+        'invalid_created_time': 1,
+        'invalid_actual_processing_minutes': 1,
+        'missing_ticket_id': 1,
+        'duplicate_ticket_id': 1,
+        'negative_actual_processing_minutes': 1,
+        'absurd_actual_processing_minutes': 1,
+        'resolved_before_created': 1,
+        'unknown_assignment_method': 1,
+    }
+    assert report['valid_rows'] == len(data) == 8
+    assert report['dropped_rows'] == 3
+    
+    by_id = data.set_index('ticket_id')
+    assert np.isnan(by_id.loc['T-0001', 'actual_processing_minutes'])
+    assert np.isnan(by_id.loc['T-0002', 'actual_processing_minutes'])
+    assert pd.isna(by_id.loc['T-0003', 'resolved_time'])
+    assert by_id.loc['T-0008', 'assignment_method'] == 'AI'
+    assert by_id.loc['T-0009', 'assignment_method'] == 'ROBOT'
+    # 重复工单ID保留最后一条
+    assert 'T-0004' not in by_id.index and by_id.index.is_unique
+
+
+def test_samples_show_row_and_raw_value():
+    _, report = jtas.prepare_tickets(dirty_tickets())
+    sample = report['issues']['invalid_actual_processing_minutes']['samples'][0]
+    assert sample == {'row': 0, 'ticket_id': 'T-0000', 'actual_processing_minutes': 'abc'}
+    assert report['issues']['negative_actual_processing_minutes']['action'] == 'set_null'
+    assert report['issues']['duplicate_ticket_id']['action'] == 'dropped'
+
+
+def test_log_time_takes_precedence():
+    frame = make_tickets(3)
+    frame['log_time'] = [5, None, 7]
+    data, _ = jtas.prepare_tickets(frame)
+    assert data['actual_processing_minutes'].tolist()[0] == 5
+    assert data['actual_processing_minutes'].tolist()[1] == frame['actual_processing_minutes'][1]
+
+
+def test_missing_columns_are_reported():
+    data, report = jtas.prepare_tickets(make_tickets(3).drop(columns=['assignment_method']))
+    assert report['missing_columns'] == ['assignment_method']
+    assert report['valid_rows'] == 0
+    assert len(data) == 3
+
+
+def test_validation_report_returned_by_upload(client):
+    body = dirty_tickets().to_csv(index=False).encode('utf-8')
+    response = client.post('/api/upload', data={'file': (io.BytesIO(body), 'dirty.csv')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert response.get_json()['validation']['issues']['duplicate_ticket_id']['count'] == 1
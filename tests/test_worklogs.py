@@ -0,0 +1,79 @@
+"""工作日志明细: 发布、合并、日利用率及首次处理时长"""
+
+import pandas as pd
+import pytest
+
+import app as jtas
+from tests.conftest import make_tickets, publish
+
+
+def raw_worklogs():
+    return pd.DataFrame([
+        # 2024-03-04 为周一
+        {'ticket_id': 'T-0000', 'project_key': 'P1', 'author_account_id': 'acc-1', 'author_name': '张三',
+         'started': '2024-03-04T09:00:00.000+0800', 'seconds': 4 * 3600},
+        {'ticket_id': 'T-0002', 'project_key': 'P1', 'author_account_id': 'acc-1', 'author_name': '张三',
+         'started': '2024-03-04T14:00:00.000+0800', 'seconds': 6 * 3600},
+        {'ticket_id': 'T-0001', 'project_key': 'P2', 'author_account_id': 'acc-2', 'author_name': '李四',
+         'started': '2024-03-05T01:00:00.000+0000', 'seconds': 2 * 3600},
+        {'ticket_id': 'T-0003', 'project_key': 'P2', 'author_account_id': 'acc-1', 'author_name': '张三',
+         'started': '2024-03-08T10:00:00.000+0800', 'seconds': 3600},
+        {'ticket_id': None, 'project_key': 'P2', 'author_account_id': 'acc-2', 'author_name': '李四',
+         'started': '2024-03-05T10:00:00.000+0800', 'seconds': 3600},
+        {'ticket_id': 'T-0003', 'project_key': 'P2', 'author_account_id': 'acc-2', 'author_name': '李四',
+         'started': '2024-03-05T10:00:00.000+0800', 'seconds': 0},
+    ])
+
+
+def test_prepare_worklogs_drops_invalid_and_localizes():
+    worklogs = jtas.prepare_worklogs(raw_worklogs())
+    assert len(worklogs) == 4
+    assert worklogs['started'][2] == pd.Timestamp('2024-03-05 09:00')
+
+
+def test_utilization_by_assignee_and_day(tickets):
+    snapshot = publish(tickets, worklogs=jtas.prepare_worklogs(raw_worklogs()))
+    result = jtas.compute_worklog_utilization(snapshot.worklogs(), snapshot.assignees())
+    assert result['workdays'] == 5 and result['logged_hours'] == 13
+    by_name = {row['name']: row for row in result['assignees']}
+    zhang = by_name['张三']
+    assert zhang['active_days'] == 2 and zhang['logged_hours'] == 11
+    assert zhang['overloaded_days'] == 1 and zhang['peak_daily_hours'] == 10
+    assert zhang['period_utilization'] == pytest.approx(11 / 40 * 100, abs=0.01)
+    assert by_name['李四']['active_day_utilization'] == 25
+    assert [day['date'] for day in result['daily']] == ['2024-03-04', '2024-03-05', '2024-03-08']
+
+
+def test_merge_replaces_only_imported_projects(tickets):
+    publish(tickets, worklogs=jtas.prepare_worklogs(raw_worklogs()))
+    data, _ = jtas.prepare_tickets(make_tickets(4, projects=('P2',), seed=3))
+    snapshot = jtas.dataset_store.merge(jtas.partition_by_project(data), worklogs=None)
+    assert set(snapshot.worklogs()['project_key']) == {'P1'}
+    assert len(snapshot.worklogs(['P1'])) == 2
+
+
+def test_time_to_first_work():
+    data = pd.DataFrame({
+        'ticket_id': ['A', 'B', 'C'],
+        'assignment_method': ['AI', 'MANUAL', 'AI'],
+        'assigned_time': pd.to_datetime(['2024-03-04 08:00', '2024-03-04 12:00', '2024-03-04 08:00']),
+    })
+    worklogs = pd.DataFrame({
+        'ticket_id': pd.Categorical(['A', 'A', 'B']),
+        'started': pd.to_datetime(['2024-03-04 12:00', '2024-03-04 10:00', '2024-03-04 11:00']),
+    })
+    result = jtas.compute_time_to_first_work(data, worklogs)
+    assert result['tickets_with_worklog'] == 2 and result['backdated_tickets'] == 1
+    assert result['overall'] == {'tickets': 1, 'median_hours': 2.0, 'mean_hours': 2.0, 'p90_hours': 2.0}
+    assert set(result['by_assignment_method']) == {'AI'}
+
+
+def test_worklog_endpoints(client, tickets):
+    publish(tickets)
+    assert client.get('/api/worklogs/utilization').status_code == 404
+    
+    publish(tickets, worklogs=jtas.prepare_worklogs(raw_worklogs()))
+    body = client.get('/api/worklogs/utilization?start=2024-03-05&end=2024-03-05').get_json()
+    assert body['logged_hours'] == 2
+    assert client.get('/api/worklogs/utilization?start=bad').status_code == 400
+    assert client.get('/api/worklogs/first-work').get_json()['tickets_with_worklog'] == 4
@@ -0,0 +1,82 @@
+"""XLSX流式只读、按列投影读取"""
+
+import io
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import app as jtas
+from tests.conftest import make_tickets
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+def workbook_bytes(rows, header):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    output = io.BytesIO()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+@pytest.mark.parametrize('batch_bytes', [256, 1 << 20])
+def test_matches_read_excel_for_known_columns(batch_bytes):
+    frame = make_tickets(30)
+    frame['created_time'] = pd.to_datetime(frame['created_time'])
+    frame['unused'] = 'x'
+    header = ['unused'] + [c for c in frame.columns if c != 'unused']
+    stream = workbook_bytes(frame[header].values.tolist(), header)
+    
+    data = jtas.read_xlsx_tickets(stream, batch_bytes=batch_bytes)
+    stream.seek(0)
+    expected = pd.read_excel(stream).drop(columns='unused')
+    assert 'unused' not in data.columns
+    pd.testing.assert_frame_equal(data[expected.columns], expected, check_dtype=False)
+    assert pd.api.types.is_datetime64_any_dtype(data['created_time'])
+    assert data['actual_processing_minutes'].dtype.kind == 'i'
+
+
+def test_mixed_values_blanks_and_escaped_text():
+    rows = [
+        ['T-1', 'A & B <x>', 10, datetime(2024, 3, 1, 8, 30)],
+        ['T-2', None, 2.5, None],
+        [None, None, None, None],
+        ['T-3', 42, 'n/a', datetime(2024, 3, 2)],
+    ]
+    data = jtas.read_xlsx_tickets(workbook_bytes(rows, ['ticket_id', 'summary', 'log_time', 'created_time']))
+    assert data['ticket_id'].tolist() == ['T-1', 'T-2', 'T-3']
+    assert data['summary'].tolist()[0] == 'A & B <x>'
+    assert pd.isna(data['summary'][1]) and data['summary'][2] == 42
+    assert data['log_time'].tolist() == [10, 2.5, 'n/a']
+    assert data['created_time'][0] == pd.Timestamp('2024-03-01 08:30')
+    assert pd.isna(data['created_time'][1])
+
+
+def test_projection_and_header_offset():
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet['B3'], sheet['C3'], sheet['D3'] = 'employee_id', 'notes', 'name'
+    sheet['B4'], sheet['C4'], sheet['D4'] = 'EMP001', 'ignored', '张三'
+    stream = io.BytesIO()
+    workbook.save(stream)
+    stream.seek(0)
+    data = jtas.read_xlsx_tickets(stream, columns=jtas.ASSIGNEE_ROSTER_COLUMNS)
+    assert data.to_dict('records') == [{'employee_id': 'EMP001', 'name': '张三'}]
+
+
+def test_no_known_columns():
+    assert jtas.read_xlsx_tickets(workbook_bytes([[1]], ['other'])).empty
+
+
+def test_upload_xlsx(client):
+    frame = make_tickets(12)
+    stream = workbook_bytes(frame.values.tolist(), list(frame.columns))
+    response = client.post('/api/upload', data={'file': (stream, 'tickets.xlsx')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['rows'] == 12